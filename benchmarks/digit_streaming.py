@@ -0,0 +1,53 @@
+"""
+Measure streaming the digits of a huge mpz to a file with write_digits.
+
+Compares ``file.write(str(x))`` with ``x.write_digits(file)`` for time and
+peak memory: Python allocations (tracemalloc) plus GMP allocations
+(memory_stats).
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from gmpy_cffi import (
+    mpz, set_memory_tracking, memory_stats, reset_memory_peak)
+
+
+DIGITS = [10**6, 10**7]
+
+
+def measure(f):
+    """Return the time in seconds and peak memory in MB of f()."""
+    reset_memory_peak()
+    base = memory_stats()['live']
+    tracemalloc.start()
+    start = time.time()
+    f()
+    elapsed = time.time() - start
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, (python_peak + memory_stats()['peak'] - base) / 1e6
+
+
+def main():
+    set_memory_tracking(True)
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        print('%10s %10s %10s %10s %10s' % ('digits', 'str (s)', 'str (MB)',
+                                            'stream (s)', 'stream (MB)'))
+        for digits in DIGITS:
+            x = mpz(7) ** int(digits / 0.845)
+            with open(path, 'w') as f:
+                t1, m1 = measure(lambda: f.write(str(+x + 0)))
+            with open(path, 'w') as f:
+                t2, m2 = measure(lambda: x.write_digits(f))
+            print('%10d %10.2f %10.1f %10.2f %10.1f' % (digits, t1, m1, t2,
+                                                        m2))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measure the cost of loading the GMP/MPFR/MPC bindings in a fresh process.
+
+Compares the old in-line ``ffi.verify`` build (with an empty and with a warm
+verifier cache) against importing the precompiled ``_gmpy_cffi`` extension.
+Also compares integer-only use of the package (where the MPFR and MPC
+modules and pools are never loaded) with touching everything.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import timeit
+
+
+VERIFY = """
+import runpy, cffi
+build = runpy.run_path('gmpy_cffi/_ffi_build.py')
+ffi = cffi.FFI()
+ffi.cdef(build['CDEF'])
+ffi.verify(build['SOURCE'], libraries=build['LIBRARIES'], tmpdir=%r)
+"""
+
+# Load the extension on its own, without running the package __init__
+OUT_OF_LINE = "import sys; sys.path.insert(0, 'gmpy_cffi'); import _gmpy_cffi"
+
+PACKAGE = "import gmpy_cffi"
+
+INTEGER = "import gmpy_cffi; gmpy_cffi.mpz(1) + 1"
+
+EVERYTHING = "import gmpy_cffi; gmpy_cffi.mpc(1) + gmpy_cffi.sin(1)"
+
+RSS = """
+import resource
+%s
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run(code, repeat):
+    """Return the best wall-clock time of `repeat` fresh interpreters."""
+    times = []
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        subprocess.check_call([sys.executable, '-c', code])
+        times.append(timeit.default_timer() - start)
+    return min(times)
+
+
+def rss(code):
+    """Return the peak resident set size (in kB on Linux) after running code."""
+    return int(subprocess.check_output([sys.executable, '-c', RSS % code]))
+
+
+def main(repeat):
+    baseline = run("pass", repeat)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        verify = VERIFY % tmpdir
+        shutil.rmtree(tmpdir)
+        cold = run(verify, 1)
+        warm = run(verify, repeat)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    print('interpreter startup         %8.1f ms' % (baseline * 1e3))
+    print('ffi.verify, cold cache      %8.1f ms' % ((cold - baseline) * 1e3))
+    print('ffi.verify, warm cache      %8.1f ms' % ((warm - baseline) * 1e3))
+    print('import _gmpy_cffi           %8.1f ms' % (
+        (run(OUT_OF_LINE, repeat) - baseline) * 1e3))
+    print('import gmpy_cffi            %8.1f ms' % (
+        (run(PACKAGE, repeat) - baseline) * 1e3))
+    for name, code in [('integer only', INTEGER), ('everything', EVERYTHING)]:
+        print('%-27s %8.1f ms %8d kB max RSS' % (
+            name, (run(code, repeat) - baseline) * 1e3, rss(code)))
+
+if __name__ == "__main__":
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
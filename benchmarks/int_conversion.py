@@ -0,0 +1,45 @@
+"""
+Measure converting Python ints to mpz, and mixed ``mpz + int`` arithmetic.
+
+Compares the old hex string round-trip (``mpz_set_str(hex(n))``) with the
+binary ``int.to_bytes`` + ``mpz_import`` path used by ``_pylong_to_mpz``,
+for operands from 64 bits to 10 million bits.
+"""
+import timeit
+
+from gmpy_cffi import mpz
+from gmpy_cffi.interface import ffi, gmp
+from gmpy_cffi.convert import _pylong_to_mpz
+
+
+SIZES = [64, 1000, 10000, 100000, 1000000, 10000000]
+
+
+def hex_to_mpz(n, a):
+    gmp.mpz_set_str(a, hex(n).rstrip('L').encode('UTF-8'), 0)
+
+
+def best(stmt, number, repeat=5):
+    """Return the best time per call of stmt, in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    a = ffi.new('mpz_t')
+    gmp.mpz_init(a)
+    x = mpz(12345)
+    print('%10s %14s %14s %14s' % ('bits', 'hex (us)', 'binary (us)',
+                                   'mpz + int (us)'))
+    for bits in SIZES:
+        n = -(3 ** int(bits / 1.585))
+        number = max(1, 200000 // (bits // 64 + 1))
+        print('%10d %14.2f %14.2f %14.2f' % (
+            bits,
+            best(lambda: hex_to_mpz(n, a), number),
+            best(lambda: _pylong_to_mpz(n, a), number),
+            best(lambda: x + n, number)))
+    gmp.mpz_clear(a)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measure formatting mpfr values as strings.
+
+Compares the old ``mpfr_sprintf("%.*Rg")`` path with ``str()``, which now
+builds the string from ``mpfr_get_str`` digits, and times a few
+``format()`` specs, at several precisions.
+"""
+import timeit
+from math import log10
+
+from gmpy_cffi import mpfr
+from gmpy_cffi.interface import ffi, gmp
+from gmpy_cffi.convert import _mpfr_to_str
+
+
+PRECISIONS = [53, 200, 1000, 10000]
+
+
+def sprintf_to_str(a):
+    precision = int(log10(2) * gmp.mpfr_get_prec(a) + 2)
+    buf = ffi.new('char []', precision + 10)
+    fmtstr = "%.{0}Rg".format(precision)
+    gmp.mpfr_sprintf(buf, fmtstr.encode('UTF-8'), a)
+    pybuf = ffi.string(buf).decode('UTF-8')
+    if gmp.mpfr_number_p(a) and '.' not in pybuf:
+        pybuf = pybuf + '.0'
+    return pybuf
+
+
+def best(stmt, number, repeat=5):
+    """Return the best time per call of stmt, in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    print('%8s %14s %14s %14s %14s' % ('prec', 'sprintf (us)', 'str (us)',
+                                       "'.50f' (us)", "'.20e' (us)"))
+    for prec in PRECISIONS:
+        x = mpfr('3.14159265358979323846264338327950288', prec)
+        a = x._mpfr
+        number = max(1, 100000 // (prec // 53))
+        print('%8d %14.2f %14.2f %14.2f %14.2f' % (
+            prec,
+            best(lambda: sprintf_to_str(a), number),
+            best(lambda: _mpfr_to_str(a), number),
+            best(lambda: format(x, '.50f'), number),
+            best(lambda: format(x, '.20e'), number)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure building and computing with many mpz values at once.
+
+Compares a list comprehension of ``mpz(x)`` with ``mpz_array`` built from a
+list of ints, an ``array('q')``, a numpy int64 array (if numpy is
+installed) and a packed bytes blob, for a million 64-bit values. Then
+compares elementwise arithmetic on lists of mpz with the same operations
+on mpz_array, which run in one C call each.
+"""
+import random
+import timeit
+from array import array
+
+from gmpy_cffi import mpz, mpz_array
+
+
+N = 1000000
+
+
+def best(stmt, number=1, repeat=3):
+    """Return the best time per call of stmt, in milliseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e3
+
+
+def main():
+    random.seed(0)
+    values = [random.randint(-2**63, 2**63 - 1) for i in range(N)]
+    buf = array('q', values)
+    blob = buf.tobytes()
+    big = [v << 64 for v in values[:N // 10]]
+    print('%-32s %10s' % ('%d values' % N, 'ms'))
+    print('%-32s %10.1f' % ('[mpz(x) for x in list]',
+                            best(lambda: [mpz(x) for x in values])))
+    print('%-32s %10.1f' % ('mpz_array(list)',
+                            best(lambda: mpz_array(values))))
+    print('%-32s %10.1f' % ("mpz_array(array('q'))",
+                            best(lambda: mpz_array(buf))))
+    try:
+        import numpy
+    except ImportError:
+        pass
+    else:
+        npbuf = numpy.array(values, dtype=numpy.int64)
+        print('%-32s %10.1f' % ('mpz_array(numpy int64)',
+                                best(lambda: mpz_array(npbuf))))
+    print('%-32s %10.1f' % ('mpz_array.frombytes(8 bytes)',
+                            best(lambda: mpz_array.frombytes(
+                                blob, 8, 'little', signed=True))))
+    print('%-32s %10.1f' % ('[mpz(x) for x in list] (128 bit)',
+                            best(lambda: [mpz(x) for x in big]) * 10))
+    print('%-32s %10.1f' % ('mpz_array(list) (128 bit)',
+                            best(lambda: mpz_array(big)) * 10))
+
+
+def arithmetic():
+    random.seed(1)
+    n = 100000
+    xs = [mpz(random.getrandbits(256)) for i in range(n)]
+    ys = [mpz(random.getrandbits(256)) for i in range(n)]
+    a, b = mpz_array(xs), mpz_array(ys)
+    print('')
+    print('%-32s %10s %10s' % ('%d 256-bit values' % n, 'list (ms)',
+                                'array (ms)'))
+    for name, f, g in [
+            ('x + y', lambda: [x + y for x, y in zip(xs, ys)],
+             lambda: a + b),
+            ('x * y', lambda: [x * y for x, y in zip(xs, ys)],
+             lambda: a * b),
+            ('x % 1000003', lambda: [x % 1000003 for x in xs],
+             lambda: a % 1000003),
+            ('x < y', lambda: [x < y for x, y in zip(xs, ys)],
+             lambda: a < b)]:
+        print('%-32s %10.1f %10.1f' % (name, best(f), best(g)))
+
+    def update_list(c):
+        for i in range(n):
+            c[i] += 12345 * ys[i]
+
+    def update_array(c):
+        c += 12345 * b
+
+    print('%-32s %10.1f %10.1f' % (
+        'c += 12345 * y', best(lambda: update_list(list(xs))),
+        best(lambda: update_array(mpz_array(a)))))
+
+    n = 1000
+    mod = mpz(random.getrandbits(2048) | 1)
+    exp = mpz(random.getrandbits(2048))
+    bases = [mpz(random.getrandbits(2048)) for i in range(n)]
+    c = mpz_array(bases)
+    print('%-32s %10.1f %10.1f' % (
+        '%d powm, 2048 bits' % n,
+        best(lambda: [pow(x, exp, mod) for x in bases]),
+        best(lambda: c.powm(exp, mod))))
+
+
+if __name__ == "__main__":
+    main()
+    arithmetic()
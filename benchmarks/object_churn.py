@@ -0,0 +1,44 @@
+"""
+Measure object churn: creating and dropping mpz, mpq, mpfr and mpc results.
+
+Each statement creates one result that is dropped right away, so the time
+is dominated by allocating the wrapper, taking the C struct from the cache,
+and returning it when the wrapper dies. One-limb mpz results are also
+checked against the interned range; 'big + big' shows the cost without it.
+"""
+import sys
+import timeit
+
+from gmpy_cffi import mpz, mpq, mpfr, mpc
+
+
+a, b = mpz(12345), mpz(67890)
+A, B = mpz(3) ** 70, mpz(5) ** 50
+q = mpq(1, 3)
+f = mpfr(1.5)
+c = mpc(1, 2)
+
+CASES = [
+    ('mpz + mpz', lambda: a + b),
+    ('big + big', lambda: A + B),
+    ('mpz(int)', lambda: mpz(100000)),
+    ('mpq + mpq', lambda: q + q),
+    ('mpfr + mpfr', lambda: f + f),
+    ('mpc + mpc', lambda: c + c),
+]
+
+
+def best(stmt, number=100000, repeat=5):
+    """Return the best time per call of stmt, in nanoseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    print('%s %s' % (sys.implementation.name if hasattr(sys, 'implementation')
+                     else sys.platform, sys.version.split()[0]))
+    for name, stmt in CASES:
+        print('%-12s %8.0f ns' % (name, best(stmt)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure the memory used per mpz, mpq, mpfr and mpc object.
+
+Creates many distinct small values of each type and reports the memory
+allocated per object. tracemalloc is used where available (CPython), which
+counts the Python wrapper and the cffi structure but not the limbs
+allocated by GMP; otherwise (PyPy) the growth of the maximum resident set
+size is used, which includes everything.
+"""
+import gc
+import sys
+
+from gmpy_cffi import mpz, mpq, mpfr, mpc
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+    import resource
+
+
+N = 100000
+
+TYPES = [
+    ('mpz', lambda i: mpz(i + 1000)),
+    ('mpq', lambda i: mpq(i, 7)),
+    ('mpfr', lambda i: mpfr(i)),
+    ('mpc', lambda i: mpc(i, 1)),
+]
+
+
+def _maxrss():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def per_object(make):
+    """Return the bytes allocated per object made by make(i)."""
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        objs = [make(i) for i in range(N)]
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    else:
+        before = _maxrss()
+        objs = [make(i) for i in range(N)]
+        used = _maxrss() - before
+    # Without the list itself
+    used -= sys.getsizeof(objs) if tracemalloc is not None else 0
+    del objs
+    return used / float(N)
+
+
+def main():
+    print('%s %s' % (sys.implementation.name if hasattr(sys, 'implementation')
+                     else sys.platform, sys.version.split()[0]))
+    for name, make in TYPES:
+        make(1)    # import and warm up
+        print('%-6s %8.1f bytes/object' % (name, per_object(make)))
+
+
+if __name__ == "__main__":
+    main()
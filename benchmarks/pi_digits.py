@@ -0,0 +1,62 @@
+"""
+Measure a pi digit spigot with int, mpz and xmpz.
+
+The loop is written with in-place operators only, so int and mpz allocate a
+new object for every step while xmpz updates its operands in place (values
+that must not be changed are copied with type(x)).
+"""
+import timeit
+
+from gmpy_cffi import mpz, xmpz
+
+
+DIGITS = [100, 1000, 3000]
+
+
+def pi_digits(N, type):
+    """Return the first N decimal digits of pi, using integers of the type."""
+    i, k, ns = type(0), type(0), type(0)
+    k1 = type(1)
+    n, a, d = type(1), type(0), type(1)
+    digits = []
+    while True:
+        k += 1
+        t = type(n)
+        t <<= 1
+        n *= k
+        a += t
+        k1 += 2
+        a *= k1
+        d *= k1
+        if a >= n:
+            t = type(n)
+            t *= 3
+            t += a
+            u = t % d
+            t //= d
+            u += n
+            if d > u:
+                ns *= 10
+                ns += t
+                i += 1
+                digits.append(int(t))
+                if i >= N:
+                    return digits
+                a -= d * t
+                a *= 10
+                n *= 10
+
+
+def main():
+    assert pi_digits(20, int) == pi_digits(20, mpz) == pi_digits(20, xmpz)
+    print('%8s %12s %12s %12s' % ('digits', 'int (ms)', 'mpz (ms)',
+                                  'xmpz (ms)'))
+    for N in DIGITS:
+        times = [min(timeit.repeat(lambda: pi_digits(N, tp), number=1,
+                                   repeat=3)) * 1e3
+                 for tp in (int, mpz, xmpz)]
+        print('%8d %12.2f %12.2f %12.2f' % ((N,) + tuple(times)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Measure converting huge mpz values to decimal strings.
+
+Compares the old ``ffi.string(...).decode()`` path, which copies the digits
+from a zeroed char[] into bytes and then into a str, with ``_mpz_to_str``,
+which decodes straight from an uncleared buffer. Reports the time and the
+peak memory traced by tracemalloc.
+"""
+import timeit
+import tracemalloc
+
+from gmpy_cffi import mpz
+from gmpy_cffi.interface import ffi, gmp
+from gmpy_cffi.convert import _mpz_to_str
+
+
+DIGITS = [10**5, 10**6, 10**7]
+
+
+def old_mpz_to_str(a, base):
+    l = gmp.mpz_sizeinbase(a, base) + 2
+    p = ffi.new('char[]', l)
+    gmp.mpz_get_str(p, base, a)
+    return ffi.string(p).decode('UTF-8')
+
+
+def peak(f):
+    """Return the peak memory allocated by f(), in megabytes."""
+    tracemalloc.start()
+    f()
+    result = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result
+
+
+def main():
+    print('%10s %12s %12s %12s %12s' % ('digits', 'old (ms)', 'new (ms)',
+                                        'old (MB)', 'new (MB)'))
+    for digits in DIGITS:
+        # Keep the mpz alive: it owns the mpz_t
+        x = mpz(7) ** int(digits / 0.845)
+        a = x._mpz
+        old = lambda: old_mpz_to_str(a, 10)
+        new = lambda: _mpz_to_str(a, 10)
+        assert old() == new()
+        print('%10d %12.1f %12.1f %12.1f %12.1f' % (
+            digits,
+            min(timeit.repeat(old, number=1, repeat=3)) * 1e3,
+            min(timeit.repeat(new, number=1, repeat=3)) * 1e3,
+            peak(old), peak(new)))
+
+
+if __name__ == "__main__":
+    main()
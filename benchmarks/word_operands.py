@@ -0,0 +1,45 @@
+"""
+Measure mpz operators with Python int operands of different ranges.
+
+Prints a matrix of operator x operand range, in nanoseconds per operation,
+so the machine-word (_ui/_si) fast paths can be compared with operands that
+need a conversion.
+"""
+import operator
+import sys
+import timeit
+
+from gmpy_cffi import mpz, MAX_UI
+
+
+OPERATORS = [
+    ('+', operator.add), ('-', operator.sub), ('r-', lambda a, b: b - a),
+    ('*', operator.mul), ('//', operator.floordiv), ('%', operator.mod),
+    ('divmod', divmod), ('&', operator.and_), ('|', operator.or_),
+    ('^', operator.xor), ('<', operator.lt), ('==', operator.eq)]
+
+OPERANDS = [
+    ('small', 12345),
+    ('-small', -12345),
+    ('-long', -sys.maxsize - 1),
+    ('ulong', MAX_UI),
+    ('-ulong', -MAX_UI),
+    ('2 words', MAX_UI << 64),
+    ('-2 words', -(MAX_UI << 64))]
+
+
+def best(f, number=20000, repeat=5):
+    """Return the best time per call of f, in nanoseconds."""
+    return min(timeit.repeat(f, number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    x = mpz(3) ** 100
+    print('%-8s' % '' + ''.join('%10s' % name for name, _ in OPERANDS))
+    for opname, op in OPERATORS:
+        row = ['%10.0f' % best(lambda: op(x, n)) for _, n in OPERANDS]
+        print('%-8s' % opname + ''.join(row))
+
+
+if __name__ == "__main__":
+    main()
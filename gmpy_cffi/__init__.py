@@ -1,15 +1,81 @@
-from .mpz import mpz
+import sys
+import types
+
+from .mpz import mpz, get_mpz_intern, set_mpz_intern
+from .xmpz import xmpz
+from .mpz_array import mpz_array
 from .mpq import mpq
-from .mpfr import mpfr, isinf, isnan
-from .mpc import mpc
-from .cache import get_cache, set_cache
+from .cache import (
+    get_cache, set_cache, get_cache_pool_budget, set_cache_pool_budget,
+    cache_stats, reset_cache_stats, set_cache_stats)
+from .memory import (
+    set_memory_tracking, get_memory_limit, set_memory_limit, memory_stats,
+    reset_memory_peak)
 from .convert import MAX_UI
-from .ntheory import is_prime, next_prime, gcd, gcdext, lcm, invert, jacobi, legendre, kronecker, fac, bincoef, fib, fib2, lucas, lucas2
-from .special_functions import (
-    log, log2, log10, exp, exp2, exp10, cos, sin, tan, sin_cos, sec, csc, cot,
-    acos, asin, atan, atan2, cosh, sinh, tanh, sinh_cosh, sech, csch, coth,
-    acosh, asinh, atanh, factorial, log1p, expm1, eint, li2, gamma, lngamma,
-    lgamma, digamma, zeta, erf, erfc, j0, j1, jn, y0, y1, yn, fma, fms, agm,
-    hypot, ai, const_log2, const_pi, const_euler, const_catalan)
+from .ntheory import is_prime, next_prime, gcd, gcdext, lcm, invert, addmul, submul, dot, jacobi, legendre, kronecker, fac, bincoef, fib, fib2, lucas, lucas2
 from .version import (
     __version__, version, mp_version, mpfr_version, mpc_version)
+
+
+# The MPFR and MPC types and functions are only imported on first access, so
+# that integer-only code does not pay for loading them.
+_lazy = {'mpfr': 'mpfr', 'isinf': 'mpfr', 'isnan': 'mpfr', 'mpc': 'mpc'}
+for _name in (
+        'log', 'log2', 'log10', 'exp', 'exp2', 'exp10', 'cos', 'sin', 'tan',
+        'sin_cos', 'sec', 'csc', 'cot', 'acos', 'asin', 'atan', 'atan2',
+        'cosh', 'sinh', 'tanh', 'sinh_cosh', 'sech', 'csch', 'coth', 'acosh',
+        'asinh', 'atanh', 'factorial', 'log1p', 'expm1', 'eint', 'li2',
+        'gamma', 'lngamma', 'lgamma', 'digamma', 'zeta', 'erf', 'erfc', 'j0',
+        'j1', 'jn', 'y0', 'y1', 'yn', 'fma', 'fms', 'agm', 'hypot', 'ai',
+        'const_log2', 'const_pi', 'const_euler', 'const_catalan'):
+    _lazy[_name] = 'special_functions'
+
+# A star-import doesn't go through __getattr__, so list the lazy names too
+__all__ = [
+    'mpz', 'get_mpz_intern', 'set_mpz_intern', 'xmpz', 'mpz_array', 'mpq',
+    'get_cache', 'set_cache', 'get_cache_pool_budget', 'set_cache_pool_budget',
+    'cache_stats', 'reset_cache_stats', 'set_cache_stats',
+    'set_memory_tracking', 'get_memory_limit', 'set_memory_limit',
+    'memory_stats', 'reset_memory_peak', 'MAX_UI', 'is_prime', 'next_prime',
+    'gcd', 'gcdext', 'lcm', 'invert', 'addmul', 'submul', 'dot', 'jacobi',
+    'legendre', 'kronecker', 'fac', 'bincoef', 'fib', 'fib2', 'lucas',
+    'lucas2', 'version', 'mp_version', 'mpfr_version', 'mpc_version',
+] + sorted(_lazy)
+
+
+def _import(module):
+    name = __name__ + '.' + module
+    __import__(name)
+    return sys.modules[name]
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, name):
+        try:
+            module = _lazy[name]
+        except KeyError:
+            raise AttributeError(
+                "module %r has no attribute %r" % (self.__name__, name))
+        value = getattr(_import(module), name)
+        types.ModuleType.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package, which would shadow
+        # the class of the same name (mpfr, mpc) exported from it.
+        if name in _lazy and isinstance(value, types.ModuleType):
+            return
+        types.ModuleType.__setattr__(self, name, value)
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_lazy))
+
+
+if sys.version_info >= (3, 5):
+    sys.modules[__name__].__class__ = _LazyModule
+else:
+    # Module classes can't be replaced, so import everything up front
+    for _name in set(_lazy.values()):
+        _import(_name)
+    for _name in _lazy:
+        globals()[_name] = getattr(_import(_lazy[_name]), _name)
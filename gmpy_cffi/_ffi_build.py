@@ -0,0 +1,891 @@
+"""
+Out-of-line (API mode) build script for the gmpy_cffi._gmpy_cffi extension.
+
+setup.py compiles this through ``cffi_modules``. To build the extension in
+place for development, run ``python gmpy_cffi/_ffi_build.py`` from the
+top-level directory.
+"""
+import cffi
+
+
+CDEF = """
+    const char * const gmp_version;
+
+    // MPZ
+    #define GMP_LIMB_BITS ...
+    #define GMP_NUMB_BITS ...
+
+    typedef struct { int _mp_alloc; int _mp_size; ...; } __mpz_struct;
+    typedef __mpz_struct *mpz_t;
+    typedef unsigned long mp_bitcnt_t;
+
+    void mpz_init (mpz_t x);
+    void mpz_init2 (mpz_t x, mp_bitcnt_t n);
+    void mpz_clear (mpz_t x);
+    void mpz_realloc2 (mpz_t x, mp_bitcnt_t n);
+
+    void mpz_set (mpz_t rop, const mpz_t op);
+    void mpz_set_ui (mpz_t rop, unsigned long int op);
+    void mpz_set_si (mpz_t rop, signed long int op);
+    void mpz_set_d (mpz_t rop, double op);
+    int mpz_set_str (mpz_t rop, char *str, int base);
+
+    unsigned long int mpz_get_ui (mpz_t op);
+    signed long int mpz_get_si (mpz_t op);
+    double mpz_get_d (mpz_t op);
+    char * mpz_get_str (char *str, int base, mpz_t op);
+    void mpz_import (mpz_t rop, size_t count, int order, size_t size, int endian, size_t nails, const void *op);
+    void * mpz_export (void *rop, size_t *countp, int order, size_t size, int endian, size_t nails, mpz_t op);
+    size_t mpz_size (const mpz_t op);
+    const void * mpz_limbs_read (const mpz_t x);
+
+    void mpz_add (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_add_ui (mpz_t rop, mpz_t op1, unsigned long int op2);
+    void mpz_sub (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_sub_ui (mpz_t rop, mpz_t op1, unsigned long int op2);
+    void mpz_ui_sub (mpz_t rop, unsigned long int op1, mpz_t op2);
+    void mpz_mul (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_mul_si (mpz_t rop, mpz_t op1, long int op2);
+    void mpz_mul_ui (mpz_t rop, mpz_t op1, unsigned long int op2);
+    void mpz_addmul (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_addmul_ui (mpz_t rop, mpz_t op1, unsigned long int op2);
+    void mpz_submul (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_submul_ui (mpz_t rop, mpz_t op1, unsigned long int op2);
+    void mpz_mul_2exp (mpz_t rop, mpz_t op1, mp_bitcnt_t op2);
+    void mpz_neg (mpz_t rop, mpz_t op);
+    void mpz_abs (mpz_t rop, mpz_t op);
+
+    void mpz_cdiv_q (mpz_t q, mpz_t n, mpz_t d);
+    unsigned long int mpz_cdiv_q_ui (mpz_t q, mpz_t n, unsigned long int d);
+    unsigned long int mpz_cdiv_r_ui (mpz_t r, mpz_t n, unsigned long int d);
+    unsigned long int mpz_cdiv_qr_ui (mpz_t q, mpz_t r, mpz_t n, unsigned long int d);
+
+    void mpz_fdiv_q (mpz_t q, mpz_t n, mpz_t d);
+    void mpz_fdiv_q_ui (mpz_t q, mpz_t n, unsigned long int d);
+    void mpz_fdiv_r (mpz_t r, mpz_t n, mpz_t d);
+    void mpz_fdiv_r_ui (mpz_t r, mpz_t n, unsigned long int d);
+    void mpz_fdiv_qr (mpz_t q, mpz_t r, mpz_t n, mpz_t d);
+    void mpz_fdiv_qr_ui (mpz_t q, mpz_t r, mpz_t n, unsigned long int d);
+    void mpz_fdiv_q_2exp (mpz_t q, mpz_t n, mp_bitcnt_t b);
+//    int mpz_divisible_ui_p (mpz_t n, unsigned long int d);
+
+    void mpz_tdiv_q (mpz_t q, const mpz_t n, const mpz_t d);
+    unsigned long int mpz_tdiv_ui (const mpz_t n, unsigned long int d);
+
+    void mpz_powm (mpz_t rop, mpz_t base, mpz_t exp, mpz_t mod);
+    void mpz_powm_ui (mpz_t rop, mpz_t base, unsigned long int exp, mpz_t mod);
+    void mpz_pow_ui (mpz_t rop, mpz_t base, unsigned long int exp);
+    void mpz_ui_pow_ui (mpz_t rop, unsigned long int base, unsigned long int exp);
+
+    int mpz_cmp (mpz_t op1, mpz_t op2);
+    int mpz_cmp_d (const mpz_t op1, double op2);
+    int mpz_cmp_si (mpz_t op1, signed long int op2);
+    int mpz_cmp_ui (mpz_t op1, unsigned long int op2);
+    int mpz_sgn (mpz_t op);
+
+    void mpz_and (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_ior (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_xor (mpz_t rop, mpz_t op1, mpz_t op2);
+    void mpz_com (mpz_t rop, mpz_t op);
+    int mpz_tstbit (mpz_t op, mp_bitcnt_t bit_index);
+    mp_bitcnt_t mpz_scan1 (mpz_t op, mp_bitcnt_t starting_bit);
+
+    int mpz_fits_ulong_p (mpz_t op);
+    int mpz_fits_slong_p (mpz_t op);
+    size_t mpz_sizeinbase (mpz_t op, int base);
+
+//    void mpz_bin_ui (mpz_t rop, mpz_t n, unsigned long int k);
+//    void mpz_bin_uiui (mpz_t rop, unsigned long int n, unsigned long int k);
+
+    // Number Theoretic Functions
+    int mpz_probab_prime_p (const mpz_t n, int reps);
+    void mpz_nextprime (mpz_t rop, const mpz_t op);
+    void mpz_gcd (mpz_t rop, const mpz_t op1, const mpz_t op2);
+    // unsigned long int mpz_gcd_ui (mpz_t rop, const mpz_t op1, unsigned long int op2);
+    void mpz_gcdext (mpz_t g, mpz_t s, mpz_t t, const mpz_t a, const mpz_t b);
+    void mpz_lcm (mpz_t rop, const mpz_t op1, const mpz_t op2);
+    // void mpz_lcm_ui (mpz_t rop, const mpz_t op1, unsigned long op2);
+    int mpz_invert (mpz_t rop, const mpz_t op1, const mpz_t op2);
+    int mpz_jacobi (const mpz_t a, const mpz_t b);
+    int mpz_legendre (const mpz_t a, const mpz_t p);
+    int mpz_kronecker (const mpz_t a, const mpz_t b);
+    // int mpz_kronecker_si (const mpz_t a, long b);
+    // int mpz_kronecker_ui (const mpz_t a, unsigned long b);
+    // int mpz_si_kronecker (long a, const mpz_t b);
+    // int mpz_ui_kronecker (unsigned long a, const mpz_t b);
+    void mpz_fac_ui (mpz_t rop, unsigned long int n);
+    // void mpz_2fac_ui (mpz_t rop, unsigned long int n);
+    // void mpz_mfac_uiui (mpz_t rop, unsigned long int n, unsigned long int m);
+    // void mpz_primorial_ui (mpz_t rop, unsigned long int n);
+    void mpz_bin_ui (mpz_t rop, const mpz_t n, unsigned long int k);
+    void mpz_bin_uiui (mpz_t rop, unsigned long int n, unsigned long int k);
+    void mpz_fib_ui (mpz_t fn, unsigned long int n);
+    void mpz_fib2_ui (mpz_t fn, mpz_t fnsub1, unsigned long int n);
+    void mpz_lucnum_ui (mpz_t ln, unsigned long int n);
+    void mpz_lucnum2_ui (mpz_t ln, mpz_t lnsub1, unsigned long int n);
+
+    // MPQ
+    typedef struct { __mpz_struct _mp_num; __mpz_struct _mp_den; ...; } __mpq_struct;
+    typedef __mpq_struct *mpq_t;
+
+    void mpq_init (mpq_t x);
+    void mpq_clear (mpq_t x);
+
+    void mpq_canonicalize (mpq_t op);
+
+    void mpq_set (mpq_t rop, const mpq_t op);
+    void mpq_set_z (mpq_t rop, const mpz_t op);
+    void mpq_set_ui (mpq_t rop, unsigned long int op1, unsigned long int op2);
+    void mpq_set_si (mpq_t rop, signed long int op1, unsigned long int op2);
+    int mpq_set_str (mpq_t rop, const char *str, int base);
+
+    void mpq_set_d (mpq_t rop, double op);
+    double mpq_get_d (mpq_t op);
+
+    mpz_t mpq_numref (const mpq_t op);
+    mpz_t mpq_denref (const mpq_t op);
+    size_t gmpy_cffi_mpq_limbs (const mpq_t op);
+    void mpq_get_num (mpz_t numerator, const mpq_t rational);
+    void mpq_get_den (mpz_t denominator, const mpq_t rational);
+    void mpq_set_num (mpq_t rational, const mpz_t numerator);
+    void mpq_set_den (mpq_t rational, const mpz_t denominator);
+
+    char * mpq_get_str (char *str, int base, const mpq_t op);
+
+    void mpq_add (mpq_t sum, const mpq_t addend1, const mpq_t addend2);
+    void mpq_sub (mpq_t difference, const mpq_t minuend, const mpq_t subtrahend);
+    void mpq_mul (mpq_t product, const mpq_t multiplier, const mpq_t multiplicand);
+    void mpq_mul_2exp (mpq_t rop, const mpq_t op1, mp_bitcnt_t op2);
+    void mpq_div (mpq_t quotient, const mpq_t dividend, const mpq_t divisor);
+    void mpq_div_2exp (mpq_t rop, const mpq_t op1, mp_bitcnt_t op2);
+    void mpq_neg (mpq_t negated_operand, const mpq_t operand);
+    void mpq_abs (mpq_t rop, const mpq_t op);
+    void mpq_inv (mpq_t inverted_number, const mpq_t number);
+
+    int mpq_cmp (const mpq_t op1, const mpq_t op2);
+    int mpq_cmp_ui (const mpq_t op1, unsigned long int num2, unsigned long int den2);
+    int mpq_cmp_si (const mpq_t op1, long int num2, unsigned long int den2);
+    int mpq_sgn (const mpq_t op);
+    int mpq_equal (const mpq_t op1, const mpq_t op2);
+
+    // Memory tracking (defined in SOURCE below, see memory.py)
+    void gmpy_cffi_track_memory (int enable);
+    long long gmpy_cffi_mem_live (void);
+    long long gmpy_cffi_mem_peak (void);
+    void gmpy_cffi_mem_reset_peak (void);
+
+    // Arrays of mpz_t (defined in SOURCE below, see mpz_array.py)
+    void gmpy_cffi_mpz_array_init (__mpz_struct *a, size_t n);
+    void gmpy_cffi_mpz_array_clear (__mpz_struct *a, size_t n);
+    void gmpy_cffi_mpz_array_set (__mpz_struct *a, const __mpz_struct *b, size_t n);
+    void gmpy_cffi_mpz_array_set_int64 (__mpz_struct *a, const int64_t *src, size_t n);
+    void gmpy_cffi_mpz_array_set_uint64 (__mpz_struct *a, const uint64_t *src, size_t n);
+    void gmpy_cffi_mpz_array_import (__mpz_struct *a, size_t n, const unsigned char *src, size_t size, int order, int is_signed);
+
+    // Elementwise operations: a stride of 0 repeats a scalar operand
+    typedef enum {
+        GMPY_CFFI_OP_ADD, GMPY_CFFI_OP_SUB, GMPY_CFFI_OP_MUL,
+        GMPY_CFFI_OP_FLOORDIV, GMPY_CFFI_OP_MOD, GMPY_CFFI_OP_POW,
+        GMPY_CFFI_OP_LSHIFT, GMPY_CFFI_OP_RSHIFT, GMPY_CFFI_OP_GCD,
+        GMPY_CFFI_OP_AND, GMPY_CFFI_OP_IOR, GMPY_CFFI_OP_XOR,
+        GMPY_CFFI_OP_NEG, GMPY_CFFI_OP_ABS
+    } gmpy_cffi_op;
+    int gmpy_cffi_mpz_array_binop (int op, __mpz_struct *r, const __mpz_struct *a, size_t astride, const __mpz_struct *b, size_t bstride, size_t n);
+    double gmpy_cffi_mpz_array_growth (int op, const __mpz_struct *r, const __mpz_struct *a, size_t astride, const __mpz_struct *b, size_t bstride, size_t n);
+    int gmpy_cffi_mpz_array_powm (__mpz_struct *r, const __mpz_struct *a, size_t astride, const __mpz_struct *e, size_t estride, const __mpz_struct *m, size_t mstride, size_t n);
+    void gmpy_cffi_mpz_array_cmp (_Bool *r, const __mpz_struct *a, size_t astride, const __mpz_struct *b, size_t bstride, size_t n, int lt, int eq, int gt);
+
+    // MPFR
+    const char * mpfr_get_version (void);
+
+    // FIXME - actual type depends on_MPFR_PREC_FORMAT
+    typedef long int mpfr_prec_t;
+
+    typedef struct { mpfr_prec_t _mpfr_prec; ...; } __mpfr_struct;
+    typedef __mpfr_struct *mpfr_t;
+    // FIXME - actual type depends on _MPFR_EXP_FORMAT
+    typedef long int mpfr_exp_t;
+
+    typedef enum {
+      MPFR_RNDN=0,  /* round to nearest, with ties to even */
+      MPFR_RNDZ,    /* round toward zero */
+      MPFR_RNDU,    /* round toward +Inf */
+      MPFR_RNDD,    /* round toward -Inf */
+      MPFR_RNDA,    /* round away from zero */
+      MPFR_RNDF,    /* faithful rounding (not implemented yet) */
+      MPFR_RNDNA=-1 /* round to nearest, with ties away from zero (mpfr_round) */
+    } mpfr_rnd_t;
+
+    void mpfr_init (mpfr_t x);
+    void mpfr_init2 (mpfr_t x, mpfr_prec_t prec);
+    void mpfr_clear (mpfr_t x);
+    void mpfr_set_default_prec (mpfr_prec_t prec);
+    mpfr_prec_t mpfr_get_default_prec (void);
+
+    void mpfr_set_prec (mpfr_t x, mpfr_prec_t prec);
+    mpfr_prec_t mpfr_get_prec (mpfr_t x);
+    int mpfr_sprintf (char *buf, const char *template, ...);
+    int mpfr_printf (const char *template, ...);
+    int mpfr_asprintf (char **str, const char *template, ...);
+
+    int mpfr_set (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_set_ui (mpfr_t rop, unsigned long int op, mpfr_rnd_t rnd);
+    int mpfr_set_si (mpfr_t rop, long int op, mpfr_rnd_t rnd);
+    // int mpfr_set_uj (mpfr_t rop, uintmax_t op, mpfr_rnd_t rnd);
+    // int mpfr_set_sj (mpfr_t rop, intmax_t op, mpfr_rnd_t rnd);
+    // int mpfr_set_flt (mpfr_t rop, float op, mpfr_rnd_t rnd);
+    int mpfr_set_d (mpfr_t rop, double op, mpfr_rnd_t rnd);
+    // int mpfr_set_ld (mpfr_t rop, long double op, mpfr_rnd_t rnd);
+    // int mpfr_set_decimal64 (mpfr_t rop, _Decimal64 op, mpfr_rnd_t rnd);
+    int mpfr_set_z (mpfr_t rop, mpz_t op, mpfr_rnd_t rnd);
+    int mpfr_set_q (mpfr_t rop, mpq_t op, mpfr_rnd_t rnd);
+    // int mpfr_set_f (mpfr_t rop, mpf_t op, mpfr_rnd_t rnd);
+    // int mpfr_set_ui_2exp (mpfr_t rop, unsigned long int op, mpfr_exp_t e, mpfr_rnd_t rnd);
+    // int mpfr_set_si_2exp (mpfr_t rop, long int op, mpfr_exp_t e, mpfr_rnd_t rnd);
+    // int mpfr_set_uj_2exp (mpfr_t rop, uintmax_t op, intmax_t e, mpfr_rnd_t rnd);
+    // int mpfr_set_sj_2exp (mpfr_t rop, intmax_t op, intmax_t e, mpfr_rnd_t rnd);
+    // int mpfr_set_z_2exp (mpfr_t rop, mpz_t op, mpfr_exp_t e, mpfr_rnd_t rnd);
+    int mpfr_set_str (mpfr_t rop, const char *s, int base, mpfr_rnd_t rnd);
+    // int mpfr_strtofr (mpfr_t rop, const char *nptr, char **endptr, int base, mpfr_rnd_t rnd);
+    // void mpfr_set_nan (mpfr_t x);
+    // void mpfr_set_inf (mpfr_t x, int sign);
+    void mpfr_set_zero (mpfr_t x, int sign);
+    // void mpfr_swap (mpfr_t x, mpfr_t y);
+
+    // float mpfr_get_flt (mpfr_t op, mpfr_rnd_t rnd);
+    double mpfr_get_d (mpfr_t op, mpfr_rnd_t rnd);
+    // long double mpfr_get_ld (mpfr_t op, mpfr_rnd_t rnd);
+    // _Decimal64 mpfr_get_decimal64 (mpfr_t op, mpfr_rnd_t rnd);
+    long mpfr_get_si (mpfr_t op, mpfr_rnd_t rnd);
+    unsigned long mpfr_get_ui (mpfr_t op, mpfr_rnd_t rnd);
+    // intmax_t mpfr_get_sj (mpfr_t op, mpfr_rnd_t rnd);
+    // uintmax_t mpfr_get_uj (mpfr_t op, mpfr_rnd_t rnd);
+    // double mpfr_get_d_2exp (long *exp, mpfr_t op, mpfr_rnd_t rnd);
+    // long double mpfr_get_ld_2exp (long *exp, mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_frexp (mpfr_exp_t *exp, mpfr_t y, mpfr_t x, mpfr_rnd_t rnd);
+    mpfr_exp_t mpfr_get_z_2exp (mpz_t rop, mpfr_t op);
+    int mpfr_get_z (mpz_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_get_f (mpf_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    char * mpfr_get_str (char *str, mpfr_exp_t *expptr, int b, size_t n, mpfr_t op, mpfr_rnd_t rnd);
+    void mpfr_free_str (char *str);
+    int mpfr_fits_ulong_p (mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_fits_slong_p (mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_fits_uint_p (mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_fits_sint_p (mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_fits_ushort_p (mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_fits_sshort_p (mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_fits_uintmax_p (mpfr_t op, mpfr_rnd_t rnd);
+    // int mpfr_fits_intmax_p (mpfr_t op, mpfr_rnd_t rnd);
+
+    /* Comparison functions */
+    int mpfr_cmp (mpfr_t op1, mpfr_t op2);
+    int mpfr_cmp_ui (mpfr_t op1, unsigned long int op2);
+    int mpfr_cmp_si (mpfr_t op1, long int op2);
+    int mpfr_cmp_d (mpfr_t op1, double op2);
+    // int mpfr_cmp_ld (mpfr_t op1, long double op2);
+    int mpfr_cmp_z (mpfr_t op1, mpz_t op2);
+    int mpfr_cmp_q (mpfr_t op1, mpq_t op2);
+    // int mpfr_cmp_f (mpfr_t op1, mpf_t op2);
+    // int mpfr_cmp_ui_2exp (mpfr_t op1, unsigned long int op2, mpfr_exp_t e);
+    // int mpfr_cmp_si_2exp (mpfr_t op1, long int op2, mpfr_exp_t e);
+    // int mpfr_cmpabs (mpfr_t op1, mpfr_t op2);
+    int mpfr_nan_p (mpfr_t op);
+    int mpfr_inf_p (mpfr_t op);
+    int mpfr_number_p (mpfr_t op);
+    int mpfr_zero_p (mpfr_t op);
+    int mpfr_regular_p (mpfr_t op);
+    // int mpfr_sgn (mpfr_t op);
+    // int mpfr_greater_p (mpfr_t op1, mpfr_t op2);
+    // int mpfr_greaterequal_p (mpfr_t op1, mpfr_t op2);
+    // int mpfr_less_p (mpfr_t op1, mpfr_t op2);
+    // int mpfr_lessequal_p (mpfr_t op1, mpfr_t op2);
+    // int mpfr_equal_p (mpfr_t op1, mpfr_t op2);
+    // int mpfr_unordered_p (mpfr_t op1, mpfr_t op2);
+    // int mpfr_lessgreater_p (mpfr_t op1, mpfr_t op2);
+
+    int mpfr_signbit (mpfr_t op);
+
+    // void mpfr_set_default_rounding_mode (mpfr_rnd_t rnd);
+    // mpfr_rnd_t mpfr_get_default_rounding_mode (void);
+    int mpfr_prec_round (mpfr_t x, mpfr_prec_t prec, mpfr_rnd_t rnd);
+    // mpfr_can_round (mpfr_t b, mpfr_exp_t err, mpfr_rnd_t rnd1, mpfr_rnd_t rnd2, mpfr_prec_t prec);
+    mpfr_prec_t mpfr_min_prec (mpfr_t x);
+    // char * mpfr_print_rnd_mode (mpfr_rnd_t rnd);
+
+    #define MPFR_PREC_MIN ...
+    #define MPFR_PREC_MAX ...
+
+    /* Math functions */
+    int mpfr_add (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_add_ui (mpfr_t rop, mpfr_t op1, unsigned long int op2, mpfr_rnd_t rnd);
+    int mpfr_add_si (mpfr_t rop, mpfr_t op1, long int op2, mpfr_rnd_t rnd);
+    int mpfr_add_d (mpfr_t rop, mpfr_t op1, double op2, mpfr_rnd_t rnd);
+    int mpfr_add_z (mpfr_t rop, mpfr_t op1, mpz_t op2, mpfr_rnd_t rnd);
+    int mpfr_add_q (mpfr_t rop, mpfr_t op1, mpq_t op2, mpfr_rnd_t rnd);
+    int mpfr_sub (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_sub_ui (mpfr_t rop, mpfr_t op1, unsigned long int op2, mpfr_rnd_t rnd);
+    int mpfr_sub_si (mpfr_t rop, mpfr_t op1, long int op2, mpfr_rnd_t rnd);
+    int mpfr_sub_d (mpfr_t rop, mpfr_t op1, double op2, mpfr_rnd_t rnd);
+    int mpfr_sub_z (mpfr_t rop, mpfr_t op1, mpz_t op2, mpfr_rnd_t rnd);
+    int mpfr_sub_q (mpfr_t rop, mpfr_t op1, mpq_t op2, mpfr_rnd_t rnd);
+    int mpfr_ui_sub(mpfr_t rop, unsigned long int op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_si_sub(mpfr_t rop, long int op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_d_sub (mpfr_t rop, double op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_z_sub (mpfr_t rop, mpz_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_neg (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_abs (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_mul (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_mul_ui (mpfr_t rop, mpfr_t op1, unsigned long int op2, mpfr_rnd_t rnd);
+    int mpfr_mul_si (mpfr_t rop, mpfr_t op1, long int op2, mpfr_rnd_t rnd);
+    int mpfr_mul_d (mpfr_t rop, mpfr_t op1, double op2, mpfr_rnd_t rnd);
+    int mpfr_mul_z (mpfr_t rop, mpfr_t op1, mpz_t op2, mpfr_rnd_t rnd);
+    int mpfr_mul_q (mpfr_t rop, mpfr_t op1, mpq_t op2, mpfr_rnd_t rnd);
+    int mpfr_div (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_div_ui (mpfr_t rop, mpfr_t op1, unsigned long int op2, mpfr_rnd_t rnd);
+    int mpfr_div_si (mpfr_t rop, mpfr_t op1, long int op2, mpfr_rnd_t rnd);
+    int mpfr_div_d (mpfr_t rop, mpfr_t op1, double op2, mpfr_rnd_t rnd);
+    int mpfr_div_z (mpfr_t rop, mpfr_t op1, mpz_t op2, mpfr_rnd_t rnd);
+    int mpfr_div_q (mpfr_t rop, mpfr_t op1, mpq_t op2, mpfr_rnd_t rnd);
+    int mpfr_ui_div (mpfr_t rop, unsigned long int op2, mpfr_t op1, mpfr_rnd_t rnd);
+    int mpfr_si_div (mpfr_t rop, long int op2, mpfr_t op1, mpfr_rnd_t rnd);
+    int mpfr_d_div (mpfr_t rop, double op2, mpfr_t op1, mpfr_rnd_t rnd);
+    int mpfr_pow (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_pow_ui (mpfr_t rop, mpfr_t op1, unsigned long int op2, mpfr_rnd_t rnd);
+    int mpfr_pow_si (mpfr_t rop, mpfr_t op1, long int op2, mpfr_rnd_t rnd);
+    int mpfr_pow_z (mpfr_t rop, mpfr_t op1, mpz_t op2, mpfr_rnd_t rnd);
+
+    int mpfr_floor(mpfr_t rop, mpfr_t op);
+    int mpfr_ceil(mpfr_t rop, mpfr_t op);
+    int mpfr_trunc(mpfr_t rop, mpfr_t op);
+    // int mpfr_round(mpfr_t rop, mpfr_t op);
+
+    /* Special functions */
+    int mpfr_log (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_log2 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_log10 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_exp (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_exp2 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_exp10 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_cos (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_sin (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_tan (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_sin_cos (mpfr_t sop, mpfr_t cop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_sec (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_csc (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_cot (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_acos (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_asin (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_atan (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_atan2 (mpfr_t rop, mpfr_t y, mpfr_t x, mpfr_rnd_t rnd);
+    int mpfr_cosh (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_sinh (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_tanh (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_sinh_cosh (mpfr_t sop, mpfr_t cop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_sech (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_csch (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_coth (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_acosh (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_asinh (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_atanh (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_fac_ui (mpfr_t rop, unsigned long int op, mpfr_rnd_t rnd);
+    int mpfr_log1p (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_expm1 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_eint (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_li2 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_gamma (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_lngamma (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_lgamma (mpfr_t rop, int *signp, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_digamma (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_zeta (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_zeta_ui (mpfr_t rop, unsigned long op, mpfr_rnd_t rnd);
+    int mpfr_erf (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_erfc (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_j0 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_j1 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_jn (mpfr_t rop, long n, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_y0 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_y1 (mpfr_t rop, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_yn (mpfr_t rop, long n, mpfr_t op, mpfr_rnd_t rnd);
+    int mpfr_fma (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_t op3, mpfr_rnd_t rnd);
+    int mpfr_fms (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_t op3, mpfr_rnd_t rnd);
+    int mpfr_agm (mpfr_t rop, mpfr_t op1, mpfr_t op2, mpfr_rnd_t rnd);
+    int mpfr_hypot (mpfr_t rop, mpfr_t x, mpfr_t y, mpfr_rnd_t rnd);
+    int mpfr_ai (mpfr_t rop, mpfr_t x, mpfr_rnd_t rnd);
+    int mpfr_const_log2 (mpfr_t rop, mpfr_rnd_t rnd);
+    int mpfr_const_pi (mpfr_t rop, mpfr_rnd_t rnd);
+    int mpfr_const_euler (mpfr_t rop, mpfr_rnd_t rnd);
+    int mpfr_const_catalan (mpfr_t rop, mpfr_rnd_t rnd);
+    // void mpfr_free_cache (void);
+    // int mpfr_sum (mpfr_t rop, mpfr_ptr const tab[], unsigned long int n, mpfr_rnd_t rnd);
+
+    // MPC
+    const char * mpc_get_version (void);
+
+    typedef struct { ...; } __mpc_struct;
+    typedef __mpc_struct *mpc_t;
+
+    typedef int mpc_rnd_t;
+
+    #define MPC_RNDNN ...
+    #define MPC_RNDNZ ...
+    #define MPC_RNDNU ...
+    #define MPC_RNDND ...
+    #define MPC_RNDZN ...
+    #define MPC_RNDZZ ...
+    #define MPC_RNDZU ...
+    #define MPC_RNDZD ...
+    #define MPC_RNDUN ...
+    #define MPC_RNDUZ ...
+    #define MPC_RNDUU ...
+    #define MPC_RNDUD ...
+    #define MPC_RNDDN ...
+    #define MPC_RNDDZ ...
+    #define MPC_RNDDU ...
+    #define MPC_RNDDD ...
+
+    void mpc_init2 (mpc_t z, mpfr_prec_t prec);
+    void mpc_init3 (mpc_t z, mpfr_prec_t prec_r, mpfr_prec_t prec_i);
+    void mpc_clear (mpc_t z);
+    void mpc_set_prec (mpc_t x, mpfr_prec_t prec);
+    // mpfr_prec_t mpc_get_prec (mpc_t x);
+    void mpc_get_prec2 (mpfr_prec_t* pr, mpfr_prec_t* pi, mpc_t x);
+
+    int mpc_set (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_set_ui (mpc_t rop, unsigned long int op, mpc_rnd_t rnd);
+    int mpc_set_si (mpc_t rop, long int op, mpc_rnd_t rnd);
+    // int mpc_set_uj (mpc_t rop, uintmax_t op, mpc_rnd_t rnd);
+    // int mpc_set_sj (mpc_t rop, intmax_t op, mpc_rnd_t rnd);
+    int mpc_set_d (mpc_t rop, double op, mpc_rnd_t rnd);
+    // int mpc_set_ld (mpc_t rop, long double op, mpc_rnd_t rnd);
+    // int mpc_set_dc (mpc_t rop, double _Complex op, mpc_rnd_t rnd);
+    // int mpc_set_ldc (mpc_t rop, long double _Complex op, mpc_rnd_t rnd);
+    int mpc_set_z (mpc_t rop, mpz_t op, mpc_rnd_t rnd);
+    int mpc_set_q (mpc_t rop, mpq_t op, mpc_rnd_t rnd);
+    // int mpc_set_f (mpc_t rop, mpf_t op, mpc_rnd_t rnd);
+    int mpc_set_fr (mpc_t rop, mpfr_t op, mpc_rnd_t rnd);
+
+    // int mpc_set_ui_ui (mpc_t rop, unsigned long int op1, unsigned long int op2, mpc_rnd_t rnd);
+    // int mpc_set_si_si (mpc_t rop, long int op1, long int op2, mpc_rnd_t rnd);
+    // int mpc_set_uj_uj (mpc_t rop, uintmax_t op1, uintmax_t op2, mpc_rnd_t rnd);
+    // int mpc_set_sj_sj (mpc_t rop, intmax_t op1, intmax_t op2, mpc_rnd_t rnd)
+    int mpc_set_d_d (mpc_t rop, double op1, double op2, mpc_rnd_t rnd);
+    // int mpc_set_ld_ld (mpc_t rop, long double op1, long double op2, mpc_rnd_t rnd);
+    // int mpc_set_z_z (mpc_t rop, mpz_t op1, mpz_t op2, mpc_rnd_t rnd);
+    // int mpc_set_q_q (mpc_t rop, mpq_t op1, mpq_t op2, mpc_rnd_t rnd);
+    // int mpc_set_f_f (mpc_t rop, mpf_t op1, mpf_t op2, mpc_rnd_t rnd);
+    // int mpc_set_fr_fr (mpc_t rop, mpfr_t op1, mpfr_t op2, mpc_rnd_t rnd);
+    // void mpc_set_nan (mpc_t rop);
+    // void mpc_swap (mpc_t op1, mpc_t op2);
+
+    // double _Complex mpc_get_dc (mpc_t op, mpc_rnd_t rnd);
+    // long double _Complex mpc_get_ldc (mpc_t op, mpc_rnd_t rnd);
+
+    // int mpc_strtoc (mpc_t rop, const char *nptr, char **endptr, int base, mpc_rnd_t rnd);
+    int mpc_set_str (mpc_t rop, const char *s, int base, mpc_rnd_t rnd);
+    char * mpc_get_str (int b, size_t n, mpc_t op, mpc_rnd_t rnd);
+    void mpc_free_str (char *str);
+    // int mpc_inp_str (mpc_t rop, FILE *stream, size_t *read, int base, mpc_rnd_t rnd);
+    // size_t mpc_out_str (FILE *stream, int base, size_t n_digits, mpc_t op, mpc_rnd_t rnd);
+
+    int mpc_real (mpfr_t rop, mpc_t op, mpfr_rnd_t rnd);
+    int mpc_imag (mpfr_t rop, mpc_t op, mpfr_rnd_t rnd);
+    mpfr_t mpc_realref (mpc_t op);
+    mpfr_t mpc_imagref (mpc_t op);
+    size_t gmpy_cffi_mpc_limbs (mpc_t op);
+
+    int mpc_cmp (mpc_t op1, mpc_t op2);
+    // int mpc_cmp_si_si (mpc_t op1, long int op2r , long int op2i);
+    // int mpc_cmp_si (mpc_t op1 , long int op2);
+
+    int mpc_add (mpc_t rop, mpc_t op1, mpc_t op2 , mpc_rnd_t rnd);
+    int mpc_add_ui (mpc_t rop, mpc_t op1, unsigned long int op2, mpc_rnd_t rnd);
+    int mpc_add_fr (mpc_t rop, mpc_t op1, mpfr_t op2, mpc_rnd_t rnd);
+    int mpc_sub (mpc_t rop , mpc_t op1 , mpc_t op2 , mpc_rnd_t rnd);
+    int mpc_sub_fr (mpc_t rop , mpc_t op1 , mpfr_t op2 , mpc_rnd_t rnd);
+    int mpc_fr_sub (mpc_t rop , mpfr_t op1 , mpc_t op2 , mpc_rnd_t rnd);
+    int mpc_sub_ui (mpc_t rop , mpc_t op1 , unsigned long int op2 , mpc_rnd_t rnd);
+    int mpc_ui_sub (mpc_t rop , unsigned long int op1 , mpc_t op2 , mpc_rnd_t rnd);
+    int mpc_mul (mpc_t rop, mpc_t op1, mpc_t op2, mpc_rnd_t rnd);
+    int mpc_mul_ui (mpc_t rop, mpc_t op1, unsigned long int op2, mpc_rnd_t rnd);
+    int mpc_mul_si (mpc_t rop, mpc_t op1, long int op2, mpc_rnd_t rnd);
+    int mpc_mul_fr (mpc_t rop, mpc_t op1, mpfr_t op2, mpc_rnd_t rnd);
+
+    int mpc_div (mpc_t rop, mpc_t op1, mpc_t op2, mpc_rnd_t rnd);
+    int mpc_div_ui (mpc_t rop, mpc_t op1, unsigned long int op2, mpc_rnd_t rnd);
+    int mpc_div_fr (mpc_t rop, mpc_t op1, mpfr_t op2, mpc_rnd_t rnd);
+    int mpc_ui_div (mpc_t rop, unsigned long int op1, mpc_t op2, mpc_rnd_t rnd);
+    int mpc_fr_div (mpc_t rop, mpfr_t op1, mpc_t op2, mpc_rnd_t rnd);
+
+    int mpc_pow (mpc_t rop , mpc_t op1 , mpc_t op2 , mpc_rnd_t rnd);
+    int mpc_pow_d (mpc_t rop , mpc_t op1 , double op2 , mpc_rnd_t rnd);
+    int mpc_pow_ld (mpc_t rop , mpc_t op1 , long double op2 , mpc_rnd_t rnd);
+    int mpc_pow_si (mpc_t rop , mpc_t op1 , long op2 , mpc_rnd_t rnd);
+    int mpc_pow_ui (mpc_t rop , mpc_t op1 , unsigned long op2 , mpc_rnd_t rnd);
+    int mpc_pow_z (mpc_t rop , mpc_t op1 , mpz_t op2 , mpc_rnd_t rnd);
+    int mpc_pow_fr (mpc_t rop , mpc_t op1 , mpfr_t op2 , mpc_rnd_t rnd);
+    int mpc_abs (mpfr_t rop , mpc_t op , mpfr_rnd_t rnd);
+    int mpc_neg (mpc_t rop , mpc_t op , mpc_rnd_t rnd);
+
+    int mpc_fma (mpc_t rop, mpc_t op1, mpc_t op2, mpc_t op3, mpc_rnd_t rnd);
+    int mpc_exp (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_log (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    // Requires mpc >= 1.0.1
+    // int mpc_log10 (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_sin (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_cos (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_sin_cos (mpc_t rop_sin, mpc_t rop_cos, mpc_t op, mpc_rnd_t rnd_sin, mpc_rnd_t rnd_cos);
+    int mpc_tan (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+
+    int mpc_sinh (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_cosh (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_tanh (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_asin (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_acos (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_atan (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_asinh (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_acosh (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+    int mpc_atanh (mpc_t rop, mpc_t op, mpc_rnd_t rnd);
+"""
+
+SOURCE = """
+    #include <stdio.h>
+    #include <stdlib.h>
+    #include <stdint.h>
+    #include <limits.h>
+    #include <gmp.h>
+    #include <mpfr.h>
+    #include <mpc.h>
+
+    /* Memory tracking: when enabled, GMP (and so MPFR and MPC) allocates
+       through these functions, which count the live bytes. They wrap
+       malloc, realloc and free just like GMP's default functions, so memory
+       allocated by one set can be freed by the other. */
+
+    #if defined(__GNUC__)
+    #define GMPY_CFFI_LOAD(v) __atomic_load_n(&(v), __ATOMIC_RELAXED)
+    #define GMPY_CFFI_CAS(v, old, new) __atomic_compare_exchange_n( \
+        &(v), &(old), (new), 1, __ATOMIC_RELAXED, __ATOMIC_RELAXED)
+    #else
+    #define GMPY_CFFI_LOAD(v) (v)
+    #define GMPY_CFFI_CAS(v, old, new) ((v) = (new), 1)
+    #endif
+
+    static long long gmpy_cffi_live = 0;
+    static long long gmpy_cffi_peak = 0;
+
+    static void gmpy_cffi_count(long long n)
+    {
+        long long live = GMPY_CFFI_LOAD(gmpy_cffi_live), next, peak;
+        /* Memory allocated before tracking started is freed (or shrunk)
+           through these functions too, which would take the count below
+           0 and let the limit be exceeded: clamp it at 0. */
+        do {
+            next = live + n;
+            if (next < 0)
+                next = 0;
+        } while (!GMPY_CFFI_CAS(gmpy_cffi_live, live, next));
+        peak = GMPY_CFFI_LOAD(gmpy_cffi_peak);
+        while (next > peak && !GMPY_CFFI_CAS(gmpy_cffi_peak, peak, next))
+            ;
+    }
+
+    static void gmpy_cffi_out_of_memory(size_t n)
+    {
+        fprintf(stderr, "GNU MP: Cannot allocate memory (size=%lu)\\n",
+                (unsigned long) n);
+        abort();
+    }
+
+    static void *gmpy_cffi_alloc(size_t n)
+    {
+        void *p = malloc(n);
+        if (p == NULL)
+            gmpy_cffi_out_of_memory(n);
+        gmpy_cffi_count((long long) n);
+        return p;
+    }
+
+    static void *gmpy_cffi_realloc(void *p, size_t old, size_t n)
+    {
+        p = realloc(p, n);
+        if (p == NULL)
+            gmpy_cffi_out_of_memory(n);
+        gmpy_cffi_count((long long) n - (long long) old);
+        return p;
+    }
+
+    static void gmpy_cffi_free(void *p, size_t n)
+    {
+        free(p);
+        gmpy_cffi_count(-(long long) n);
+    }
+
+    void gmpy_cffi_track_memory(int enable)
+    {
+        if (enable) {
+            gmpy_cffi_live = gmpy_cffi_peak = 0;
+            mp_set_memory_functions(
+                gmpy_cffi_alloc, gmpy_cffi_realloc, gmpy_cffi_free);
+        }
+        else
+            mp_set_memory_functions(NULL, NULL, NULL);
+    }
+
+    long long gmpy_cffi_mem_live(void)
+    {
+        return gmpy_cffi_live;
+    }
+
+    long long gmpy_cffi_mem_peak(void)
+    {
+        return gmpy_cffi_peak;
+    }
+
+    void gmpy_cffi_mem_reset_peak(void)
+    {
+        gmpy_cffi_peak = gmpy_cffi_live;
+    }
+
+    /* Arrays of mpz_t: bulk initialisation and conversion, one call per
+       array instead of one per element. */
+
+    void gmpy_cffi_mpz_array_init(__mpz_struct *a, size_t n)
+    {
+        size_t i;
+        for (i = 0; i < n; i++)
+            mpz_init(&a[i]);
+    }
+
+    void gmpy_cffi_mpz_array_clear(__mpz_struct *a, size_t n)
+    {
+        size_t i;
+        for (i = 0; i < n; i++)
+            mpz_clear(&a[i]);
+    }
+
+    void gmpy_cffi_mpz_array_set(__mpz_struct *a, const __mpz_struct *b,
+                                 size_t n)
+    {
+        size_t i;
+        for (i = 0; i < n; i++)
+            mpz_set(&a[i], &b[i]);
+    }
+
+    static void gmpy_cffi_mpz_set_uint64(mpz_ptr z, uint64_t v)
+    {
+    #if ULONG_MAX >= UINT64_MAX
+        mpz_set_ui(z, (unsigned long) v);
+    #else
+        mpz_import(z, 1, 1, sizeof(v), 0, 0, &v);
+    #endif
+    }
+
+    void gmpy_cffi_mpz_array_set_int64(__mpz_struct *a, const int64_t *src,
+                                       size_t n)
+    {
+        size_t i;
+        for (i = 0; i < n; i++) {
+    #if LONG_MAX >= INT64_MAX
+            mpz_set_si(&a[i], (long) src[i]);
+    #else
+            if (src[i] < 0) {
+                gmpy_cffi_mpz_set_uint64(&a[i], -(uint64_t) src[i]);
+                mpz_neg(&a[i], &a[i]);
+            }
+            else
+                gmpy_cffi_mpz_set_uint64(&a[i], (uint64_t) src[i]);
+    #endif
+        }
+    }
+
+    void gmpy_cffi_mpz_array_set_uint64(__mpz_struct *a, const uint64_t *src,
+                                        size_t n)
+    {
+        size_t i;
+        for (i = 0; i < n; i++)
+            gmpy_cffi_mpz_set_uint64(&a[i], src[i]);
+    }
+
+    /* Set a[i] from the i-th size-byte integer in src, with the most
+       significant byte first if order is 1 or last if it is -1, and in
+       two's complement if is_signed. */
+    void gmpy_cffi_mpz_array_import(__mpz_struct *a, size_t n,
+                                    const unsigned char *src, size_t size,
+                                    int order, int is_signed)
+    {
+        size_t i;
+        mpz_t bias;
+        mpz_init(bias);
+        mpz_setbit(bias, 8 * size);
+        for (i = 0; i < n; i++) {
+            const unsigned char *p = src + i * size;
+            mpz_import(&a[i], size, order, 1, 0, 0, p);
+            if (is_signed && size && (p[order > 0 ? 0 : size - 1] & 0x80))
+                mpz_sub(&a[i], &a[i], bias);
+        }
+        mpz_clear(bias);
+    }
+
+    /* Elementwise operations, r[i] = a[i] op b[i]. A stride of 0 repeats
+       the same operand for every element. r may be a or b. The operands
+       are checked before anything is written: the result is 0 on success,
+       1 for a zero divisor or modulus, 2 for a negative exponent or shift
+       count and 3 for one that does not fit an unsigned long. */
+
+    typedef enum {
+        GMPY_CFFI_OP_ADD, GMPY_CFFI_OP_SUB, GMPY_CFFI_OP_MUL,
+        GMPY_CFFI_OP_FLOORDIV, GMPY_CFFI_OP_MOD, GMPY_CFFI_OP_POW,
+        GMPY_CFFI_OP_LSHIFT, GMPY_CFFI_OP_RSHIFT, GMPY_CFFI_OP_GCD,
+        GMPY_CFFI_OP_AND, GMPY_CFFI_OP_IOR, GMPY_CFFI_OP_XOR,
+        GMPY_CFFI_OP_NEG, GMPY_CFFI_OP_ABS
+    } gmpy_cffi_op;
+
+    static int gmpy_cffi_mpz_array_check(int op, const __mpz_struct *b,
+                                         size_t bstride, size_t n)
+    {
+        size_t i, count = bstride ? n : (n > 0);
+        for (i = 0; i < count; i++) {
+            const __mpz_struct *y = &b[i * bstride];
+            switch (op) {
+            case GMPY_CFFI_OP_FLOORDIV:
+            case GMPY_CFFI_OP_MOD:
+                if (mpz_sgn(y) == 0)
+                    return 1;
+                break;
+            case GMPY_CFFI_OP_POW:
+            case GMPY_CFFI_OP_LSHIFT:
+            case GMPY_CFFI_OP_RSHIFT:
+                if (mpz_sgn(y) < 0)
+                    return 2;
+                if (!mpz_fits_ulong_p(y))
+                    return 3;
+                break;
+            }
+        }
+        return 0;
+    }
+
+    /* A lower bound for the number of limbs that op (POW or LSHIFT) adds to
+       r, summed over the elements, or 0 if b has an invalid exponent or
+       shift count (binop reports it). A double, as the sum may not fit
+       in a size_t. */
+    double gmpy_cffi_mpz_array_growth(int op, const __mpz_struct *r,
+                                      const __mpz_struct *a, size_t astride,
+                                      const __mpz_struct *b, size_t bstride,
+                                      size_t n)
+    {
+        size_t i;
+        double total = 0, limbs;
+        if (gmpy_cffi_mpz_array_check(op, b, bstride, n))
+            return 0;
+        for (i = 0; i < n; i++) {
+            const __mpz_struct *x = &a[i * astride], *y = &b[i * bstride];
+            if (op == GMPY_CFFI_OP_POW)
+                limbs = (double)(mpz_sizeinbase(x, 2) - 1) * mpz_get_ui(y) /
+                        GMP_NUMB_BITS + 1;
+            else if (mpz_sgn(x) == 0)
+                continue;
+            else
+                limbs = mpz_size(x) + mpz_get_ui(y) / GMP_NUMB_BITS + 1;
+            if (limbs > r[i]._mp_alloc)
+                total += limbs - r[i]._mp_alloc;
+        }
+        return total;
+    }
+
+    int gmpy_cffi_mpz_array_binop(int op, __mpz_struct *r,
+                                  const __mpz_struct *a, size_t astride,
+                                  const __mpz_struct *b, size_t bstride,
+                                  size_t n)
+    {
+        size_t i;
+        int err = gmpy_cffi_mpz_array_check(op, b, bstride, n);
+        if (err)
+            return err;
+        for (i = 0; i < n; i++) {
+            const __mpz_struct *x = &a[i * astride], *y = &b[i * bstride];
+            switch (op) {
+            case GMPY_CFFI_OP_ADD: mpz_add(&r[i], x, y); break;
+            case GMPY_CFFI_OP_SUB: mpz_sub(&r[i], x, y); break;
+            case GMPY_CFFI_OP_MUL: mpz_mul(&r[i], x, y); break;
+            case GMPY_CFFI_OP_FLOORDIV: mpz_fdiv_q(&r[i], x, y); break;
+            case GMPY_CFFI_OP_MOD: mpz_fdiv_r(&r[i], x, y); break;
+            case GMPY_CFFI_OP_POW: mpz_pow_ui(&r[i], x, mpz_get_ui(y)); break;
+            case GMPY_CFFI_OP_LSHIFT:
+                mpz_mul_2exp(&r[i], x, mpz_get_ui(y));
+                break;
+            case GMPY_CFFI_OP_RSHIFT:
+                mpz_fdiv_q_2exp(&r[i], x, mpz_get_ui(y));
+                break;
+            case GMPY_CFFI_OP_GCD: mpz_gcd(&r[i], x, y); break;
+            case GMPY_CFFI_OP_AND: mpz_and(&r[i], x, y); break;
+            case GMPY_CFFI_OP_IOR: mpz_ior(&r[i], x, y); break;
+            case GMPY_CFFI_OP_XOR: mpz_xor(&r[i], x, y); break;
+            case GMPY_CFFI_OP_NEG: mpz_neg(&r[i], x); break;
+            case GMPY_CFFI_OP_ABS: mpz_abs(&r[i], x); break;
+            }
+        }
+        return 0;
+    }
+
+    int gmpy_cffi_mpz_array_powm(__mpz_struct *r,
+                                 const __mpz_struct *a, size_t astride,
+                                 const __mpz_struct *e, size_t estride,
+                                 const __mpz_struct *m, size_t mstride,
+                                 size_t n)
+    {
+        size_t i;
+        for (i = 0; i < (mstride ? n : (n > 0)); i++)
+            if (mpz_sgn(&m[i * mstride]) == 0)
+                return 1;
+        for (i = 0; i < (estride ? n : (n > 0)); i++)
+            if (mpz_sgn(&e[i * estride]) < 0)
+                return 2;
+        for (i = 0; i < n; i++)
+            mpz_powm(&r[i], &a[i * astride], &e[i * estride],
+                     &m[i * mstride]);
+        return 0;
+    }
+
+    /* r[i] = lt, eq or gt as a[i] is less than, equal to or greater than
+       b[i]. */
+    void gmpy_cffi_mpz_array_cmp(_Bool *r,
+                                 const __mpz_struct *a, size_t astride,
+                                 const __mpz_struct *b, size_t bstride,
+                                 size_t n, int lt, int eq, int gt)
+    {
+        size_t i;
+        for (i = 0; i < n; i++) {
+            int c = mpz_cmp(&a[i * astride], &b[i * bstride]);
+            r[i] = c < 0 ? lt : c > 0 ? gt : eq;
+        }
+    }
+
+    /* The number of limbs allocated for the numerator and denominator of
+       op, for the object cache. */
+    size_t gmpy_cffi_mpq_limbs(const mpq_t op)
+    {
+        return mpq_numref(op)->_mp_alloc + mpq_denref(op)->_mp_alloc;
+    }
+
+    /* The number of limbs of the real and imaginary parts of op, for the
+       object cache. */
+    size_t gmpy_cffi_mpc_limbs(mpc_t op)
+    {
+        return (mpfr_get_prec(mpc_realref(op)) + GMP_NUMB_BITS - 1) /
+               GMP_NUMB_BITS +
+               (mpfr_get_prec(mpc_imagref(op)) + GMP_NUMB_BITS - 1) /
+               GMP_NUMB_BITS;
+    }
+"""
+
+LIBRARIES = ['gmp', 'mpfr', 'mpc']
+
+
+ffibuilder = cffi.FFI()
+ffibuilder.cdef(CDEF)
+ffibuilder.set_source('gmpy_cffi._gmpy_cffi', SOURCE, libraries=LIBRARIES)
+
+
+if __name__ == '__main__':
+    ffibuilder.compile(verbose=True)
@@ -1,7 +1,10 @@
 import sys
+import threading
+import weakref
 
 
 from gmpy_cffi.interface import ffi, gmp
+from gmpy_cffi import memory
 
 
 if sys.version > '3':
@@ -11,6 +14,7 @@ if sys.version > '3':
 
 cache_size = 100
 cache_obsize = 128
+cache_pool_budget = 1 << 20
 
 
 def get_cache():
@@ -43,117 +47,486 @@ def set_cache(size, obsize):
 
     cache_size = size
     cache_obsize = obsize
-    _init_mpz_cache()
-    _init_mpq_cache()
-    _init_mpfr_cache()
+    _trim()
 
 
-# MPZ
-def _init_mpz_cache():
-    global mpz_cache, in_mpz_cache
-    mpz_cache = []
-    in_mpz_cache = cache_size
-    for _ in xrange(cache_size):
-        mpz = ffi.new("mpz_t")
-        gmp.mpz_init(mpz)
-        mpz_cache.append(mpz)
-_init_mpz_cache()
+def get_cache_pool_budget():
+    """
+    get_cache_pool_budget() -> bytes or None
+
+    Return the maximum number of bytes of limb data kept in each cache pool,
+    or None if there is no limit.
+    """
+    return cache_pool_budget
 
 
-def _new_mpz():
-    """Return an initialized mpz_t."""
-    global in_mpz_cache
+def set_cache_pool_budget(budget):
+    """
+    set_cache_pool_budget(bytes)
 
-    if in_mpz_cache:
-        in_mpz_cache -= 1
-        return mpz_cache[in_mpz_cache]
+    Set the maximum number of bytes of limb data kept in each cache pool, or
+    remove the limit if budget is None. Each thread has a pool per type
+    (mpz, mpq, mpfr, mpc), and each type has a pool shared by all threads,
+    so the cache holds at most 4 * (threads + 1) * budget bytes of limbs.
+    Raises ValueError if the budget is negative.
+    """
+    global cache_pool_budget, _budget_limbs
+    if budget is None:
+        limbs = _no_budget
+    elif not isinstance(budget, (int, long)):
+        raise TypeError("integer argument expected, got %s" % type(budget))
+    elif budget < 0:
+        raise ValueError("cache pool budget must be positive")
+    else:
+        limbs = budget // _limb_bytes
+
+    cache_pool_budget = budget
+    _budget_limbs = limbs
+    _trim()
+
+
+def _trim():
+    """
+    Evict objects exceeding the current limits from the cache: from the
+    shared pools and this thread's free lists now, and from the free lists
+    of other threads the next time they use them (see _FreeList.sync).
+    """
+    global _generation
+    _generation += 1
+    for pool in (_local.mpz, _local.mpq, _local.mpfr, _local.mpc):
+        pool.sync()
+    for pool in _shared:
+        with _lock:
+            pool.trim()
+
+
+def set_cache_stats(enabled):
+    """
+    set_cache_stats(enabled)
+
+    Enable or disable counting cache hits, misses, evictions and net
+    allocations (see cache_stats()). Enabling resets the counts. Counting is
+    disabled by default.
+    """
+    for pool in _shared:
+        pool.stats = _Stats() if enabled else None
+
+
+def reset_cache_stats():
+    """
+    reset_cache_stats()
+
+    Reset the counts returned by cache_stats() to zero.
+    """
+    for pool in _shared:
+        if pool.stats is not None:
+            pool.stats = _Stats()
+
+
+def cache_stats():
+    """
+    cache_stats() -> dict
+
+    Return a dict mapping each type ('mpz', 'mpq', 'mpfr', 'mpc') to a dict
+    of cache statistics:
+
+        depth: number of objects in the cache (of all threads)
+        bytes: number of bytes of limbs held by these objects
+        hits: number of objects taken from the cache
+        misses: number of objects allocated because the cache was empty
+        evictions: number of objects cleared or shrunk instead of cached
+        net_allocated: number of objects allocated minus the number freed,
+            or 0 if more were freed
+
+    The last four are counted since the last reset, while counting is
+    enabled with set_cache_stats(True), and are None otherwise. Objects
+    allocated before the reset are not counted, but freeing them is, so
+    net_allocated is only the number of live objects if all of them were
+    allocated since. Counts may be slightly off when several threads use
+    the cache.
+    """
+    stats = {}
+    for name, shared in zip(('mpz', 'mpq', 'mpfr', 'mpc'), _shared):
+        pools = [shared] + [p for p in list(_free_lists) if p.shared is shared]
+        st = shared.stats
+        stats[name] = {
+            'depth': sum(p.count for p in pools),
+            'bytes': sum(p.nlimbs for p in pools) * _limb_bytes,
+            'hits': st and st.hits,
+            'misses': st and st.misses,
+            'evictions': st and st.evictions,
+            'net_allocated': st and max(st.hits + st.misses - st.frees, 0),
+        }
+    return stats
+
+
+class _Stats(object):
+    __slots__ = ('hits', 'misses', 'frees', 'evictions')
+
+    def __init__(self):
+        self.hits = self.misses = self.frees = self.evictions = 0
+
+
+# Each thread allocates from and frees to its own free lists, so the common
+# case needs no locking. Objects freed while a thread's list is full, and the
+# lists of exited threads, go to a shared overflow pool (under _lock) that
+# threads fall back to when their own list is empty.
+#
+# Objects with more than cache_obsize limbs are shrunk (mpz, mpq) or cleared
+# (mpfr, mpc) when freed, and each pool keeps at most cache_pool_budget bytes
+# of limbs (counted in limbs, as _budget_limbs). The limits are per pool
+# rather than global, so that keeping count doesn't need a lock. The number
+# of limbs of an object is computed once when it is freed, and kept next to
+# it in the pool.
+#
+# _del_* also runs from the types' __del__, i.e. at arbitrary points of the
+# thread that dropped the last reference. The lists are therefore only
+# changed with single list operations, and _lock is reentrant.
+#
+# Only its own thread changes a free list, so when the limits change, the
+# other threads' lists are trimmed by their threads: set_cache and
+# set_cache_pool_budget bump _generation, and each list trims itself when it
+# next sees a new generation. Freeing checks the limits anyway, so only the
+# slow paths look at the generation: a list over the new limits takes them
+# on its next free.
+
+_lock = threading.RLock()
+_generation = 0
+_limb_bytes = gmp.GMP_LIMB_BITS // 8
+_numb_bits = gmp.GMP_NUMB_BITS
+_no_budget = float('inf')
+_budget_limbs = cache_pool_budget // _limb_bytes
+
+
+def _mpz_limbs(mpz):
+    return mpz._mp_alloc
+
+
+def _mpq_limbs(mpq):
+    return gmp.gmpy_cffi_mpq_limbs(mpq)
+
+
+def _prec_limbs(prec):
+    return (prec + _numb_bits - 1) // _numb_bits
+
+
+def _mpfr_limbs(mpfr):
+    return _prec_limbs(mpfr._mpfr_prec)
+
+
+def _mpc_limbs(mpc):
+    return gmp.gmpy_cffi_mpc_limbs(mpc)
+
+
+class _Pool(object):
+    """
+    Free objects and their numbers of limbs, as (object, limbs) pairs binned
+    by size class (see _size_class), and their count and total number of
+    limbs.
+    """
+
+    __slots__ = ('bins', 'count', 'nlimbs', 'clear', 'shared', 'stats')
+
+    def __init__(self, nbins, clear):
+        self.bins = [[] for i in xrange(nbins)]
+        self.count = 0
+        self.nlimbs = 0
+        self.clear = clear
+        # The shared pool of the same type, which keeps the stats
+        self.shared = self
+        self.stats = None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for free in self.bins:
+            for entry in free:
+                yield entry
+
+    def take(self, k=0):
+        """
+        Pop an object from bin k, else from the nearest non-empty bin,
+        preferring the bigger one at equal distance. Return None if the pool
+        is empty.
+        """
+        if not self.count:
+            return None
+        bins = self.bins
+        free = bins[k]
+        if not free:
+            n = len(bins)
+            for d in xrange(1, max(k + 1, n - k)):
+                if k + d < n and bins[k + d]:
+                    free = bins[k + d]
+                    break
+                if k >= d and bins[k - d]:
+                    free = bins[k - d]
+                    break
+            else:
+                return None
+        obj, limbs = free.pop()
+        self.count -= 1
+        self.nlimbs -= limbs
+        return obj
+
+    def add(self, obj, limbs):
+        """Add obj with limbs limbs if it fits in the limits."""
+        if self.count < cache_size and self.nlimbs + limbs <= _budget_limbs:
+            bins = self.bins
+            k = min(_size_class(limbs), len(bins) - 1)
+            bins[k].append((obj, limbs))
+            self.count += 1
+            self.nlimbs += limbs
+            return True
+        return False
+
+    def trim(self):
+        # Evict the biggest objects first
+        for free in reversed(self.bins):
+            while free and (self.count > cache_size or
+                            self.nlimbs > _budget_limbs):
+                obj, limbs = free.pop()
+                self.count -= 1
+                self.nlimbs -= limbs
+                self.clear(obj)
+                stats = self.shared.stats
+                if stats is not None:
+                    stats.evictions += 1
+
+
+def _acquire(shared, k=0):
+    """Take an object from a shared pool, or return None if it is empty."""
+    if shared.count:
+        with _lock:
+            return shared.take(k)
+    return None
+
+
+def _release(shared, obj, limbs):
+    """Put obj in a shared pool, or clear it if the pool is full."""
+    with _lock:
+        if shared.add(obj, limbs):
+            return
+    shared.clear(obj)
+    stats = shared.stats
+    if stats is not None:
+        stats.evictions += 1
+
+
+class _FreeList(_Pool):
+    """A per-thread free list."""
+
+    __slots__ = ('generation', '__weakref__')
+
+    def __init__(self, shared):
+        _Pool.__init__(self, len(shared.bins), shared.clear)
+        self.shared = shared
+        self.generation = _generation
+        _free_lists.add(self)
+
+    def sync(self):
+        """Trim this list if the limits changed since it was last trimmed."""
+        if self.generation != _generation:
+            self.generation = _generation
+            self.trim()
+
+    def get(self, k=0):
+        """Take an object from this list or the shared pool, or return None."""
+        if self.generation != _generation:
+            self.sync()
+        obj = self.take(k)
+        if obj is None:
+            obj = _acquire(self.shared, k)
+        stats = self.shared.stats
+        if stats is not None:
+            if obj is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+        return obj
+
+    def __del__(self, _release=_release):
+        # The owning thread has exited
+        for obj, limbs in self:
+            _release(self.shared, obj, limbs)
+
+
+def _freed(shared, evicted=False):
+    stats = shared.stats
+    if stats is not None:
+        stats.frees += 1
+        if evicted:
+            stats.evictions += 1
+
+
+def _put(pool, obj, limbs):
+    """
+    Keep obj, with limbs limbs, in a single-bin free list, or hand it to the
+    shared pool if the list is full.
+    """
+    if pool.count < cache_size and pool.nlimbs + limbs <= _budget_limbs:
+        pool.bins[0].append((obj, limbs))
+        pool.count += 1
+        pool.nlimbs += limbs
+    else:
+        pool.sync()
+        _release(pool.shared, obj, limbs)
+
+
+def _size_class(limbs):
+    # Sizes up to 3 limbs share class 0: GMP sizes results to the operands
+    # plus a limb, and mpz_init allocates no limbs at all since GMP 6.2, so
+    # small objects have 0-3 limbs and should serve the default hint of 1.
+    # _new_mpz and _del_mpz inline this.
+    return (limbs >> 2).bit_length()
+
+
+# mpz_t's can have at most 16384 limbs when cached, i.e. size class 13
+_mpz_bins = 14
+
+_mpz_shared = _Pool(_mpz_bins, gmp.mpz_clear)
+_mpq_shared = _Pool(1, gmp.mpq_clear)
+_mpfr_shared = _Pool(1, gmp.mpfr_clear)
+_mpc_shared = _Pool(1, gmp.mpc_clear)
+_shared = [_mpz_shared, _mpq_shared, _mpfr_shared, _mpc_shared]
+
+
+# All threads' free lists, for cache_stats()
+_free_lists = weakref.WeakSet()
+
+
+class _Local(threading.local):
+    def __init__(self):
+        self.mpz = _FreeList(_mpz_shared)
+        self.mpq = _FreeList(_mpq_shared)
+        self.mpfr = _FreeList(_mpfr_shared)
+        self.mpc = _FreeList(_mpc_shared)
+
+_local = _Local()
+
+
+# MPZ
+def _new_mpz(limbs=1):
+    """
+    Return an initialized mpz_t, preferably with room for at least limbs
+    limbs.
+    """
+    k = (limbs >> 2).bit_length() if limbs > 3 else 0
+    if k < _mpz_bins:
+        # The pool methods are inlined here, as this is by far the hottest path
+        pool = _local.mpz
+        free = pool.bins[k]
+        if free:
+            mpz, n = free.pop()
+            pool.count -= 1
+            pool.nlimbs -= n
+            if _mpz_shared.stats is not None:
+                _mpz_shared.stats.hits += 1
+            # Bin k also holds objects a little smaller than limbs
+            if n < limbs:
+                gmp.mpz_realloc2(mpz, limbs * gmp.GMP_NUMB_BITS)
+            return mpz
+        mpz = pool.get(k)
+        if mpz is not None:
+            if mpz._mp_alloc < limbs:
+                gmp.mpz_realloc2(mpz, limbs * gmp.GMP_NUMB_BITS)
+            return mpz
+    elif _mpz_shared.stats is not None:
+        _mpz_shared.stats.misses += 1
+    if limbs > 1:
+        memory._reserve(limbs * _limb_bytes)
+        mpz = ffi.new("mpz_t")
+        gmp.mpz_init2(mpz, limbs * gmp.GMP_NUMB_BITS)
     else:
         mpz = ffi.new("mpz_t")
         gmp.mpz_init(mpz)
-        return mpz
+    return mpz
 
 
 def _del_mpz(mpz):
-    global in_mpz_cache
-
-    if in_mpz_cache < cache_size:
-        if ffi.sizeof(mpz[0]) <= cache_obsize:
-            mpz_cache[in_mpz_cache] = mpz
-        else:
-            mpz_cache[in_mpz_cache] = ffi.new('mpz_t')
-        in_mpz_cache += 1
+    limbs = mpz._mp_alloc
+    if limbs > cache_obsize:
+        # Drop the limbs but keep the (cheap) mpz_t itself
+        gmp.mpz_realloc2(mpz, 0)
+        limbs = mpz._mp_alloc
+        _freed(_mpz_shared, True)
+    elif _mpz_shared.stats is not None:
+        _mpz_shared.stats.frees += 1
+    pool = _local.mpz
+    if pool.count < cache_size and pool.nlimbs + limbs <= _budget_limbs:
+        pool.bins[(limbs >> 2).bit_length() if limbs > 3 else 0].append(
+            (mpz, limbs))
+        pool.count += 1
+        pool.nlimbs += limbs
     else:
-        gmp.mpz_clear(mpz)
-
-# MPQ
-def _init_mpq_cache():
-    global mpq_cache, in_mpq_cache
-    mpq_cache = []
-    in_mpq_cache = cache_size
-    for _ in xrange(cache_size):
-        mpq = ffi.new("mpq_t")
-        gmp.mpq_init(mpq)
-        mpq_cache.append(mpq)
-_init_mpq_cache()
+        pool.sync()
+        _release(_mpz_shared, mpz, limbs)
 
 
+# MPQ
 def _new_mpq():
     """Return an initialized mpq_t."""
-    global in_mpq_cache
-
-    if in_mpq_cache:
-        in_mpq_cache -= 1
-        return mpq_cache[in_mpq_cache]
-    else:
+    # As in _new_mpz, the pool methods are inlined for the common case
+    pool = _local.mpq
+    free = pool.bins[0]
+    if free:
+        mpq, limbs = free.pop()
+        pool.count -= 1
+        pool.nlimbs -= limbs
+        if _mpq_shared.stats is not None:
+            _mpq_shared.stats.hits += 1
+        return mpq
+    mpq = pool.get()
+    if mpq is None:
         mpq = ffi.new("mpq_t")
         gmp.mpq_init(mpq)
-        return mpq
+    return mpq
 
 
 def _del_mpq(mpq):
-    global in_mpq_cache
-
-    if in_mpq_cache < cache_size:
-        if ffi.sizeof(mpq[0]) <= cache_obsize:
-            mpq_cache[in_mpq_cache] = mpq
-        else:
-            mpq_cache[in_mpq_cache] = ffi.new('mpq_t')
-        in_mpq_cache += 1
-    else:
-        gmp.mpq_clear(mpq)
+    limbs = gmp.gmpy_cffi_mpq_limbs(mpq)
+    if limbs > cache_obsize:
+        # mpq_t must stay canonical, so reset it to 0/1 before shrinking
+        gmp.mpq_set_ui(mpq, 0, 1)
+        gmp.mpz_realloc2(gmp.mpq_numref(mpq), 0)
+        gmp.mpz_realloc2(gmp.mpq_denref(mpq), 0)
+        limbs = _mpq_limbs(mpq)
+        _freed(_mpq_shared, True)
+    elif _mpq_shared.stats is not None:
+        _mpq_shared.stats.frees += 1
+    _put(_local.mpq, mpq, limbs)
 
 
 # MPFR
-def _init_mpfr_cache():
-    global mpfr_cache, in_mpfr_cache
-    mpfr_cache = []
-    in_mpfr_cache = cache_size
-    for _ in xrange(cache_size):
-        mpfr = ffi.new("mpfr_t")
-        gmp.mpfr_init(mpfr)
-        mpfr_cache.append(mpfr)
-_init_mpfr_cache()
-
-
 def _new_mpfr(prec=0):
     """Return an initialized mpfr_t."""
-    global in_mpfr_cache
-
     if isinstance(prec, (int, long)):
         if not (prec == 0 or gmp.MPFR_PREC_MIN <= prec <= gmp.MPFR_PREC_MAX):
             raise ValueError("invalid prec %i (wanted %s <= prec <= %s)" % (
                 prec, gmp.MPFR_PREC_MIN, gmp.MPFR_PREC_MAX))
     else:
         raise TypeError('an integer is required')
-
-    if in_mpfr_cache:
-        in_mpfr_cache -= 1
+    if memory._limit is not None:
+        memory._reserve(_prec_limbs(prec) * _limb_bytes)
+
+    pool = _local.mpfr
+    free = pool.bins[0]
+    if free:
+        mpfr, limbs = free.pop()
+        pool.count -= 1
+        pool.nlimbs -= limbs
+        if _mpfr_shared.stats is not None:
+            _mpfr_shared.stats.hits += 1
+    else:
+        mpfr = pool.get()
+    if mpfr is not None:
         # Set default precision
         if prec == 0:
-            gmp.mpfr_set_prec(mpfr_cache[in_mpfr_cache], gmp.mpfr_get_default_prec())
+            gmp.mpfr_set_prec(mpfr, gmp.mpfr_get_default_prec())
         else:
-            gmp.mpfr_set_prec(mpfr_cache[in_mpfr_cache], prec)
-        return mpfr_cache[in_mpfr_cache]
+            gmp.mpfr_set_prec(mpfr, prec)
+        return mpfr
     else:
         mpfr = ffi.new("mpfr_t")
         if prec == 0:
@@ -164,34 +537,19 @@ def _new_mpfr(prec=0):
 
 
 def _del_mpfr(mpfr):
-    global in_mpfr_cache
-
-    if in_mpfr_cache < cache_size:
-        if ffi.sizeof(mpfr[0]) <= cache_obsize:
-            mpfr_cache[in_mpfr_cache] = mpfr
-        else:
-            mpfr_cache[in_mpfr_cache] = ffi.new('mpfr_t')
-        in_mpfr_cache += 1
-    else:
+    limbs = (mpfr._mpfr_prec + _numb_bits - 1) // _numb_bits
+    if limbs > cache_obsize:
         gmp.mpfr_clear(mpfr)
+        _freed(_mpfr_shared, True)
+        return
+    if _mpfr_shared.stats is not None:
+        _mpfr_shared.stats.frees += 1
+    _put(_local.mpfr, mpfr, limbs)
 
 
 # MPC
-def _init_mpc_cache():
-    global mpc_cache, in_mpc_cache
-    mpc_cache = []
-    in_mpc_cache = cache_size
-    for _ in xrange(cache_size):
-        mpc = ffi.new("mpc_t")
-        gmp.mpc_init2(mpc, gmp.mpfr_get_default_prec())
-        mpc_cache.append(mpc)
-_init_mpc_cache()
-
-
 def _new_mpc(prec=(0,0)):
     """Return an initialized mpc_t."""
-    global in_mpc_cache
-
     # prec is assumed to be checked already
     rprec, iprec = prec
 
@@ -200,23 +558,35 @@ def _new_mpc(prec=(0,0)):
             raise ValueError(
                 "invalid prec (wanted prec == 0 or %s <= prec <= %s)" % (
                     gmp.MPFR_PREC_MIN, gmp.MPFR_PREC_MAX))
-
-    if in_mpc_cache:
-        in_mpc_cache -= 1
+    if memory._limit is not None:
+        memory._reserve(
+            (_prec_limbs(rprec) + _prec_limbs(iprec)) * _limb_bytes)
+
+    pool = _local.mpc
+    free = pool.bins[0]
+    if free:
+        mpc, limbs = free.pop()
+        pool.count -= 1
+        pool.nlimbs -= limbs
+        if _mpc_shared.stats is not None:
+            _mpc_shared.stats.hits += 1
+    else:
+        mpc = pool.get()
+    if mpc is not None:
         # Set default precision
         if rprec == iprec:
             if rprec  == 0:
-                gmp.mpc_set_prec(mpc_cache[in_mpc_cache], gmp.mpfr_get_default_prec())
+                gmp.mpc_set_prec(mpc, gmp.mpfr_get_default_prec())
             else:
-                gmp.mpc_set_prec(mpc_cache[in_mpc_cache], rprec)
+                gmp.mpc_set_prec(mpc, rprec)
         else:
             if rprec == 0:
                 rprec = gmp.mpfr_get_default_prec()
             if iprec == 0:
                 iprec = gmp.mpfr_get_default_prec()
-            gmp.mpc_clear(mpc_cache[in_mpc_cache])
-            gmp.mpc_init3(mpc_cache[in_mpc_cache], rprec, iprec)
-        return mpc_cache[in_mpc_cache]
+            gmp.mpc_clear(mpc)
+            gmp.mpc_init3(mpc, rprec, iprec)
+        return mpc
     else:
         mpc = ffi.new("mpc_t")
         if rprec == 0:
@@ -231,12 +601,11 @@ def _new_mpc(prec=(0,0)):
 
 
 def _del_mpc(mpc):
-    global in_mpc_cache
-
-    if in_mpc_cache < cache_size:
-        mpc_cache[in_mpc_cache] = mpc
-        # FIXME This doesn't seem to be working properly
-        if ffi.sizeof(mpc[0]) <= cache_obsize:
-            mpc_cache[in_mpc_cache] = mpc
-        else:
-            mpc_cache[in_mpc_cache] = ffi.new('mpc_t')
+    limbs = gmp.gmpy_cffi_mpc_limbs(mpc)
+    if limbs > cache_obsize:
+        gmp.mpc_clear(mpc)
+        _freed(_mpc_shared, True)
+        return
+    if _mpc_shared.stats is not None:
+        _mpc_shared.stats.frees += 1
+    _put(_local.mpc, mpc, limbs)
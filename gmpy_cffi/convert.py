@@ -1,3 +1,4 @@
+import re
 import sys
 import array
 from math import log10
@@ -14,6 +15,13 @@ if PY3:
     xrange = range
 
 
+# mpz_import/mpz_export whole limbs in native byte order, which GMP can
+# copy directly
+_LIMB_SIZE = gmp.GMP_LIMB_BITS // 8
+_LIMB_ORDER = -1 if sys.byteorder == 'little' else 1
+_new_uncleared = ffi.new_allocator(should_clear_after_alloc=False)
+
+
 def _pyint_to_mpz(n, a):
     """
     Set `a` from `n`.
@@ -26,7 +34,7 @@ def _pyint_to_mpz(n, a):
     elif sys.maxsize < n <= MAX_UI:
         gmp.mpz_set_ui(a, n)
     else:
-        gmp.mpz_set_str(a, hex(n).rstrip('L').encode('UTF-8'), 0)
+        _pylong_to_mpz(n, a)
 
 
 def _pylong_to_mpz(n, a):
@@ -36,7 +44,18 @@ def _pylong_to_mpz(n, a):
     :type n: long
     :type a: mpz_t
     """
-    gmp.mpz_set_str(a, hex(n).rstrip('L').encode('UTF-8'), 0)
+    if -sys.maxsize - 1 <= n <= sys.maxsize:
+        gmp.mpz_set_si(a, n)
+    elif PY3:
+        m = -n if n < 0 else n
+        count = (m.bit_length() + gmp.GMP_LIMB_BITS - 1) // gmp.GMP_LIMB_BITS
+        gmp.mpz_import(a, count, _LIMB_ORDER, _LIMB_SIZE, 0, 0,
+                       m.to_bytes(count * _LIMB_SIZE, sys.byteorder))
+        if n < 0:
+            gmp.mpz_neg(a, a)
+    else:
+        # No int.to_bytes, so go through a hex string
+        gmp.mpz_set_str(a, hex(n).rstrip('L').encode('UTF-8'), 0)
 
 
 def _mpz_to_pylong(a):
@@ -47,16 +66,19 @@ def _mpz_to_pylong(a):
     :rtype: long
     """
 
-    size = ffi.sizeof('uint64_t')
-    numb = 8 * size
-    count = (gmp.mpz_sizeinbase(a, 2) + numb - 1) // numb
-    p = ffi.new('uint64_t[]', count)
-    gmp.mpz_export(p, ffi.NULL, 1, size, 0, 0, a)
-    res = 0
-    for n in p:
-        res = (res << numb) + n
+    if gmp.mpz_fits_slong_p(a):
+        return gmp.mpz_get_si(a)
+    if not PY3:
+        # No int.from_bytes, so go through a hex string
+        return long(_mpz_to_str(a, 16), 16)
 
-    return res * gmp.mpz_sgn(a)
+    count = ((gmp.mpz_sizeinbase(a, 2) + gmp.GMP_LIMB_BITS - 1) //
+             gmp.GMP_LIMB_BITS)
+    # mpz_export writes every byte, so don't bother zeroing the buffer
+    p = _new_uncleared('char[]', count * _LIMB_SIZE)
+    gmp.mpz_export(p, ffi.NULL, _LIMB_ORDER, _LIMB_SIZE, 0, 0, a)
+    res = int.from_bytes(ffi.buffer(p), sys.byteorder)
+    return -res if gmp.mpz_sgn(a) < 0 else res
 
 
 def _mpz_to_str(a, base):
@@ -69,13 +91,18 @@ def _mpz_to_str(a, base):
     :rtype: str
     """
 
-    l = gmp.mpz_sizeinbase(a, base) + 2
-    p = ffi.new('char[]', l)
+    # mpz_sizeinbase may be one too big, in which case the digits end with
+    # the terminating NUL one character early
+    n = gmp.mpz_sizeinbase(a, base) + (gmp.mpz_sgn(a) < 0)
+    p = _new_uncleared('char[]', n + 1)
     gmp.mpz_get_str(p, base, a)
+    if p[n - 1] == b'\0':
+        n -= 1
+    # Decode straight from the buffer, without an intermediate bytes copy
     if PY3:
-        return ffi.string(p).decode('UTF-8')
+        return str(ffi.buffer(p, n), 'ascii')
     else:
-        return ffi.string(p)
+        return ffi.buffer(p, n)[:]
 
 
 def _pyint_to_mpq(n, a):
@@ -126,18 +153,261 @@ def _pyint_to_mpfr(n, a):
         gmp.mpz_clear(tmp_mpz)
 
 
-def _mpfr_to_str(a):
-    precision = int(log10(2) * gmp.mpfr_get_prec(a) + 2)
-    buf = ffi.new('char []', precision + 10)
-    fmtstr = "%.{0}Rg".format(precision)
-    buflen = gmp.mpfr_sprintf(buf, fmtstr.encode('UTF-8'), a)
+def _mpfr_get_digits(a, n):
+    """
+    Return (digits, exp) such that abs(a) rounded to n significant decimal
+    digits is 0.digits * 10**exp.
+
+    :type a: mpfr_t, a nonzero number
+    :type n: int, >= 1
+    :rtype: (str, int)
+    """
+
+    if n == 1:
+        # MPFR before 4.1 requires n >= 2, and rounding the 2-digit result
+        # again would round twice. Rounding to 2 digits carries into the
+        # exponent whenever rounding to 1 does, so exp is at most one too
+        # small, and the digit is then rounded exactly.
+        exp = _mpfr_get_digits(a, 2)[1]
+        digit = _mpfr_get_fixed(a, 1 - exp)
+        if digit == '10':
+            return '1', exp + 1
+        return digit, exp
+
+    # Passing our own buffer (n digits, a sign and a NUL) saves the
+    # allocation and the mpfr_free_str call
+    expptr = _new_uncleared('mpfr_exp_t *')
+    buf = _new_uncleared('char[]', max(n + 2, 7))
+    gmp.mpfr_get_str(buf, expptr, 10, n, a, gmp.MPFR_RNDN)
+    digits = ffi.string(buf)
     if PY3:
-        pybuf = ffi.string(buf).decode('UTF-8')
+        digits = digits.decode('ascii')
+    return digits.lstrip('-'), expptr[0]
+
+
+def _mpfr_get_fixed(a, frac):
+    """
+    Return the decimal digits of abs(a) * 10**frac rounded to an integer
+    (half to even). Unlike _mpfr_get_digits, the number of digits is
+    whatever the value needs, so this is exact for any frac.
+
+    :type a: mpfr_t, a number
+    :type frac: int
+    :rtype: str
+    """
+
+    z = ffi.new('mpz_t')
+    scale = ffi.new('mpz_t')
+    gmp.mpz_init(z)
+    gmp.mpz_init(scale)
+    # abs(a) = z * 2**exp exactly
+    exp = gmp.mpfr_get_z_2exp(z, a)
+    gmp.mpz_abs(z, z)
+    gmp.mpz_ui_pow_ui(scale, 10, abs(frac))
+    if frac < 0:
+        # Divide z * 2**exp by scale, and round by the remainder
+        if exp >= 0:
+            gmp.mpz_mul_2exp(z, z, exp)
+        else:
+            gmp.mpz_mul_2exp(scale, scale, -exp)
+        rem = ffi.new('mpz_t')
+        gmp.mpz_init(rem)
+        gmp.mpz_fdiv_qr(z, rem, z, scale)
+        gmp.mpz_mul_2exp(rem, rem, 1)
+        cmp = gmp.mpz_cmp(rem, scale)
+        if cmp > 0 or cmp == 0 and gmp.mpz_tstbit(z, 0):
+            gmp.mpz_add_ui(z, z, 1)
+        gmp.mpz_clear(rem)
+    elif exp >= 0:
+        gmp.mpz_mul(z, z, scale)
+        gmp.mpz_mul_2exp(z, z, exp)
+    else:
+        gmp.mpz_mul(z, z, scale)
+        shift = -exp
+        # Round up if the first dropped bit is set and either the rest of
+        # the dropped bits or the last kept bit is (half to even)
+        round_up = gmp.mpz_tstbit(z, shift - 1) and (
+            gmp.mpz_scan1(z, 0) < shift - 1 or gmp.mpz_tstbit(z, shift))
+        gmp.mpz_fdiv_q_2exp(z, z, shift)
+        if round_up:
+            gmp.mpz_add_ui(z, z, 1)
+    gmp.mpz_clear(scale)
+    res = _mpz_to_str(z, 10)
+    gmp.mpz_clear(z)
+    return res
+
+
+def _place_point(digits, point, frac):
+    """
+    Put a decimal point after the first `point` digits of `digits`,
+    padding with zeros to get at least one integer digit and `frac`
+    fractional digits. There is no point if frac is 0.
+    """
+
+    if point <= 0:
+        digits = '0' * (1 - point) + digits
+        point = 1
+    digits = digits.ljust(point + frac, '0')
+    if frac:
+        return digits[:point] + '.' + digits[point:]
+    return digits[:point]
+
+
+def _mpfr_to_str(a):
+    """
+    Return a with as many significant digits as its precision warrants,
+    like the C format "%.*Rg", but always with a decimal point.
+
+    :type a: mpfr_t
+    :rtype: str
+    """
+
+    if not gmp.mpfr_number_p(a):
+        if gmp.mpfr_nan_p(a):
+            return 'nan'
+        return '-inf' if gmp.mpfr_signbit(a) else 'inf'
+    sign = '-' if gmp.mpfr_signbit(a) else ''
+    if gmp.mpfr_zero_p(a):
+        return sign + '0.0'
+    ndigits = int(log10(2) * gmp.mpfr_get_prec(a) + 2)
+    digits, exp = _mpfr_get_digits(a, ndigits)
+    digits = digits.rstrip('0')
+    exp -= 1
+    if -4 <= exp < ndigits:
+        frac = max(len(digits) - exp - 1, 1)
+        return sign + _place_point(digits, exp + 1, frac)
+    frac = max(len(digits) - 1, 1)
+    return sign + _place_point(digits, 1, frac) + 'e%+03d' % exp
+
+
+_FORMAT_SPEC = re.compile(r"""
+    (?:(?P<fill>.)?(?P<align>[<>=^]))?
+    (?P<sign>[-+\ ])?
+    (?P<alt>\#)?
+    (?P<zero>0)?
+    (?P<width>\d+)?
+    (?P<grouping>[,_])?
+    (?:\.(?P<precision>\d+))?
+    (?P<type>[eEfFgG%])?
+    \Z""", re.DOTALL | re.VERBOSE)
+
+
+def _group_digits(s, sep):
+    """Insert sep between groups of three digits in the integer part of s."""
+
+    end = len(s)
+    for i, c in enumerate(s):
+        if c in '.eE':
+            end = i
+            break
+    head = s[:end]
+    groups = []
+    while len(head) > 3:
+        groups.insert(0, head[-3:])
+        head = head[:-3]
+    groups.insert(0, head)
+    return sep.join(groups) + s[end:]
+
+
+def _mpfr_format(a, spec):
+    """
+    Format a according to the format specification spec, as format() does
+    for floats. Supports the fill, align, sign, '#', '0', width, grouping
+    and precision fields and the types 'e', 'E', 'f', 'F', 'g', 'G', '%'
+    and none; without a type or precision, the result is str(a).
+
+    :type a: mpfr_t
+    :type spec: str
+    :rtype: str
+    """
+
+    m = _FORMAT_SPEC.match(spec)
+    if m is None:
+        raise ValueError("Invalid format specifier '%s' for mpfr" % spec)
+    fill, align, sign, alt, zero, width, grouping, precision, type_ = \
+        m.group('fill', 'align', 'sign', 'alt', 'zero', 'width',
+                'grouping', 'precision', 'type')
+
+    if type_ is None and precision is None:
+        body = _mpfr_to_str(a).lstrip('-')
+    elif not gmp.mpfr_number_p(a):
+        body = 'nan' if gmp.mpfr_nan_p(a) else 'inf'
+        if type_ == '%':
+            body += '%'
+    elif type_ in ('f', 'F', '%'):
+        frac = 6 if precision is None else int(precision)
+        scale = 2 if type_ == '%' else 0
+        digits = _mpfr_get_fixed(a, frac + scale)
+        body = _place_point(digits, len(digits) - frac, frac)
+        if alt and not frac:
+            body += '.'
+        if type_ == '%':
+            body += '%'
+    elif type_ in ('e', 'E'):
+        frac = 6 if precision is None else int(precision)
+        if gmp.mpfr_zero_p(a):
+            digits, exp = '0', 0
+        else:
+            digits, exp = _mpfr_get_digits(a, frac + 1)
+            exp -= 1
+        body = _place_point(digits, 1, frac)
+        if alt and not frac:
+            body += '.'
+        body += 'e%+03d' % exp
+    else:
+        # 'g', 'G' or no type with a precision, which is like 'g' but
+        # always has a digit after the point in fixed-point notation
+        ndigits = max(6 if precision is None else int(precision), 1)
+        if gmp.mpfr_zero_p(a):
+            digits, exp = '0', 0
+        else:
+            digits, exp = _mpfr_get_digits(a, ndigits)
+            exp -= 1
+        if -4 <= exp < ndigits - (type_ is None):
+            body = _place_point(digits, exp + 1, ndigits - 1 - exp)
+            if not alt and '.' in body:
+                body = body.rstrip('0').rstrip('.')
+            elif alt and '.' not in body:
+                body += '.'
+            if type_ is None and '.' not in body:
+                body += '.0'
+        else:
+            body = _place_point(digits, 1, ndigits - 1)
+            if not alt and '.' in body:
+                body = body.rstrip('0').rstrip('.')
+            elif alt and ndigits == 1:
+                body += '.'
+            body += 'e%+03d' % exp
+    if type_ in ('E', 'F', 'G'):
+        body = body.upper()
+
+    if gmp.mpfr_signbit(a) and not gmp.mpfr_nan_p(a):
+        prefix = '-'
+    elif sign in ('+', ' '):
+        prefix = sign
     else:
-        pybuf = ffi.string(buf)
-    if gmp.mpfr_number_p(a) and '.' not in pybuf:
-        pybuf = pybuf + '.0'
-    return pybuf
+        prefix = ''
+    if zero and align is None:
+        fill, align = '0', '='
+    if fill is None:
+        fill = ' '
+    width = int(width or 0)
+    if grouping and gmp.mpfr_number_p(a):
+        if fill == '0' and align == '=':
+            # Zero padding is grouped too
+            while len(prefix) + len(_group_digits(body, grouping)) < width:
+                body = '0' + body
+        body = _group_digits(body, grouping)
+    pad = width - len(prefix) - len(body)
+    if pad <= 0:
+        return prefix + body
+    if align == '<':
+        return prefix + body + fill * pad
+    if align == '=':
+        return prefix + fill * pad + body
+    if align == '^':
+        return fill * (pad // 2) + prefix + body + fill * (pad - pad // 2)
+    return fill * pad + prefix + body
 
 
 def _str_to_mpfr(s, base, a):
@@ -0,0 +1,93 @@
+import sys
+
+from gmpy_cffi.interface import gmp
+
+
+if sys.version > '3':
+    long = int
+
+
+_tracking = False
+_limit = None
+
+
+def set_memory_tracking(enabled):
+    """
+    set_memory_tracking(enabled)
+
+    Enable or disable counting the memory allocated by GMP, MPFR and MPC
+    (see memory_stats()). Enabling resets the counts. Disabling also
+    removes the memory limit. Tracking is disabled by default.
+    """
+    global _tracking, _limit
+    enabled = bool(enabled)
+    if enabled != _tracking:
+        gmp.gmpy_cffi_track_memory(enabled)
+        _tracking = enabled
+    if not enabled:
+        _limit = None
+
+
+def get_memory_limit():
+    """
+    get_memory_limit() -> bytes or None
+
+    Return the current memory limit, or None if there is none.
+    """
+    return _limit
+
+
+def set_memory_limit(limit):
+    """
+    set_memory_limit(bytes)
+
+    Set a soft limit on the memory allocated by GMP, MPFR and MPC, enabling
+    memory tracking if needed. Operations whose result is known in advance
+    to exceed the limit (e.g. huge powers, shifts, factorials or
+    precisions) raise MemoryError instead of running out of memory. Other
+    operations may still go over it. set_memory_limit(None) removes the
+    limit.
+    """
+    global _limit
+    if limit is not None:
+        if not isinstance(limit, (int, long)):
+            raise TypeError(
+                "integer argument expected, got %s" % type(limit))
+        if limit < 0:
+            raise ValueError("memory limit must be positive")
+        set_memory_tracking(True)
+    _limit = limit
+
+
+def memory_stats():
+    """
+    memory_stats() -> dict
+
+    Return a dict with the number of bytes currently allocated by GMP, MPFR
+    and MPC ('live'), the highest number since tracking was enabled or the
+    peak reset ('peak'), and the memory limit ('limit'). The counts are None
+    if tracking is disabled. Memory allocated before tracking was enabled
+    is not counted, and freeing it lowers 'live' at most to 0.
+    """
+    if not _tracking:
+        return {'live': None, 'peak': None, 'limit': _limit}
+    return {'live': gmp.gmpy_cffi_mem_live(),
+            'peak': gmp.gmpy_cffi_mem_peak(),
+            'limit': _limit}
+
+
+def reset_memory_peak():
+    """
+    reset_memory_peak()
+
+    Reset the peak memory usage to the current usage.
+    """
+    gmp.gmpy_cffi_mem_reset_peak()
+
+
+def _reserve(nbytes):
+    """Raise MemoryError if allocating nbytes would exceed the limit."""
+    if _limit is not None and gmp.gmpy_cffi_mem_live() + nbytes > _limit:
+        raise MemoryError(
+            "allocating %s bytes would exceed the memory limit (%s bytes)" % (
+                nbytes, _limit))
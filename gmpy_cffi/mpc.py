@@ -25,6 +25,8 @@ def _check_prec(prec):
 class mpc(object):
     """
     """
+    __slots__ = ('_mpc',)
+
     def __init__(self, *args):
         nargs = len(args)
         # if nargs == 1 and isinstance(args[0], self.__class__):
@@ -32,7 +34,7 @@ class mpc(object):
         #     return
 
         if nargs == 0:
-            self._mpc = ffi.gc(_new_mpc(), _del_mpc)
+            self._mpc = _new_mpc()
             gmp.mpc_set_ui(self._mpc, 0, gmp.MPC_RNDNN)
         elif isinstance(args[0], str):   # unicode?
             # First argument is a string
@@ -47,7 +49,7 @@ class mpc(object):
 
             prec = _check_prec(prec)
 
-            self._mpc = ffi.gc(_new_mpc(prec), _del_mpc)
+            self._mpc = _new_mpc(prec)
             _str_to_mpc(args[0], base, self._mpc)
         elif isinstance(args[0], (mpc, complex)):
             # First argument is complex
@@ -58,7 +60,7 @@ class mpc(object):
             else:
                 raise TypeError("function takes at most 2 arguments (3 given)")
 
-            self._mpc = ffi.gc(_new_mpc(prec), _del_mpc)
+            self._mpc = _new_mpc(prec)
 
             if isinstance(args[0], mpc):
                 gmp.mpc_set(self._mpc, args[0]._mpc, gmp.MPC_RNDNN)
@@ -75,7 +77,7 @@ class mpc(object):
             else:
                 raise TypeError("function takes at most 3 arguments (4 given)")
 
-            self._mpc = ffi.gc(_new_mpc(prec), _del_mpc)
+            self._mpc = _new_mpc(prec)
             realref = gmp.mpc_realref(self._mpc)
             imagref = gmp.mpc_imagref(self._mpc)
 
@@ -113,9 +115,22 @@ class mpc(object):
     @classmethod
     def _from_c_mpc(cls, mpc):
         inst = object.__new__(cls)
-        inst._mpc = ffi.gc(mpc, _del_mpc)
+        inst._mpc = mpc
         return inst
 
+    def __del__(self):
+        try:
+            a = self._mpc
+        except AttributeError:
+            # __init__ failed before allocating
+            return
+        _del_mpc(a)
+
+    def __reduce__(self):
+        # copy and pickle must not share the mpc_t. str() has enough digits
+        # to round-trip at the same precision.
+        return type(self), (str(self), self.precision)
+
     @property
     def precision(self):
         rprec, iprec = ffi.new('mpfr_prec_t *'), ffi.new('mpfr_prec_t *')
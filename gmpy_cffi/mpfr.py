@@ -1,10 +1,10 @@
 import sys
 import math
 
-from gmpy_cffi.mpz import mpz
+from gmpy_cffi.mpz import mpz, _HASH_MODULUS
 from gmpy_cffi.mpq import mpq
 from gmpy_cffi.interface import gmp, ffi
-from gmpy_cffi.convert import _mpfr_to_str, _str_to_mpfr, _pyint_to_mpfr, _pylong_to_mpz, MAX_UI, _mpz_to_pylong
+from gmpy_cffi.convert import _mpfr_to_str, _mpfr_format, _str_to_mpfr, _pyint_to_mpfr, _pylong_to_mpz, MAX_UI, _mpz_to_pylong
 from gmpy_cffi.cache import _new_mpfr, _del_mpfr, _new_mpz, _del_mpz
 
 
@@ -45,8 +45,39 @@ def isnan(x):
         raise TypeError('isinf() argument type not supported')
 
 
+if _HASH_MODULUS is not None:
+    # The modulus is a Mersenne prime, so 2**_HASH_BITS == 1 (mod modulus)
+    _HASH_BITS = _HASH_MODULUS.bit_length()
+
+
+def _mpfr_hash(x, obj):
+    """
+    Return the hash of the exact value of x, as for floats and Fractions.
+    obj is the mpfr, whose identity is hashed for NaNs (as for floats).
+    """
+    if not gmp.mpfr_number_p(x):
+        if gmp.mpfr_nan_p(x):
+            if sys.version_info < (3, 10):
+                return sys.hash_info.nan
+            return object.__hash__(obj)
+        if gmp.mpfr_signbit(x):
+            return -sys.hash_info.inf
+        return sys.hash_info.inf
+    # x == man * 2**exp
+    man = _new_mpz()
+    exp = gmp.mpfr_get_z_2exp(man, x)
+    h = gmp.mpz_tdiv_ui(man, _HASH_MODULUS)
+    sign = gmp.mpz_sgn(man)
+    _del_mpz(man)
+    h = (h << (exp % _HASH_BITS)) % _HASH_MODULUS
+    if sign < 0:
+        h = -h
+    return -2 if h == -1 else h
+
+
 class mpfr(object):
-    _mpfr_str = _repr_str = None
+    # Everything but _mpfr is set lazily
+    __slots__ = ('_mpfr', '_mpfr_str', '_repr_str', '_hash')
     """
     mpfr() -> mpfr(0.0)
 
@@ -73,16 +104,17 @@ class mpfr(object):
     def __init__(self, *args):
         nargs = len(args)
         if nargs == 1 and isinstance(args[0], self.__class__):
-            self._mpfr = args[0]._mpfr
+            a = self._mpfr = _new_mpfr(gmp.mpfr_get_prec(args[0]._mpfr))
+            gmp.mpfr_set(a, args[0]._mpfr, gmp.MPFR_RNDN)
             return
 
         if nargs > 3:
             raise TypeError("mpfr() requires 0 to 3 arguments")
 
         if nargs >= 2:
-            a = self._mpfr = ffi.gc(_new_mpfr(prec=args[1]), _del_mpfr)
+            a = self._mpfr = _new_mpfr(prec=args[1])
         else:
-            a = self._mpfr = ffi.gc(_new_mpfr(), _del_mpfr)
+            a = self._mpfr = _new_mpfr()
 
         if nargs == 0:
             gmp.mpfr_set_zero(a, 1)
@@ -106,17 +138,32 @@ class mpfr(object):
                 raise TypeError('cannot construct mpfr from %s.' % args[0])
 
     def __str__(self):
-        if self._mpfr_str is None:
-            self._mpfr_str = _mpfr_to_str(self._mpfr)
-        return self._mpfr_str
+        try:
+            return self._mpfr_str
+        except AttributeError:
+            s = self._mpfr_str = _mpfr_to_str(self._mpfr)
+            return s
 
     def __repr__(self):
-        if self._repr_str is None:
-            if self.precision == gmp.mpfr_get_default_prec():
-                self._repr_str = "mpfr('%s')" % self
-            else:
-                self._repr_str = "mpfr('%s',%s)" % (self, self.precision)
-        return self._repr_str
+        try:
+            return self._repr_str
+        except AttributeError:
+            pass
+        if self.precision == gmp.mpfr_get_default_prec():
+            r = "mpfr('%s')" % self
+        else:
+            r = "mpfr('%s',%s)" % (self, self.precision)
+        self._repr_str = r
+        return r
+
+    def __format__(self, spec):
+        """
+        x.__format__(fmt) -> str
+
+        Format x like a float: '.50f', '+.3e', '>20.10g', ... give the
+        digits of x itself, not of x rounded to a double.
+        """
+        return _mpfr_format(self._mpfr, spec)
 
     @property
     def precision(self):
@@ -125,9 +172,22 @@ class mpfr(object):
     @classmethod
     def _from_c_mpfr(cls, mpfr):
         inst = object.__new__(cls)
-        inst._mpfr = ffi.gc(mpfr, _del_mpfr)
+        inst._mpfr = mpfr
         return inst
 
+    def __del__(self):
+        try:
+            a = self._mpfr
+        except AttributeError:
+            # __init__ failed before allocating
+            return
+        _del_mpfr(a)
+
+    def __reduce__(self):
+        # copy and pickle must not share the mpfr_t. str() has enough digits
+        # to round-trip at the same precision.
+        return type(self), (str(self), self.precision)
+
     def __cmp(self, other):
         if isinstance(other, mpfr):
             return gmp.mpfr_cmp(self._mpfr, other._mpfr)
@@ -178,8 +238,16 @@ class mpfr(object):
         return not self > other
 
     def __hash__(self):
-        # XXX Optimize (see gmpy / how floats are hashed within python)
-        return hash(float(self))
+        try:
+            return self._hash
+        except AttributeError:
+            pass
+        if _HASH_MODULUS is None:
+            h = hash(float(self))
+        else:
+            h = _mpfr_hash(self._mpfr, self)
+        self._hash = h
+        return h
 
     def __add__(self, other):
         res = _new_mpfr()
@@ -1,10 +1,9 @@
 import sys
-import logging
 
 import gmpy_cffi
 from gmpy_cffi.interface import gmp, ffi
 from gmpy_cffi.convert import _mpq_to_str, _str_to_mpq, _pyint_to_mpz, _pyint_to_mpq, MAX_UI
-from gmpy_cffi.mpz import mpz
+from gmpy_cffi.mpz import mpz, _HASH_MODULUS
 from gmpy_cffi.cache import _new_mpq, _del_mpq, _new_mpz, _del_mpz
 
 
@@ -13,8 +12,29 @@ if sys.version > '3':
     xrange = range
 
 
+if _HASH_MODULUS is not None:
+    _hash_modulus = mpz(_HASH_MODULUS)
+
+
+def _mpq_hash(a):
+    """Return hash(Fraction(a)) without converting a to Python ints."""
+    num, den = gmp.mpq_numref(a), gmp.mpq_denref(a)
+    inv = _new_mpz()
+    if gmp.mpz_invert(inv, den, _hash_modulus._mpz):
+        gmp.mpz_mul_ui(inv, inv, gmp.mpz_tdiv_ui(num, _HASH_MODULUS))
+        h = gmp.mpz_tdiv_ui(inv, _HASH_MODULUS)
+    else:
+        # den is a multiple of the modulus
+        h = sys.hash_info.inf
+    _del_mpz(inv)
+    if gmp.mpz_sgn(num) < 0:
+        h = -h
+    return -2 if h == -1 else h
+
+
 class mpq(object):
-    _mpq_str = _numerator = _denominator = None
+    # Everything but _mpq is set lazily
+    __slots__ = ('_mpq', '_mpq_str', '_numerator', '_denominator', '_hash')
 
     def __init__(self, *args):
         """
@@ -41,12 +61,11 @@ class mpq(object):
         #TODO kwargs (base)
 
         nargs = len(args)
+        a = self._mpq = _new_mpq()
         if nargs == 1 and isinstance(args[0], self.__class__):
-            self._mpq = args[0]._mpq
+            gmp.mpq_set(a, args[0]._mpq)
             return
 
-        a = self._mpq = ffi.gc(_new_mpq(), _del_mpq)
-
         if nargs == 0:
             gmp.mpq_set_ui(a, 0, 1)
         elif nargs == 1:
@@ -121,30 +140,48 @@ class mpq(object):
 
     @property
     def numerator(self):
-        if self._numerator is None:
+        try:
+            return self._numerator
+        except AttributeError:
             num = _new_mpz()
             gmp.mpq_get_num(num, self._mpq)
-            self._numerator = mpz._from_c_mpz(num)
-        return self._numerator
+            num = self._numerator = mpz._from_c_mpz(num)
+            return num
 
     @property
     def denominator(self):
-        if self._denominator is None:
+        try:
+            return self._denominator
+        except AttributeError:
             den = _new_mpz()
             gmp.mpq_get_den(den, self._mpq)
-            self._denominator = mpz._from_c_mpz(den)
-        return self._denominator
+            den = self._denominator = mpz._from_c_mpz(den)
+            return den
 
     @classmethod
     def _from_c_mpq(cls, mpq):
         inst = object.__new__(cls)
-        inst._mpq = ffi.gc(mpq, _del_mpq)
+        inst._mpq = mpq
         return inst
 
+    def __del__(self):
+        try:
+            a = self._mpq
+        except AttributeError:
+            # __init__ failed before allocating
+            return
+        _del_mpq(a)
+
+    def __reduce__(self):
+        # copy and pickle must not share the mpq_t
+        return type(self), (int(self.numerator), int(self.denominator))
+
     def __str__(self):
-        if self._mpq_str is None:
-            self._mpq_str = _mpq_to_str(self._mpq, 10)
-        return self._mpq_str
+        try:
+            return self._mpq_str
+        except AttributeError:
+            s = self._mpq_str = _mpq_to_str(self._mpq, 10)
+            return s
 
     def __repr__(self):
         tmp = ("%s" % self).split('/')
@@ -297,15 +334,20 @@ class mpq(object):
         """
         Agrees with fractions.Fractions
         """
-        # XXX since this method is expensive, consider caching the result
-        if self == int(self):
-            return int(self)
-        if self == float(self):
-            return hash(float(self))
+        try:
+            return self._hash
+        except AttributeError:
+            pass
+        if _HASH_MODULUS is not None:
+            h = _mpq_hash(self._mpq)
+        elif self == int(self):
+            h = hash(int(self))
+        elif self == float(self):
+            h = hash(float(self))
         else:
-            num = long(mpz._from_c_mpz(gmp.mpq_numref(self._mpq)))
-            den = long(mpz._from_c_mpz(gmp.mpq_denref(self._mpq))) 
-            return hash((num, den))
+            h = hash((long(self.numerator), long(self.denominator)))
+        self._hash = h
+        return h
 
     def __cmp(self, other):
         if isinstance(other, mpq):
@@ -1,4 +1,4 @@
-import logging
+import io
 import sys
 
 from gmpy_cffi.interface import gmp, ffi
@@ -11,10 +11,105 @@ if sys.version > '3':
     xrange = range
 
 
+# Python hashes ints modulo this prime (see sys.hash_info)
+if hasattr(sys, 'hash_info') and sys.hash_info.modulus <= MAX_UI:
+    _HASH_MODULUS = sys.hash_info.modulus
+else:
+    _HASH_MODULUS = None
+
+
+def _mpz_hash(a):
+    """Return hash(int(a)) without converting a to an int."""
+    if _HASH_MODULUS is None:
+        return hash(_mpz_to_pylong(a))
+    h = gmp.mpz_tdiv_ui(a, _HASH_MODULUS)
+    if gmp.mpz_sgn(a) < 0:
+        h = -h
+    return -2 if h == -1 else h
+
+
+def _temp_mpz(n):
+    """Return a temporary mpz_t set to the int n, to be freed with _del_mpz."""
+    tmp = _new_mpz()
+    _pylong_to_mpz(n, tmp)
+    return tmp
+
+
+def _mpz_addmul(rop, b, c, sub=False):
+    """
+    Set rop to rop + b*c (rop - b*c if sub) without a temporary product.
+
+    b and c must be ints or mpz. A multiplier that fits in an unsigned long
+    uses mpz_addmul_ui/mpz_submul_ui.
+    """
+    if not isinstance(b, mpz):
+        b, c = c, b
+    temps = []
+    if isinstance(b, mpz):
+        b = b._mpz
+    else:
+        b = _temp_mpz(b)
+        temps.append(b)
+    if isinstance(c, mpz):
+        (gmp.mpz_submul if sub else gmp.mpz_addmul)(rop, b, c._mpz)
+    elif 0 <= c <= MAX_UI:
+        (gmp.mpz_submul_ui if sub else gmp.mpz_addmul_ui)(rop, b, c)
+    elif -MAX_UI <= c < 0:
+        (gmp.mpz_addmul_ui if sub else gmp.mpz_submul_ui)(rop, b, -c)
+    else:
+        c = _temp_mpz(c)
+        temps.append(c)
+        (gmp.mpz_submul if sub else gmp.mpz_addmul)(rop, b, c)
+    for tmp in temps:
+        _del_mpz(tmp)
+
+
+def _iter_digits(x, base, chunk):
+    """Generate the digits of the mpz x in pieces (see mpz.iter_digits)."""
+    if x < 0:
+        yield '-'
+        x = -x
+    # powers[k] == base**(chunk * 2**k), up to the first one above x
+    powers = [mpz(base) ** chunk]
+    while powers[-1] <= x:
+        powers.append(powers[-1] * powers[-1])
+    del powers[-1]
+    # Each entry is (n, level, pad) with n < base**(chunk * 2**level); n is
+    # written with exactly that many digits if pad
+    stack = [(x, len(powers), False)]
+    while stack:
+        n, level, pad = stack.pop()
+        if level == 0:
+            s = _mpz_to_str(n._mpz, base)
+            yield s.rjust(chunk, '0') if pad else s
+            continue
+        q, r = divmod(n, powers[level - 1])
+        if not stack or stack[0][1] < level:
+            # That was the last split at this level
+            powers[level - 1] = None
+        if pad or q:
+            stack.append((r, level - 1, True))
+            stack.append((q, level - 1, pad))
+        else:
+            stack.append((r, level - 1, False))
+
+
+def _pow_limbs(bits, exp):
+    """Return a lower bound for the limbs of n**exp, n having bits bits."""
+    return max(bits - 1, 0) * exp // gmp.GMP_NUMB_BITS + 1
+
+
+# mpz values in this range are interned (see set_mpz_intern)
+_intern_min = -5
+_intern_max = 256
+_interned = []
+
+
 class mpz(object):
-    _mpz_str = None
+    # _mpz_str and _hash are set lazily by __str__ and __hash__
+    __slots__ = ('_mpz', '_mpz_str', '_hash')
 
-    def __init__(self, n=0, base=None):
+    def __new__(cls, n=0, base=None):
         """
         mpz() -> mpz(0)
 
@@ -33,58 +128,238 @@ class mpz(object):
             are recognized by leading 0b, 0o, or 0x characters, otherwise
             the string is assumed to be decimal. Values for base can range
             between 2 and 62.
+
+        mpz(b, 256):
+
+            Return an 'mpz' object from the binary representation 'b'
+            (bytes, bytearray or memoryview): the absolute value, least
+            significant byte first, followed by a 0xFF byte if the value is
+            negative, as in gmpy.
         """
 
-        if isinstance(n, self.__class__):
-            self._mpz = n._mpz
-            return
-        a = self._mpz = ffi.gc(_new_mpz(), _del_mpz)
-        if isinstance(n, str):
+        if cls is mpz:
+            if (isinstance(n, (int, long)) and base is None and
+                    _intern_min <= n <= _intern_max):
+                return _interned[n - _intern_min]
+            if type(n) is mpz:
+                return n
+        self = object.__new__(cls)
+        a = self._mpz = _new_mpz()
+        if isinstance(n, (int, long)) and base is None:
+            _pyint_to_mpz(n, a)
+        elif isinstance(n, mpz):
+            gmp.mpz_set(a, n._mpz)
+        elif base == 256 and isinstance(n, (bytes, bytearray, memoryview)):
+            data = ffi.from_buffer(n)
+            size = len(data)
+            negative = size > 0 and data[size - 1] == b'\xff'
+            gmp.mpz_import(a, size - negative, -1, 1, 0, 0, data)
+            if negative:
+                gmp.mpz_neg(a, a)
+        elif isinstance(n, str):
             if base is None:
                 base = 10
             if base == 0 or 2 <= base <= 62:
                 if gmp.mpz_set_str(a, n.encode('UTF-8'), base) != 0:
                     raise ValueError("Can't create mpz from %s with base %s" % (n, base))
             else:
-                raise ValueError('base must be 0 or 2..62, not %s' % base)
+                raise ValueError(
+                    'base must be 0, 2..62 or 256 (for bytes), not %s' % base)
         elif base is not None:
             raise ValueError('Base only allowed for str, not for %s.' % type(n))
         elif isinstance(n, float):
             gmp.mpz_set_d(a, n)
-        elif isinstance(n, (int, long)):
-            _pyint_to_mpz(n, a)
         else:
             raise TypeError
+        return self
 
     @classmethod
-    def _from_c_mpz(cls, mpz):
+    def _from_c_mpz(cls, a):
+        size = a._mp_size
+        if -1 <= size <= 1 and cls is mpz:
+            n = gmp.mpz_get_ui(a)
+            if size < 0:
+                n = -n
+            if _intern_min <= n <= _intern_max:
+                _del_mpz(a)
+                return _interned[n - _intern_min]
         inst = object.__new__(cls)
-        inst._mpz = ffi.gc(mpz, _del_mpz)
+        inst._mpz = a
         return inst
 
+    def __del__(self):
+        # Each instance owns its mpz_t, which is cheaper than ffi.gc
+        _del_mpz(self._mpz)
+
+    def __reduce__(self):
+        # The default reduction would call mpz.__new__() with no arguments
+        # and overwrite the slots of the interned mpz(0)
+        return type(self), (int(self),)
+
     def __str__(self):
-        if self._mpz_str is None:
-            self._mpz_str = _mpz_to_str(self._mpz, 10)
-        return self._mpz_str
+        try:
+            return self._mpz_str
+        except AttributeError:
+            s = self._mpz_str = _mpz_to_str(self._mpz, 10)
+            return s
 
     def __repr__(self):
         return 'mpz(%s)' % self
 
     def __hex__(self):
-        tmp = '0x' + _mpz_to_str(abs(self)._mpz, 16)
-        return tmp if self >= 0 else '-' + tmp
+        # Don't format abs(self)._mpz: the temporary would free its mpz_t
+        tmp = _mpz_to_str(self._mpz, 16)
+        return '-0x' + tmp[1:] if tmp[0] == '-' else '0x' + tmp
 
     def __oct__(self):
-        tmp = '0' + _mpz_to_str(abs(self)._mpz, 8)
-        return tmp if self >= 0 else '-' + tmp
+        tmp = _mpz_to_str(self._mpz, 8)
+        return '-0' + tmp[1:] if tmp[0] == '-' else '0' + tmp
+
+    def iter_digits(self, base=10, chunk=65536):
+        """
+        x.iter_digits([base=10[, chunk=65536]]) -> iterator
+
+        Return an iterator over the string representation of x in the given
+        base (2 to 62), in pieces of at most chunk digits, most significant
+        first, so that the whole string is never in memory at once. The
+        pieces are made by splitting x recursively by the powers
+        base**(chunk * 2**k), which are computed once per call.
+        """
+        if not 2 <= base <= 62:
+            raise ValueError("base must be in the interval 2 ... 62")
+        if chunk < 1:
+            raise ValueError("chunk must be positive")
+        # +x copies an xmpz, so that it can't change during the iteration
+        return _iter_digits(+self, base, chunk)
+
+    def write_digits(self, file, base=10, chunk=65536):
+        """
+        x.write_digits(file[, base=10[, chunk=65536]]) -> int
+
+        Write the string representation of x in the given base to file, a
+        piece at a time (see iter_digits), and return the number of
+        characters written. Text files (io.TextIOBase) are written str,
+        other file objects ASCII bytes.
+        """
+        encode = sys.version > '3' and not isinstance(file, io.TextIOBase)
+        write = file.write
+        count = 0
+        for piece in self.iter_digits(base, chunk):
+            write(piece.encode('ascii') if encode else piece)
+            count += len(piece)
+        return count
+
+    def num_digits(self, base=10):
+        """
+        x.num_digits([base=10]) -> int
+
+        Return length of string representing the absolute value of x in
+        the given base. Values for base can range between 2 and 62. The
+        value returned may be 1 too large.
+        """
+        if not isinstance(base, (int, long)):
+            raise TypeError("integer argument expected, got %s" % type(base))
+        if not 2 <= base <= 62:
+            raise ValueError("base must be in the interval 2 ... 62")
+        return gmp.mpz_sizeinbase(self._mpz, base)
+
+    def to_bytes(self, length, byteorder, signed=False):
+        """
+        x.to_bytes(length, byteorder, signed=False) -> bytes
+
+        Return an array of bytes representing x, like int.to_bytes.
+        byteorder is 'big' or 'little'. If signed is False, x must not be
+        negative; otherwise it is stored in two's complement. Raises
+        OverflowError if x doesn't fit in length bytes.
+        """
+        if byteorder not in ('big', 'little'):
+            raise ValueError("byteorder must be either 'little' or 'big'")
+        if length < 0:
+            raise ValueError("length argument must be non-negative")
+        a = self._mpz
+        nbits = 8 * length
+        tmp = None
+        if gmp.mpz_sgn(a) < 0:
+            if not signed:
+                raise OverflowError("can't convert negative int to unsigned")
+            # Two's complement: store 2**nbits + x, which must have exactly
+            # nbits bits if -2**(nbits - 1) <= x
+            a = tmp = _new_mpz()
+            gmp.mpz_set_ui(a, 1)
+            gmp.mpz_mul_2exp(a, a, nbits)
+            gmp.mpz_add(a, a, self._mpz)
+            fits = (gmp.mpz_sgn(a) > 0 and
+                    gmp.mpz_sizeinbase(a, 2) == nbits)
+        else:
+            fits = (gmp.mpz_sgn(a) == 0 or
+                    gmp.mpz_sizeinbase(a, 2) <= nbits - bool(signed))
+        if not fits:
+            if tmp is not None:
+                _del_mpz(tmp)
+            raise OverflowError("int too big to convert")
+        p = ffi.new('char[]', length)
+        if byteorder == 'big':
+            # Right-align the significant bytes after the zero padding
+            count = (gmp.mpz_sizeinbase(a, 2) + 7) // 8 if gmp.mpz_sgn(a) else 0
+            gmp.mpz_export(p + (length - count), ffi.NULL, 1, 1, 0, 0, a)
+        else:
+            gmp.mpz_export(p, ffi.NULL, -1, 1, 0, 0, a)
+        if tmp is not None:
+            _del_mpz(tmp)
+        return ffi.buffer(p)[:]
+
+    @classmethod
+    def from_bytes(cls, bytes, byteorder, signed=False):
+        """
+        mpz.from_bytes(bytes, byteorder, signed=False) -> mpz
+
+        Return the integer represented by the given array of bytes, like
+        int.from_bytes. bytes is any object supporting the buffer
+        protocol. byteorder is 'big' or 'little'. If signed is True, the
+        bytes are read as two's complement.
+        """
+        if byteorder not in ('big', 'little'):
+            raise ValueError("byteorder must be either 'little' or 'big'")
+        data = ffi.from_buffer(bytes)
+        # The size in bytes: len(bytes) counts items, which may be wider
+        n = len(data)
+        res = _new_mpz()
+        gmp.mpz_import(res, n, 1 if byteorder == 'big' else -1, 1, 0, 0, data)
+        if (signed and gmp.mpz_sgn(res) and
+                gmp.mpz_sizeinbase(res, 2) == 8 * n):
+            # The sign bit is set: subtract 2**(8*n)
+            tmp = _new_mpz()
+            gmp.mpz_set_ui(tmp, 1)
+            gmp.mpz_mul_2exp(tmp, tmp, 8 * n)
+            gmp.mpz_sub(res, res, tmp)
+            _del_mpz(tmp)
+        return cls._from_c_mpz(res)
+
+    def limbs(self):
+        """
+        x.limbs() -> memoryview
+
+        Return a view of the limbs of abs(x), least significant limb first,
+        in native byte order, without copying them. The view keeps x alive
+        and is read-only (on Python 3.8 and later).
+        """
+        a = self._mpz
+        # The destructor holds a reference to self for as long as the view
+        # uses the pointer
+        p = ffi.gc(gmp.mpz_limbs_read(a), lambda p, owner=self: None)
+        view = memoryview(
+            ffi.buffer(p, gmp.mpz_size(a) * (gmp.GMP_LIMB_BITS // 8)))
+        return view.toreadonly() if hasattr(view, 'toreadonly') else view
 
     def __add__(self, other):
         if isinstance(other, (int, long)):
             res = _new_mpz()
             if 0 <= other <= MAX_UI:
                 gmp.mpz_add_ui(res, self._mpz, other)
+            elif -MAX_UI <= other < 0:
+                gmp.mpz_sub_ui(res, self._mpz, -other)
             else:
-                _pyint_to_mpz(other, res)
+                _pylong_to_mpz(other, res)
                 gmp.mpz_add(res, self._mpz, res)
             return mpz._from_c_mpz(res)
         elif isinstance(other, mpz):
@@ -101,6 +376,8 @@ class mpz(object):
             res = _new_mpz()
             if 0 <= other <= MAX_UI:
                 gmp.mpz_sub_ui(res, self._mpz, other)
+            elif -MAX_UI <= other < 0:
+                gmp.mpz_add_ui(res, self._mpz, -other)
             else:
                 _pylong_to_mpz(other, res)
                 gmp.mpz_sub(res, self._mpz, res)
@@ -117,6 +394,10 @@ class mpz(object):
             res = _new_mpz()
             if 0 <= other <= MAX_UI:
                 gmp.mpz_ui_sub(res, other, self._mpz)
+            elif -MAX_UI <= other < 0:
+                # other - x == -(x + |other|)
+                gmp.mpz_add_ui(res, self._mpz, -other)
+                gmp.mpz_neg(res, res)
             else:
                 _pylong_to_mpz(other, res)
                 gmp.mpz_sub(res, res, self._mpz)
@@ -126,15 +407,19 @@ class mpz(object):
 
     def __mul__(self, other):
         if isinstance(other, (int, long)):
-            res = _new_mpz()
             if 0 <= other <= MAX_UI:
+                res = _new_mpz(abs(self._mpz._mp_size) + 1)
                 gmp.mpz_mul_ui(res, self._mpz, other)
+            elif -sys.maxsize - 1 <= other < 0:
+                res = _new_mpz(abs(self._mpz._mp_size) + 1)
+                gmp.mpz_mul_si(res, self._mpz, other)
             else:
+                res = _new_mpz()
                 _pylong_to_mpz(other, res)
                 gmp.mpz_mul(res, res, self._mpz)
             return mpz._from_c_mpz(res)
         elif isinstance(other, mpz):
-            res = _new_mpz()
+            res = _new_mpz(abs(self._mpz._mp_size) + abs(other._mpz._mp_size))
             gmp.mpz_mul(res, self._mpz, other._mpz)
             return mpz._from_c_mpz(res)
         else:
@@ -149,6 +434,10 @@ class mpz(object):
             res = _new_mpz()
             if 0 < other <= MAX_UI:
                 gmp.mpz_fdiv_q_ui(res, self._mpz, other)
+            elif -MAX_UI <= other < 0:
+                # floor(x / -d) == -ceil(x / d)
+                gmp.mpz_cdiv_q_ui(res, self._mpz, -other)
+                gmp.mpz_neg(res, res)
             else:
                 _pylong_to_mpz(other, res)
                 gmp.mpz_fdiv_q(res, self._mpz, res)
@@ -183,11 +472,12 @@ class mpz(object):
             r = _new_mpz()
             if 0 <= other <= MAX_UI:
                 gmp.mpz_fdiv_r_ui(r, self._mpz, other)
+            elif -MAX_UI <= other < 0:
+                # The remainder takes the sign of the divisor
+                gmp.mpz_cdiv_r_ui(r, self._mpz, -other)
             else:
-                oth = _new_mpz()
-                _pylong_to_mpz(other, oth)
-                gmp.mpz_fdiv_r(r, self._mpz, oth)
-                _del_mpz(oth)
+                _pylong_to_mpz(other, r)
+                gmp.mpz_fdiv_r(r, self._mpz, r)
             return mpz._from_c_mpz(r)
         elif isinstance(other, mpz):
             if other == 0:
@@ -204,10 +494,8 @@ class mpz(object):
         if self == 0:
             raise ZeroDivisionError('mpz modulo by zero')
         r = _new_mpz()
-        oth = _new_mpz()
-        _pylong_to_mpz(other, oth)
-        gmp.mpz_fdiv_r(r, oth, self._mpz)
-        _del_mpz(oth)
+        _pylong_to_mpz(other, r)
+        gmp.mpz_fdiv_r(r, r, self._mpz)
         return mpz._from_c_mpz(r)
 
     def __divmod__(self, other):
@@ -218,11 +506,12 @@ class mpz(object):
             r = _new_mpz()
             if 0 <= other <= MAX_UI:
                 gmp.mpz_fdiv_qr_ui(q, r, self._mpz, other)
+            elif -MAX_UI <= other < 0:
+                gmp.mpz_cdiv_qr_ui(q, r, self._mpz, -other)
+                gmp.mpz_neg(q, q)
             else:
-                oth = _new_mpz()
-                _pylong_to_mpz(other, oth)
-                gmp.mpz_fdiv_qr(q, r, self._mpz, oth)
-                _del_mpz(oth)
+                _pylong_to_mpz(other, r)
+                gmp.mpz_fdiv_qr(q, r, self._mpz, r)
             return mpz._from_c_mpz(q), mpz._from_c_mpz(r)
         elif isinstance(other, mpz):
             if other == 0:
@@ -241,17 +530,17 @@ class mpz(object):
             raise ZeroDivisionError('mpz modulo by zero')
         q = _new_mpz()
         r = _new_mpz()
-        oth = _new_mpz()
-        _pylong_to_mpz(other, oth)
-        gmp.mpz_fdiv_qr(q, r, oth, self._mpz)
-        _del_mpz(oth)
+        _pylong_to_mpz(other, q)
+        gmp.mpz_fdiv_qr(q, r, q, self._mpz)
         return mpz._from_c_mpz(q), mpz._from_c_mpz(r)
 
     def __lshift__(self, other):
         if not isinstance(other, (int, long, mpz)):
             return NotImplemented
         oth = gmp.mpz_get_ui(other._mpz) if isinstance(other, mpz) else other
-        res = _new_mpz()
+        size = abs(self._mpz._mp_size)
+        # 0 << n is still 0, so don't reserve room for the shift
+        res = _new_mpz(size + oth // gmp.GMP_NUMB_BITS + 1 if size else 1)
         gmp.mpz_mul_2exp(res, self._mpz, oth)
         return mpz._from_c_mpz(res)
 
@@ -274,11 +563,11 @@ class mpz(object):
         return mpz(other) >> self
 
     def __hash__(self):
-        # WTF When this returns -1, CPython silently changes it to -2
-        i = int(self)
-        if -sys.maxsize - 1 <= i <= sys.maxsize:
-            return i
-        return (i + sys.maxsize + 1) % (2 * sys.maxsize + 2) - sys.maxsize - 1
+        try:
+            return self._hash
+        except AttributeError:
+            h = self._hash = _mpz_hash(self._mpz)
+            return h
 
     def __cmp(self, other):
         if isinstance(other, mpz):
@@ -286,6 +575,8 @@ class mpz(object):
         elif isinstance(other, (int, long)):
             if 0 <= other <= MAX_UI:
                 res = gmp.mpz_cmp_ui(self._mpz, other)
+            elif -sys.maxsize - 1 <= other < 0:
+                res = gmp.mpz_cmp_si(self._mpz, other)
             else:
                 oth = _new_mpz()
                 _pylong_to_mpz(other, oth)
@@ -367,41 +658,42 @@ class mpz(object):
         return mpz._from_c_mpz(res)
 
     def __and__(self, other):
-        res = _new_mpz()
         if isinstance(other, (int, long)):
-            oth = _new_mpz()
-            _pyint_to_mpz(other, oth)
-            gmp.mpz_and(res, self._mpz, oth)
-            _del_mpz(oth)
-        else:
+            # GMP has no _ui bitwise functions, so use res as the operand
+            res = _new_mpz()
+            _pyint_to_mpz(other, res)
+            gmp.mpz_and(res, self._mpz, res)
+        elif isinstance(other, mpz):
+            res = _new_mpz()
             gmp.mpz_and(res, self._mpz, other._mpz)
-
+        else:
+            return NotImplemented
         return mpz._from_c_mpz(res)
     __rand__ = __and__
 
     def __or__(self, other):
-        res = _new_mpz()
         if isinstance(other, (int, long)):
-            oth = _new_mpz()
-            _pyint_to_mpz(other, oth)
-            gmp.mpz_ior(res, self._mpz, oth)
-            _del_mpz(oth)
-        else:
+            res = _new_mpz()
+            _pyint_to_mpz(other, res)
+            gmp.mpz_ior(res, self._mpz, res)
+        elif isinstance(other, mpz):
+            res = _new_mpz()
             gmp.mpz_ior(res, self._mpz, other._mpz)
-
+        else:
+            return NotImplemented
         return mpz._from_c_mpz(res)
     __ror__ = __or__
 
     def __xor__(self, other):
-        res = _new_mpz()
         if isinstance(other, (int, long)):
-            oth = _new_mpz()
-            _pyint_to_mpz(other, oth)
-            gmp.mpz_xor(res, self._mpz, oth)
-            _del_mpz(oth)
-        else:
+            res = _new_mpz()
+            _pyint_to_mpz(other, res)
+            gmp.mpz_xor(res, self._mpz, res)
+        elif isinstance(other, mpz):
+            res = _new_mpz()
             gmp.mpz_xor(res, self._mpz, other._mpz)
-
+        else:
+            return NotImplemented
         return mpz._from_c_mpz(res)
     __rxor__ = __xor__
 
@@ -419,13 +711,15 @@ class mpz(object):
         if power < 0:
             raise ValueError('mpz.pow with negative exponent')
 
-        res = _new_mpz()
         if modulo is None:
             exp = int(power)
             if exp > MAX_UI:
                 raise ValueError('mpz.pow with outragous exponent')
+            res = _new_mpz(_pow_limbs(
+                gmp.mpz_sizeinbase(self._mpz, 2), exp))
             gmp.mpz_pow_ui(res, self._mpz, exp)
         else:
+            res = _new_mpz()
             del_mod = del_exp = False
             if isinstance(modulo, (int, long)):
                 mod = _new_mpz()
@@ -457,11 +751,10 @@ class mpz(object):
         if self < 0:
             raise ValueError('mpz.pow with negative exponent')
 
-        res = _new_mpz()
-
         exp = int(self)
         if exp > MAX_UI:
             raise ValueError('mpz.pow with outragous exponent')
+        res = _new_mpz(_pow_limbs(abs(other).bit_length(), exp))
         if 0 <= other <= MAX_UI:
             gmp.mpz_ui_pow_ui(res, other, exp)
         else:
@@ -471,3 +764,43 @@ class mpz(object):
             _del_mpz(base)
 
         return mpz._from_c_mpz(res)
+
+
+def get_mpz_intern():
+    """
+    get_mpz_intern() -> (min, max)
+
+    Return the range of interned mpz values.
+    """
+    return _intern_min, _intern_max
+
+
+def set_mpz_intern(min, max):
+    """
+    set_mpz_intern(min, max)
+
+    Intern the mpz values from min to max: mpz() and mpz operations return
+    shared instances for them instead of allocating new ones. At most 10000
+    values can be interned. set_mpz_intern(0, -1) disables interning. The
+    default range is -5..256.
+    """
+    global _intern_min, _intern_max, _interned
+    if not isinstance(min, (int, long)) or not isinstance(max, (int, long)):
+        raise TypeError("integer arguments expected")
+    if not -1 <= max - min < 10000:
+        raise ValueError("intern range must hold 0 to 10000 values")
+    interned = []
+    for n in xrange(min, max + 1):
+        a = _new_mpz()
+        _pyint_to_mpz(n, a)
+        inst = object.__new__(mpz)
+        inst._mpz = a
+        interned.append(inst)
+    # Empty the range while the table is replaced
+    _intern_min = float('inf')
+    _interned = interned
+    _intern_max = max
+    _intern_min = min
+
+
+set_mpz_intern(_intern_min, _intern_max)
@@ -0,0 +1,415 @@
+import sys
+from array import array
+
+from gmpy_cffi.interface import gmp, ffi
+from gmpy_cffi.convert import _pyint_to_mpz, _mpz_to_pylong, _new_uncleared
+from gmpy_cffi.cache import _new_mpz, _limb_bytes
+from gmpy_cffi.mpz import mpz
+from gmpy_cffi import memory
+
+
+if sys.version > '3':
+    long = int
+    xrange = range
+
+
+# array typecode of a native 64-bit integer, to convert lists of small ints
+# in bulk
+_INT64 = None
+for _code in 'ql':
+    try:
+        if array(_code).itemsize == 8:
+            _INT64 = _code
+            break
+    except ValueError:
+        pass
+
+_NATIVE = '@=' + ('<' if sys.byteorder == 'little' else '>')
+
+
+def _raise(op, err):
+    """Raise the exception for error code err of an elementwise op."""
+    if err == 1:
+        if op == gmp.GMPY_CFFI_OP_MOD:
+            raise ZeroDivisionError('mpz_array modulo by zero')
+        if op == gmp.GMPY_CFFI_OP_POW:
+            raise ValueError('mpz_array.pow with zero modulus')
+        raise ZeroDivisionError('mpz_array division by zero')
+    if op == gmp.GMPY_CFFI_OP_POW:
+        if err == 2:
+            raise ValueError('mpz_array.pow with negative exponent')
+        raise ValueError('mpz_array.pow with outragous exponent')
+    if err == 2:
+        raise ValueError('negative shift count')
+    raise OverflowError('shift count too large')
+
+
+def _binary(op, reflected=False, inplace=False):
+    """Return a method computing self op other elementwise."""
+    def method(self, other):
+        b = self._operand(other)
+        if b is None:
+            return NotImplemented
+        a = (self._data, 1)
+        if reflected:
+            a, b = b, a
+        return self._apply(op, a, b, self if inplace else None)
+    return method
+
+
+def _compare(lt, eq, gt):
+    """Return a method comparing self and other elementwise."""
+    def method(self, other):
+        b = self._operand(other)
+        if b is None:
+            return NotImplemented
+        res = ffi.new('_Bool[]', self._size)
+        gmp.gmpy_cffi_mpz_array_cmp(res, self._data, 1, b[0], b[1],
+                                    self._size, lt, eq, gt)
+        return ffi.unpack(res, self._size)
+    return method
+
+
+def _int64_kind(view):
+    """
+    Return 'int64' or 'uint64' if view is a contiguous one-dimensional
+    buffer of native 64-bit integers, else None.
+    """
+    if view.ndim != 1 or not view.c_contiguous or view.itemsize != 8:
+        return None
+    fmt = view.format.lstrip(_NATIVE)
+    if fmt in ('q', 'l'):
+        return 'int64'
+    if fmt in ('Q', 'L'):
+        return 'uint64'
+    return None
+
+
+class mpz_array(object):
+    """
+    mpz_array() -> empty mpz_array
+
+    mpz_array(iterable) -> mpz_array
+
+        Return an array of the integers (int or mpz) in iterable, stored in
+        one contiguous block of mpz_t. A list of ints that fit in 64 bits,
+        an array('q') or a numpy int64 array is converted in a single call.
+
+    mpz_array.zeros(n) and mpz_array.frombytes(b, itemsize, byteorder)
+    also create arrays. The length is fixed. Indexing returns a copy of
+    the element as an mpz, and slicing a new mpz_array.
+
+    Arithmetic (+, -, *, //, %, **, pow(a, e, m)), shifts and bitwise
+    operators work elementwise between arrays of the same length, or an
+    array and an integer, with one C call per operation. Comparisons
+    return a list of bools. See also gcd() and powm().
+    """
+
+    __slots__ = ('_data', '_size')
+    __hash__ = None
+
+    def __init__(self, values=()):
+        if isinstance(values, mpz_array):
+            self._alloc(values._size)
+            gmp.gmpy_cffi_mpz_array_set(self._data, values._data, self._size)
+            return
+        try:
+            view = memoryview(values)
+        except TypeError:
+            view = None
+        if view is not None:
+            kind = _int64_kind(view)
+            if kind is not None:
+                self._alloc(len(view))
+                src = ffi.from_buffer(view)
+                if kind == 'int64':
+                    gmp.gmpy_cffi_mpz_array_set_int64(
+                        self._data, ffi.cast('int64_t *', src), self._size)
+                else:
+                    gmp.gmpy_cffi_mpz_array_set_uint64(
+                        self._data, ffi.cast('uint64_t *', src), self._size)
+                return
+            if view.ndim > 1:
+                raise ValueError('mpz_array() needs a one-dimensional buffer')
+            values = view.tolist()
+        elif not isinstance(values, (list, tuple)):
+            values = list(values)
+        self._alloc(len(values))
+        self._fill(values)
+
+    def _alloc(self, n):
+        self._data = _new_uncleared('__mpz_struct[]', n)
+        self._size = n
+        gmp.gmpy_cffi_mpz_array_init(self._data, n)
+
+    def _fill(self, values):
+        if _INT64 is not None:
+            try:
+                buf = array(_INT64, values)
+            except (OverflowError, TypeError):
+                pass
+            else:
+                gmp.gmpy_cffi_mpz_array_set_int64(
+                    self._data, ffi.cast('int64_t *', ffi.from_buffer(buf)),
+                    self._size)
+                return
+        data = self._data
+        for i, x in enumerate(values):
+            if isinstance(x, mpz):
+                gmp.mpz_set(data + i, x._mpz)
+            elif isinstance(x, (int, long)):
+                _pyint_to_mpz(x, data + i)
+            else:
+                raise TypeError('mpz_array() requires integer elements, '
+                                'not %s' % type(x).__name__)
+
+    @classmethod
+    def zeros(cls, n):
+        """
+        mpz_array.zeros(n) -> mpz_array
+
+        Return an array of n zeros.
+        """
+        if not isinstance(n, (int, long, mpz)):
+            raise TypeError('an integer is required')
+        if n < 0:
+            raise ValueError('negative array size')
+        self = cls.__new__(cls)
+        self._alloc(int(n))
+        return self
+
+    @classmethod
+    def frombytes(cls, b, itemsize, byteorder, signed=False):
+        """
+        mpz_array.frombytes(b, itemsize, byteorder, signed=False) -> mpz_array
+
+        Return the array of the integers packed in the buffer b, each
+        itemsize bytes long, read like int.from_bytes with the given
+        byteorder ('big' or 'little') and signedness. len(b) must be a
+        multiple of itemsize.
+        """
+        if byteorder not in ('big', 'little'):
+            raise ValueError("byteorder must be either 'little' or 'big'")
+        if not isinstance(itemsize, (int, long)):
+            raise TypeError('an integer is required')
+        # The length of a cffi buffer is in bytes, whatever the buffer's shape
+        data = ffi.from_buffer(b)
+        nbytes = len(data)
+        if itemsize <= 0 or nbytes % itemsize:
+            raise ValueError('buffer size must be a multiple of itemsize')
+        self = cls.__new__(cls)
+        self._alloc(nbytes // itemsize)
+        gmp.gmpy_cffi_mpz_array_import(
+            self._data, self._size, ffi.cast('unsigned char *', data),
+            itemsize, 1 if byteorder == 'big' else -1, bool(signed))
+        return self
+
+    def __del__(self):
+        try:
+            data = self._data
+        except AttributeError:
+            return
+        gmp.gmpy_cffi_mpz_array_clear(data, self._size)
+
+    def __reduce__(self):
+        return type(self), (self.tolist(),)
+
+    def __len__(self):
+        return self._size
+
+    def _index(self, i):
+        if not isinstance(i, (int, long, mpz)):
+            raise TypeError('mpz_array indices must be integers or slices, '
+                            'not %s' % type(i).__name__)
+        i = int(i)
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError('mpz_array index out of range')
+        return i
+
+    def _get(self, i):
+        res = _new_mpz()
+        gmp.mpz_set(res, self._data + i)
+        return mpz._from_c_mpz(res)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._size)
+            if step == 1:
+                res = mpz_array.zeros(max(stop - start, 0))
+                gmp.gmpy_cffi_mpz_array_set(
+                    res._data, self._data + start, res._size)
+                return res
+            return mpz_array([self._get(j)
+                              for j in xrange(start, stop, step)])
+        return self._get(self._index(i))
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            indices = xrange(*i.indices(self._size))
+            if not isinstance(value, mpz_array) or value is self:
+                value = mpz_array(value)
+            if len(value) != len(indices):
+                raise ValueError(
+                    'attempt to assign sequence of size %s to slice of '
+                    'size %s' % (len(value), len(indices)))
+            for j, k in enumerate(indices):
+                gmp.mpz_set(self._data + k, value._data + j)
+            return
+        p = self._data + self._index(i)
+        if isinstance(value, mpz):
+            gmp.mpz_set(p, value._mpz)
+        elif isinstance(value, (int, long)):
+            _pyint_to_mpz(value, p)
+        else:
+            raise TypeError('mpz_array requires integer elements, not %s' %
+                            type(value).__name__)
+
+    def __iter__(self):
+        for i in xrange(self._size):
+            yield self._get(i)
+
+    def _operand(self, other):
+        """
+        Return (pointer, stride) for other as an operand, or None. The
+        stride is 0 for a scalar. Temporaries converted from other are
+        kept alive by the pointer.
+        """
+        if isinstance(other, (list, tuple)):
+            other = mpz_array(other)
+            if other._size == self._size:
+                return ffi.gc(ffi.cast('__mpz_struct *', other._data),
+                              lambda p, owner=other: None), 1
+        if isinstance(other, mpz_array):
+            if other._size != self._size:
+                raise ValueError('mpz_array length mismatch: %s and %s' % (
+                    self._size, other._size))
+            return other._data, 1
+        if isinstance(other, (int, long, mpz)):
+            scalar = mpz(other)
+            return ffi.gc(scalar._mpz, lambda p, owner=scalar: None), 0
+        return None
+
+    def _apply(self, op, a, b, out=None):
+        if out is None:
+            out = mpz_array.zeros(self._size)
+        if memory._limit is not None and op in (gmp.GMPY_CFFI_OP_POW,
+                                                gmp.GMPY_CFFI_OP_LSHIFT):
+            limbs = gmp.gmpy_cffi_mpz_array_growth(
+                op, out._data, a[0], a[1], b[0], b[1], self._size)
+            memory._reserve(int(limbs) * _limb_bytes)
+        err = gmp.gmpy_cffi_mpz_array_binop(op, out._data, a[0], a[1],
+                                            b[0], b[1], self._size)
+        if err:
+            _raise(op, err)
+        return out
+
+    __add__ = _binary(gmp.GMPY_CFFI_OP_ADD)
+    __radd__ = _binary(gmp.GMPY_CFFI_OP_ADD, reflected=True)
+    __iadd__ = _binary(gmp.GMPY_CFFI_OP_ADD, inplace=True)
+    __sub__ = _binary(gmp.GMPY_CFFI_OP_SUB)
+    __rsub__ = _binary(gmp.GMPY_CFFI_OP_SUB, reflected=True)
+    __isub__ = _binary(gmp.GMPY_CFFI_OP_SUB, inplace=True)
+    __mul__ = _binary(gmp.GMPY_CFFI_OP_MUL)
+    __rmul__ = _binary(gmp.GMPY_CFFI_OP_MUL, reflected=True)
+    __imul__ = _binary(gmp.GMPY_CFFI_OP_MUL, inplace=True)
+    __floordiv__ = __div__ = _binary(gmp.GMPY_CFFI_OP_FLOORDIV)
+    __rfloordiv__ = __rdiv__ = _binary(gmp.GMPY_CFFI_OP_FLOORDIV,
+                                       reflected=True)
+    __ifloordiv__ = __idiv__ = _binary(gmp.GMPY_CFFI_OP_FLOORDIV,
+                                       inplace=True)
+    __mod__ = _binary(gmp.GMPY_CFFI_OP_MOD)
+    __rmod__ = _binary(gmp.GMPY_CFFI_OP_MOD, reflected=True)
+    __imod__ = _binary(gmp.GMPY_CFFI_OP_MOD, inplace=True)
+    __rpow__ = _binary(gmp.GMPY_CFFI_OP_POW, reflected=True)
+    __lshift__ = _binary(gmp.GMPY_CFFI_OP_LSHIFT)
+    __rlshift__ = _binary(gmp.GMPY_CFFI_OP_LSHIFT, reflected=True)
+    __ilshift__ = _binary(gmp.GMPY_CFFI_OP_LSHIFT, inplace=True)
+    __rshift__ = _binary(gmp.GMPY_CFFI_OP_RSHIFT)
+    __rrshift__ = _binary(gmp.GMPY_CFFI_OP_RSHIFT, reflected=True)
+    __irshift__ = _binary(gmp.GMPY_CFFI_OP_RSHIFT, inplace=True)
+    __and__ = _binary(gmp.GMPY_CFFI_OP_AND)
+    __rand__ = _binary(gmp.GMPY_CFFI_OP_AND, reflected=True)
+    __iand__ = _binary(gmp.GMPY_CFFI_OP_AND, inplace=True)
+    __or__ = _binary(gmp.GMPY_CFFI_OP_IOR)
+    __ror__ = _binary(gmp.GMPY_CFFI_OP_IOR, reflected=True)
+    __ior__ = _binary(gmp.GMPY_CFFI_OP_IOR, inplace=True)
+    __xor__ = _binary(gmp.GMPY_CFFI_OP_XOR)
+    __rxor__ = _binary(gmp.GMPY_CFFI_OP_XOR, reflected=True)
+    __ixor__ = _binary(gmp.GMPY_CFFI_OP_XOR, inplace=True)
+
+    __lt__ = _compare(True, False, False)
+    __le__ = _compare(True, True, False)
+    __eq__ = _compare(False, True, False)
+    __ne__ = _compare(True, False, True)
+    __gt__ = _compare(False, False, True)
+    __ge__ = _compare(False, True, True)
+
+    def __pow__(self, other, modulo=None):
+        if modulo is not None:
+            return self.powm(other, modulo)
+        b = self._operand(other)
+        if b is None:
+            return NotImplemented
+        return self._apply(gmp.GMPY_CFFI_OP_POW, (self._data, 1), b)
+
+    def __ipow__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return NotImplemented
+        return self._apply(gmp.GMPY_CFFI_OP_POW, (self._data, 1), b, self)
+
+    def __neg__(self):
+        return self._apply(gmp.GMPY_CFFI_OP_NEG, (self._data, 1),
+                           (self._data, 1))
+
+    def __pos__(self):
+        return mpz_array(self)
+
+    def __abs__(self):
+        return self._apply(gmp.GMPY_CFFI_OP_ABS, (self._data, 1),
+                           (self._data, 1))
+
+    def gcd(self, other):
+        """
+        a.gcd(b) -> mpz_array
+
+        Return the elementwise greatest common divisor of a and b (an
+        mpz_array of the same length or an integer).
+        """
+        b = self._operand(other)
+        if b is None:
+            raise TypeError('gcd() requires integer or mpz_array arguments')
+        return self._apply(gmp.GMPY_CFFI_OP_GCD, (self._data, 1), b)
+
+    def powm(self, exp, mod):
+        """
+        a.powm(exp, mod) -> mpz_array
+
+        Return pow(a[i], exp[i], mod[i]) for every element, where exp and
+        mod are each an mpz_array of the same length or an integer. Same as
+        pow(a, exp, mod).
+        """
+        e, m = self._operand(exp), self._operand(mod)
+        if e is None or m is None:
+            raise TypeError('powm() requires integer or mpz_array arguments')
+        res = mpz_array.zeros(self._size)
+        err = gmp.gmpy_cffi_mpz_array_powm(res._data, self._data, 1,
+                                           e[0], e[1], m[0], m[1],
+                                           self._size)
+        if err:
+            _raise(gmp.GMPY_CFFI_OP_POW, err)
+        return res
+
+    def tolist(self):
+        """
+        a.tolist() -> list
+
+        Return the elements of a as a list of Python ints.
+        """
+        data = self._data
+        return [_mpz_to_pylong(data + i) for i in xrange(self._size)]
+
+    def __repr__(self):
+        return 'mpz_array([%s])' % ', '.join(str(x) for x in self)
@@ -1,7 +1,8 @@
 import sys
+import math
 
 from gmpy_cffi.interface import gmp
-from gmpy_cffi.mpz import mpz, _new_mpz
+from gmpy_cffi.mpz import mpz, _new_mpz, _del_mpz, _mpz_addmul
 
 
 PY3 = sys.version.startswith('3')
@@ -116,6 +117,59 @@ def invert(x, m):
     return mpz._from_c_mpz(res)
 
 
+def addmul(a, b, c):
+    """
+    addmul(a, b, c) -> mpz
+
+    Return a + b*c, without creating the product b*c.
+    """
+    a = _check_mpz('addmul', 'a', a)
+    _check_mpz('addmul', 'b', b)
+    _check_mpz('addmul', 'c', c)
+    res = _new_mpz()
+    gmp.mpz_set(res, a._mpz)
+    _mpz_addmul(res, b, c)
+    return mpz._from_c_mpz(res)
+
+
+def submul(a, b, c):
+    """
+    submul(a, b, c) -> mpz
+
+    Return a - b*c, without creating the product b*c.
+    """
+    a = _check_mpz('submul', 'a', a)
+    _check_mpz('submul', 'b', b)
+    _check_mpz('submul', 'c', c)
+    res = _new_mpz()
+    gmp.mpz_set(res, a._mpz)
+    _mpz_addmul(res, b, c, sub=True)
+    return mpz._from_c_mpz(res)
+
+
+def dot(xs, ys):
+    """
+    dot(xs, ys) -> mpz
+
+    Return the sum of x*y for the pairs of integers in xs and ys, which
+    must have the same length. The sum is accumulated in place, without
+    creating the products.
+    """
+    xs, ys = list(xs), list(ys)
+    if len(xs) != len(ys):
+        raise ValueError('dot() expected sequences of the same length')
+    res = _new_mpz()
+    gmp.mpz_set_ui(res, 0)
+    for x, y in zip(xs, ys):
+        if not (isinstance(x, (int, long, mpz)) and
+                isinstance(y, (int, long, mpz))):
+            _del_mpz(res)
+            raise TypeError('dot() expected integers got %s and %s' % (
+                type(x), type(y)))
+        _mpz_addmul(res, x, y)
+    return mpz._from_c_mpz(res)
+
+
 def jacobi(x, y):
     """
     jacobi(x, y) -> mpz
@@ -164,7 +218,9 @@ def fac(n):
     n = _check_int('fac', 'n', n)
     if n < 0:
         raise ValueError('fac() of negative number')
-    res = _new_mpz()
+    # log2(n!) = lgamma(n + 1) / log(2)
+    res = _new_mpz(int(math.lgamma(n + 1) / math.log(2)) //
+                   gmp.GMP_NUMB_BITS + 1)
     gmp.mpz_fac_ui(res, n)
     return mpz._from_c_mpz(res)
 
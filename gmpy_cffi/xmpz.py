@@ -0,0 +1,254 @@
+import sys
+
+from gmpy_cffi.interface import gmp
+from gmpy_cffi.convert import _mpz_to_str, MAX_UI
+from gmpy_cffi.cache import _del_mpz, _limb_bytes
+from gmpy_cffi.mpz import mpz, _temp_mpz, _mpz_addmul, _pow_limbs
+from gmpy_cffi import memory
+
+
+if sys.version > '3':
+    long = int
+    xrange = range
+
+
+def _reserve_growth(a, limbs):
+    """
+    Raise MemoryError if growing a to limbs limbs would exceed the memory
+    limit. The in-place operators let GMP grow their operand, which doesn't
+    go through _new_mpz.
+    """
+    if limbs > a._mp_alloc:
+        memory._reserve((limbs - a._mp_alloc) * _limb_bytes)
+
+
+class xmpz(mpz):
+    """
+    xmpz() -> xmpz(0)
+
+        If no argument is given, return xmpz(0).
+
+    xmpz(n) -> xmpz
+
+        Return an 'xmpz' object with a numeric value 'n' (see mpz()).
+
+    xmpz(s[, base=0]):
+
+        Return an 'xmpz' object from a string 's' made of digits in the
+        given base (see mpz()).
+
+    xmpz is a mutable mpz: the in-place operators (+=, *=, <<=, ...)
+    change the value of the object instead of creating a new one, which
+    saves an allocation per operation in loops. Other operators return
+    mpz. xmpz objects are unhashable. mpz(x) and xmpz(x) copy the value.
+    """
+
+    __slots__ = ()
+    __hash__ = None
+
+    def __str__(self):
+        return _mpz_to_str(self._mpz, 10)
+
+    def __repr__(self):
+        return 'xmpz(%s)' % self
+
+    def __pos__(self):
+        return mpz(self)
+
+    def limbs(self):
+        """
+        x.limbs() -> memoryview
+
+        Return a view of a copy of the limbs of abs(x), least significant
+        limb first, in native byte order. Unlike mpz.limbs(), the limbs are
+        copied, since in-place operations may move them.
+        """
+        return memoryview(mpz.limbs(self).tobytes())
+
+    def addmul(self, b, c):
+        """
+        x.addmul(b, c)
+
+        Add b*c to x in place, without creating the product.
+        """
+        if not (isinstance(b, (int, long, mpz)) and
+                isinstance(c, (int, long, mpz))):
+            raise TypeError('addmul() expected integer arguments')
+        _mpz_addmul(self._mpz, b, c)
+
+    def submul(self, b, c):
+        """
+        x.submul(b, c)
+
+        Subtract b*c from x in place, without creating the product.
+        """
+        if not (isinstance(b, (int, long, mpz)) and
+                isinstance(c, (int, long, mpz))):
+            raise TypeError('submul() expected integer arguments')
+        _mpz_addmul(self._mpz, b, c, sub=True)
+
+    def __iadd__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            if 0 <= other <= MAX_UI:
+                gmp.mpz_add_ui(a, a, other)
+            elif -MAX_UI <= other < 0:
+                gmp.mpz_sub_ui(a, a, -other)
+            else:
+                tmp = _temp_mpz(other)
+                gmp.mpz_add(a, a, tmp)
+                _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            gmp.mpz_add(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    def __isub__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            if 0 <= other <= MAX_UI:
+                gmp.mpz_sub_ui(a, a, other)
+            elif -MAX_UI <= other < 0:
+                gmp.mpz_add_ui(a, a, -other)
+            else:
+                tmp = _temp_mpz(other)
+                gmp.mpz_sub(a, a, tmp)
+                _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            gmp.mpz_sub(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    def __imul__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            if 0 <= other <= MAX_UI:
+                gmp.mpz_mul_ui(a, a, other)
+            elif -sys.maxsize - 1 <= other < 0:
+                gmp.mpz_mul_si(a, a, other)
+            else:
+                tmp = _temp_mpz(other)
+                gmp.mpz_mul(a, a, tmp)
+                _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            gmp.mpz_mul(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    def __ifloordiv__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            if other == 0:
+                raise ZeroDivisionError('xmpz division by zero')
+            if 0 < other <= MAX_UI:
+                gmp.mpz_fdiv_q_ui(a, a, other)
+            elif -MAX_UI <= other < 0:
+                # floor(x / -d) == -ceil(x / d)
+                gmp.mpz_cdiv_q_ui(a, a, -other)
+                gmp.mpz_neg(a, a)
+            else:
+                tmp = _temp_mpz(other)
+                gmp.mpz_fdiv_q(a, a, tmp)
+                _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            if other == 0:
+                raise ZeroDivisionError('xmpz division by zero')
+            gmp.mpz_fdiv_q(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    __idiv__ = __ifloordiv__
+
+    def __imod__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            if other == 0:
+                raise ZeroDivisionError('xmpz modulo by zero')
+            if 0 < other <= MAX_UI:
+                gmp.mpz_fdiv_r_ui(a, a, other)
+            elif -MAX_UI <= other < 0:
+                # The remainder takes the sign of the divisor
+                gmp.mpz_cdiv_r_ui(a, a, -other)
+            else:
+                tmp = _temp_mpz(other)
+                gmp.mpz_fdiv_r(a, a, tmp)
+                _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            if other == 0:
+                raise ZeroDivisionError('xmpz modulo by zero')
+            gmp.mpz_fdiv_r(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    def __ilshift__(self, other):
+        if not isinstance(other, (int, long, mpz)):
+            return NotImplemented
+        oth = gmp.mpz_get_ui(other._mpz) if isinstance(other, mpz) else other
+        a = self._mpz
+        if memory._limit is not None and a._mp_size:
+            _reserve_growth(
+                a, abs(a._mp_size) + oth // gmp.GMP_NUMB_BITS + 1)
+        gmp.mpz_mul_2exp(a, a, oth)
+        return self
+
+    def __irshift__(self, other):
+        if not isinstance(other, (int, long, mpz)):
+            return NotImplemented
+        oth = gmp.mpz_get_ui(other._mpz) if isinstance(other, mpz) else other
+        gmp.mpz_fdiv_q_2exp(self._mpz, self._mpz, oth)
+        return self
+
+    def __ipow__(self, other):
+        if not isinstance(other, (int, long, mpz)):
+            return NotImplemented
+        if other < 0:
+            raise ValueError('xmpz.pow with negative exponent')
+        exp = int(other)
+        if exp > MAX_UI:
+            raise ValueError('xmpz.pow with outragous exponent')
+        a = self._mpz
+        if memory._limit is not None:
+            _reserve_growth(a, _pow_limbs(gmp.mpz_sizeinbase(a, 2), exp))
+        gmp.mpz_pow_ui(a, a, exp)
+        return self
+
+    def __iand__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            tmp = _temp_mpz(other)
+            gmp.mpz_and(a, a, tmp)
+            _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            gmp.mpz_and(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    def __ior__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            tmp = _temp_mpz(other)
+            gmp.mpz_ior(a, a, tmp)
+            _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            gmp.mpz_ior(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
+
+    def __ixor__(self, other):
+        a = self._mpz
+        if isinstance(other, (int, long)):
+            tmp = _temp_mpz(other)
+            gmp.mpz_xor(a, a, tmp)
+            _del_mpz(tmp)
+        elif isinstance(other, mpz):
+            gmp.mpz_xor(a, a, other._mpz)
+        else:
+            return NotImplemented
+        return self
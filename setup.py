@@ -1,7 +1,5 @@
 from setuptools import setup
 
-import gmpy_cffi.interface
-
 setup(
     name='gmpy_cffi',
     version='0.1',
@@ -30,5 +28,7 @@ setup(
     ],
     packages=['gmpy_cffi'],
     zip_safe=False,
-    ext_modules=[gmpy_cffi.interface.ffi.verifier.get_extension()],
+    setup_requires=['cffi>=1.10.0'],
+    install_requires=['cffi>=1.10.0'],
+    cffi_modules=['gmpy_cffi/_ffi_build.py:ffibuilder'],
 )
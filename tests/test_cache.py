@@ -1,6 +1,14 @@
+import sys
+import copy
+import threading
+
 import pytest
 
-from gmpy_cffi import set_cache, get_cache, mpz, mpq, mpfr, mpc
+from gmpy_cffi import (
+    set_cache, get_cache, set_cache_pool_budget, get_cache_pool_budget,
+    cache_stats, reset_cache_stats, set_cache_stats, mpz, mpq, mpfr, mpc)
+from gmpy_cffi import cache
+from gmpy_cffi.interface import gmp
 
 def _cache(f):
     size, obsize = get_cache()
@@ -31,8 +39,186 @@ class TestCache(object):
         # reset the cache paramaters for other tests
         set_cache(100, 128)
 
+    def test_get_set_cache_pool_budget(self):
+        assert get_cache_pool_budget() == 1 << 20
+        set_cache_pool_budget(0)
+        assert get_cache_pool_budget() == 0
+        x = [mpz(i + 1000) for i in range(10)]
+        del x
+        assert not cache._local.mpz
+        set_cache_pool_budget(None)
+        assert get_cache_pool_budget() is None
+        x = [mpz(1) << (64 * 100) for i in range(50)]
+        del x
+        assert cache._local.mpz.nlimbs >= 50 * 100
+        with pytest.raises(ValueError):
+            set_cache_pool_budget(-1)
+        with pytest.raises(TypeError):
+            set_cache_pool_budget(mpz(100))
+        # reset the cache paramaters for other tests
+        set_cache_pool_budget(1 << 20)
+
+    def test_large_objects(self):
+        size, obsize = get_cache()
+        x = [mpz(1) << 100000 for i in range(10)]
+        q = [mpq(1, 3) ** 10000 for i in range(10)]
+        f = [mpfr(1, 100000) for i in range(10)]
+        c = [mpc(1, 0, (100000, 53)) for i in range(10)]
+        del x, q, f, c
+        for pool, limbs in ((cache._local.mpz, cache._mpz_limbs),
+                            (cache._local.mpq, cache._mpq_limbs),
+                            (cache._local.mpfr, cache._mpfr_limbs),
+                            (cache._local.mpc, cache._mpc_limbs)):
+            # The pool keeps each object's current number of limbs
+            assert all(n == limbs(o) <= obsize for o, n in pool)
+            assert pool.nlimbs == sum(n for o, n in pool)
+            assert pool.nlimbs * cache._limb_bytes <= get_cache_pool_budget()
+        assert mpq(1, 3) ** 3 == mpq(1, 27)
+
+    def test_trim_other_threads(self):
+        # set_cache in one thread also limits the free lists of the others
+        filled, trimmed = threading.Event(), threading.Event()
+        lengths = []
+
+        def cached():
+            local = cache._local
+            return [len(local.mpz), len(local.mpq), len(local.mpfr),
+                    len(local.mpc)]
+
+        def worker():
+            x = [mpz(i + 1000) for i in range(50)]
+            q = [mpq(i, 3) for i in range(50)]
+            f = [mpfr(i) for i in range(50)]
+            c = [mpc(i) for i in range(50)]
+            del x, q, f, c
+            lengths.append(cached())
+            filled.set()
+            trimmed.wait()
+            mpz(1) + 1, mpq(1, 3) * 2, mpfr(1) + 1, mpc(1) + 1
+            lengths.append(cached())
+
+        size, obsize = get_cache()
+        t = threading.Thread(target=worker)
+        t.start()
+        try:
+            filled.wait()
+            set_cache(0, obsize)
+        finally:
+            trimmed.set()
+            t.join()
+            set_cache(size, obsize)
+        assert min(lengths[0]) > 0
+        assert lengths[1] == [0, 0, 0, 0]
+
+    def test_mpz_size_classes(self):
+        x, y = mpz(1) << 5000, mpz(1) << 40
+        del x, y
+        small, big = cache._new_mpz(), cache._new_mpz(79)
+        assert small._mp_alloc < 79 <= big._mp_alloc
+        cache._del_mpz(small)
+        cache._del_mpz(big)
+        assert cache._new_mpz(1000)._mp_alloc >= 1000
+
+        # Bin k holds objects smaller than some hints of the same size class
+        small = cache._new_mpz(5)
+        gmp.mpz_realloc2(small, 5 * gmp.GMP_NUMB_BITS)
+        cache._del_mpz(small)
+        assert cache._new_mpz(7)._mp_alloc >= 7
+
+    def test_nearest_bin(self):
+        pool = cache._Pool(16, lambda obj: None)
+        for limbs in (8, 12, 1200):
+            pool.add(limbs, limbs)
+        # Bin 2 is nearer to bin 4 than bin 9 is
+        assert pool.take(4) == 12
+        assert pool.take(1) == 8
+        assert pool.take(1) == 1200
+        assert pool.take(1) is None
+        for limbs in (8, 32):
+            pool.add(limbs, limbs)
+        # At equal distance the bigger object is preferred
+        assert pool.take(3) == 32
+        assert pool.take(15) == 8
+
+    def test_small_size_class(self):
+        # Fresh and small results share the bin of the default hint
+        x, y = mpz(1 << 70) + 1, mpz(1 << 100) * 3
+        del x, y
+        assert len(cache._local.mpz.bins[0]) >= 2
+
+    def test_cache_stats(self):
+        stats = cache_stats()
+        assert sorted(stats) == ['mpc', 'mpfr', 'mpq', 'mpz']
+        assert stats['mpz']['hits'] is None
+        assert stats['mpz']['depth'] == len(cache._local.mpz)
+
+        set_cache_stats(True)
+        try:
+            # Outside the interned range, so each one is allocated
+            x = [mpz(i + 1000) for i in range(get_cache()[0] + 10)]
+            stats = cache_stats()['mpz']
+            assert stats['hits'] + stats['misses'] == len(x)
+            assert stats['net_allocated'] == len(x)
+            depth = stats['depth']
+            del x
+            stats = cache_stats()['mpz']
+            assert stats['net_allocated'] == 0
+            assert stats['depth'] + stats['evictions'] == depth + 110
+            pooled = list(cache._mpz_shared) + list(cache._local.mpz)
+            assert stats['bytes'] == cache._limb_bytes * sum(
+                cache._mpz_limbs(o) for o, n in pooled)
+
+            f = mpfr(1, 100000)
+            del f
+            assert cache_stats()['mpfr']['evictions'] == 1
+            reset_cache_stats()
+            assert cache_stats()['mpz']['hits'] == 0
+
+            # Freeing objects allocated before the reset
+            x = [mpz(i + 1000) for i in range(500)]
+            reset_cache_stats()
+            del x
+            assert cache_stats()['mpz']['net_allocated'] == 0
+        finally:
+            set_cache_stats(False)
+        assert cache_stats()['mpz']['hits'] is None
+
+    def test_ownership(self):
+        # Copies own their storage and outlive the original
+        x, q, f = mpz(3) << 200, mpq(2**100, 3), mpfr(1.5, 200)
+        copies = [mpz(x), +x, mpq(q), mpfr(f)]
+        del x, q, f
+        junk = [mpz(i) << 200 for i in range(200)]
+        assert copies[0] == copies[1] == 3 << 200
+        assert copies[2] == mpq(2**100, 3)
+        assert copies[3] == 1.5 and copies[3].precision == 200
+
+    @pytest.mark.parametrize('copier', [copy.copy, copy.deepcopy])
+    def test_copy_ownership(self, copier):
+        # A copy must not share the original's struct: both would go back
+        # to the cache on deletion and be handed out twice
+        values = [mpq(1, 3), mpfr(0.1), mpfr('1.1', 200),
+                  mpc(1.5, -2), mpc('0.1+0.3j', (200, 30))]
+        copies = [copier(v) for v in values]
+        for v, c in zip(values, copies):
+            assert c is not v
+            assert repr(c) == repr(v)
+        del values
+        fresh = [mpq(1, 7), mpq(5, 9), mpfr(2.5), mpfr(3.5),
+                 mpc(7, 8), mpc(9, 10)]
+        assert copies[0] == mpq(1, 3)
+        assert copies[1] == mpfr(0.1) and copies[2] == mpfr('1.1', 200)
+        assert copies[3] == mpc(1.5, -2)
+        assert fresh == [mpq(1, 7), mpq(5, 9), mpfr(2.5), mpfr(3.5),
+                         mpc(7, 8), mpc(9, 10)]
+
+    def test_del_uninitialised(self):
+        # __del__ must cope with objects whose __init__ never ran
+        for cls in (mpq, mpfr, mpc):
+            cls.__new__(cls).__del__()
+
     def test_mpz_cache(self):
-        _cache(lambda i : mpz(i))
+        _cache(lambda i : mpz(i + 1000))
 
     def test_mpq_cache(self):
         _cache(lambda i : mpq(i))
@@ -49,3 +235,42 @@ class TestCache(object):
         _cache(lambda i : mpc(complex(i), (100, 0)))
         _cache(lambda i : mpc(complex(i), (50, 100)))
         _cache(lambda i : mpc(complex(i), (50000, 50000)))
+
+    def test_threads(self):
+        # Objects are allocated, freed and dropped across threads
+        errors = []
+        handoff = []
+
+        def hammer(seed):
+            try:
+                x, a = seed, mpz(seed)
+                for i in range(3000):
+                    x = (x * 3 + i) % (1 << 200) + (x >> 3)
+                    a = (a * 3 + i) % (1 << 200) + (a >> 3)
+                    handoff.append(a * 2)
+                    if len(handoff) > 50:
+                        try:
+                            handoff.pop(0)
+                        except IndexError:
+                            pass
+                    if a != x:
+                        errors.append((seed, i, a, x))
+                        return
+            except Exception as e:
+                errors.append(e)
+
+        if hasattr(sys, 'setswitchinterval'):
+            # Switch threads as often as possible to expose races
+            interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=hammer, args=(n,))
+                       for n in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            if hasattr(sys, 'setswitchinterval'):
+                sys.setswitchinterval(interval)
+        assert errors == []
@@ -0,0 +1,71 @@
+import sys
+import subprocess
+
+import pytest
+
+import gmpy_cffi
+
+
+def _run(code):
+    return subprocess.check_output([sys.executable, '-c', code]).decode().split()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5), reason='imported eagerly')
+class TestLazy(object):
+    def test_integer_only_import(self):
+        assert _run(
+            "import sys, gmpy_cffi, gmpy_cffi.cache as c\n"
+            "print('gmpy_cffi.mpfr' in sys.modules)\n"
+            "print('gmpy_cffi.special_functions' in sys.modules)\n"
+            "print(not (c._local.mpfr or c._local.mpc))\n"
+            "gmpy_cffi.mpz(3) * 5\n"
+            "print('gmpy_cffi.mpfr' in sys.modules)\n") == [
+                'False', 'False', 'True', 'False']
+
+    def test_first_access(self):
+        assert _run(
+            "import sys, gmpy_cffi, gmpy_cffi.cache as c\n"
+            "print(gmpy_cffi.sin(gmpy_cffi.mpfr(0)) == 0)\n"
+            "print('gmpy_cffi.mpc' in sys.modules)\n"
+            "print(len(c._local.mpfr) > 0)\n") == ['True', 'True', 'True']
+
+    def test_submodule_does_not_shadow(self):
+        from gmpy_cffi import mpc
+        import gmpy_cffi.mpfr
+        assert isinstance(gmpy_cffi.mpfr, type)
+        assert isinstance(gmpy_cffi.mpc, type)
+        assert gmpy_cffi.mpc is mpc
+
+    def test_dir(self):
+        assert 'mpfr' in dir(gmpy_cffi)
+        assert 'const_pi' in dir(gmpy_cffi)
+
+    def test_missing(self):
+        with pytest.raises(AttributeError):
+            gmpy_cffi.no_such_function
+
+
+def test_star_import():
+    assert _run(
+        "from gmpy_cffi import *\n"
+        "print(sin(mpfr(0)) == 0)\n"
+        "print(isinstance(mpc(1, 2), mpc) and isnan(mpfr('nan')))\n"
+        "print(mpz(2) ** 10 == 1024)\n") == ['True', 'True', 'True']
+    assert all(hasattr(gmpy_cffi, name) for name in gmpy_cffi.__all__)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 4), reason='no find_spec')
+def test_extension_load_error():
+    # An extension that was built but fails to load is reported, not
+    # silently replaced by compiling the bindings again
+    assert _run(
+        "import sys\n"
+        "class Broken(object):\n"
+        "    def find_spec(self, name, path=None, target=None):\n"
+        "        if name == 'gmpy_cffi._gmpy_cffi':\n"
+        "            raise ImportError('libmpfr.so.6: cannot open')\n"
+        "sys.meta_path.insert(0, Broken())\n"
+        "try:\n"
+        "    import gmpy_cffi\n"
+        "except ImportError as e:\n"
+        "    print(e)\n") == ['libmpfr.so.6:', 'cannot', 'open']
@@ -0,0 +1,101 @@
+import pytest
+
+from gmpy_cffi import (
+    set_memory_tracking, get_memory_limit, set_memory_limit, memory_stats,
+    reset_memory_peak, mpz, xmpz, mpz_array, mpfr, mpc, fac)
+
+
+class TestMemory(object):
+    def test_tracking(self):
+        assert memory_stats() == {'live': None, 'peak': None, 'limit': None}
+        set_memory_tracking(True)
+        try:
+            live = memory_stats()['live']
+            x = mpz(1) << 1000000
+            stats = memory_stats()
+            # x may be a pooled mpz_t grown with realloc, which subtracts
+            # its old size
+            assert stats['live'] >= live + 1000000 // 8 - 1024
+            assert stats['peak'] >= stats['live']
+            del x
+            assert memory_stats()['live'] < stats['live']
+            reset_memory_peak()
+            stats = memory_stats()
+            assert stats['peak'] == stats['live']
+        finally:
+            set_memory_tracking(False)
+        assert memory_stats()['live'] is None
+
+    def test_limit(self):
+        assert get_memory_limit() is None
+        set_memory_limit(10**7)
+        try:
+            assert get_memory_limit() == 10**7
+            assert memory_stats()['live'] is not None
+            with pytest.raises(MemoryError):
+                mpz(3) ** 10**9
+            with pytest.raises(MemoryError):
+                3 ** mpz(10**9)
+            with pytest.raises(MemoryError):
+                mpz(1) << 10**9
+            with pytest.raises(MemoryError):
+                mpz(1 << 40000000) * mpz(1 << 40000000)
+            with pytest.raises(MemoryError):
+                fac(10**8)
+            with pytest.raises(MemoryError):
+                mpfr(1, 10**9)
+            with pytest.raises(MemoryError):
+                mpc(1, 0, (10**9, 53))
+            assert mpz(3) ** 1000 == 3 ** 1000
+            assert mpz(0) << 10**9 == 0
+            x = xmpz(3)
+            with pytest.raises(MemoryError):
+                x **= 4 * 10**8
+            with pytest.raises(MemoryError):
+                x <<= 8 * 10**9
+            assert x == 3
+            x = xmpz(0)
+            x <<= 10**9
+            assert x == 0
+            # mpz_array sums the sizes of its elements
+            a = mpz_array([3, 1])
+            with pytest.raises(MemoryError):
+                a ** (4 * 10**8)
+            with pytest.raises(MemoryError):
+                a << (8 * 10**9)
+            with pytest.raises(MemoryError):
+                3 ** mpz_array([10**8, 10**8])
+            with pytest.raises(MemoryError):
+                a **= 4 * 10**8
+            with pytest.raises(MemoryError):
+                a <<= mpz_array([4 * 10**7, 4 * 10**7])
+            assert a.tolist() == [3, 1]
+            assert (mpz_array([0, 0]) << 10**9).tolist() == [0, 0]
+            with pytest.raises(ValueError):
+                a ** -1
+            set_memory_limit(None)
+            assert get_memory_limit() is None
+            assert mpz(1) << 10**8 == 1 << 10**8
+        finally:
+            set_memory_tracking(False)
+        with pytest.raises(ValueError):
+            set_memory_limit(-1)
+        with pytest.raises(TypeError):
+            set_memory_limit(mpz(10))
+        assert get_memory_limit() is None
+        assert memory_stats()['live'] is None
+
+    def test_free_untracked(self):
+        # Freeing memory allocated before tracking started must not take
+        # the count below 0, where it would let allocations past the limit
+        x = mpz(1) << (8 * 5 * 10**7)
+        set_memory_tracking(True)
+        try:
+            del x
+            stats = memory_stats()
+            assert stats['live'] >= 0 and stats['peak'] >= 0
+            set_memory_limit(10**7)
+            with pytest.raises(MemoryError):
+                mpz(1) << (8 * 3 * 10**7)
+        finally:
+            set_memory_tracking(False)
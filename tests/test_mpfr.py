@@ -6,6 +6,8 @@ import random
 import pytest
 
 from gmpy_cffi import mpfr, mpq, mpz, isinf, isnan
+from gmpy_cffi import convert
+from gmpy_cffi.interface import gmp
 from math import sqrt
 
 
@@ -113,6 +115,68 @@ class TestMath(object):
         assert str(mpfr('+inf')) == 'inf'
         assert str(mpfr('-inf')) == '-inf'
 
+    def test_str_shapes(self):
+        assert str(mpfr(0)) == '0.0'
+        assert str(mpfr('-0')) == '-0.0'
+        assert str(mpfr(1e16)) == '10000000000000000.0'
+        assert str(mpfr(1e17)) == '1.0e+17'
+        assert str(mpfr(-1e100)) == '-1.0e+100'
+        assert str(mpfr(1.5e-5)) == '1.5e-05'
+        assert str(mpfr(1e-4)) == '0.0001'
+        assert str(mpfr(2)**1000) == '1.0715086071862673e+301'
+        assert str(mpfr(1e-5, 3)) == '9.5e-06'
+        assert str(mpfr(0.1, 200)) == (
+            '0.1000000000000000055511151231257827021181583404541015625')
+        assert repr(mpfr(1e100)) == "mpfr('1.0e+100')"
+
+    @pytest.mark.parametrize('spec', [
+        '.0f', '.3f', 'f', '.20f', '#.0f', 'F', 'e', '.0e', '#.0e', '.3e',
+        'E', 'g', '.1g', '#.1g', '.3g', '#.3g', '.17g', 'G', '.3', '.17',
+        '+.3f', ' .2e', '>20.3f', '<15g', '^16e', '=+20.4f', '020.4f',
+        ',.2f', 'x^30,.5g', '012,.1f'])
+    def test_format_like_float(self, spec):
+        for x in [0.0, -0.0, 1.0, -1.5, 0.1, 2.5, 9.995, 1e-5, 123456.789,
+                  1e16, 1e22, -1e100, 1e-100, float('inf'), -float('inf'),
+                  float('nan')] + small_floats + large_floats:
+            assert format(mpfr(x), spec) == format(x, spec)
+
+    def test_format(self):
+        assert format(mpfr(1.5)) == '1.5'
+        assert format(mpfr(1e100), '') == '1.0e+100'
+        assert '{0:.3f}'.format(mpfr(2.0625)) == '2.062'
+        assert format(mpfr(0.5), '.1%') == '50.0%'
+        assert format(mpfr(1) / 3, '.2%') == '33.33%'
+        assert format(mpfr('inf'), '%') == 'inf%'
+        # All the digits of the value, not of a double
+        x = mpfr('1.41421356237309504880168872420969807856967187537694807', 200)
+        assert format(x, '.50f') == (
+            '1.41421356237309504880168872420969807856967187537695')
+        assert format(x, '+.40e') == (
+            '+1.4142135623730950488016887242096980785697e+00')
+        assert format(mpfr('1e60', 300), '.0f') == '1' + '0' * 60
+        with pytest.raises(ValueError):
+            format(mpfr(1.5), 'd')
+        with pytest.raises(ValueError):
+            format(mpfr(1.5), '.2fx')
+
+    def test_format_one_digit(self, monkeypatch):
+        # MPFR before 4.1 aborts if mpfr_get_str is asked for 1 digit
+        class Lib(object):
+            def __getattr__(self, name):
+                return getattr(gmp, name)
+
+            def mpfr_get_str(self, buf, expptr, base, n, op, rnd):
+                assert n >= 2
+                return gmp.mpfr_get_str(buf, expptr, base, n, op, rnd)
+
+        monkeypatch.setattr(convert, 'gmp', Lib())
+        for x in [0.25, 0.35, 2.5, 9.5, 9.6, 0.96, 0.0996, 85.0, 95.0,
+                  950.0, 2.5e20, 1e22, 5e-324, -1.7976931348623157e308]:
+            for spec in ['.0e', '#.0e', '.0g', '.1g', '.1']:
+                assert format(mpfr(x), spec) == format(x, spec)
+        assert format(mpfr(2) ** 1000, '.0e') == '1e+301'
+        assert format(mpfr('9.99e1000'), '.1g') == '1e+1001'
+
     def test_add(self):
         assert mpfr('0.5') + mpfr('1.5') == mpfr('2.0')
         assert mpfr('0.5') + 1.5 == mpfr('2.0')
@@ -365,14 +429,35 @@ class TestCmp(object):
         assert hash(mpfr()) == hash(mpfr(0.0, 100)) == 0
         assert hash(mpfr('inf')) == hash(float('inf'))
         assert hash(mpfr('-inf')) == hash(float('-inf'))
-        assert hash(mpfr('nan')) == hash(float('nan'))
+        x = mpfr('nan')
+        assert hash(x) == hash(x)
+        if sys.version_info < (3, 10):
+            # Since 3.10, NaNs hash by identity
+            assert hash(x) == hash(float('nan'))
 
     @pytest.mark.parametrize('n', small_floats + large_floats)
     def test_hash(self, n):
         assert hash(mpfr(n)) == hash(n)
 
+    @pytest.mark.skipif(sys.version_info < (3,), reason='hashed as floats')
+    def test_hash_exact(self):
+        import fractions
+        n = 3**600
+        assert hash(mpfr(n, 1000)) == hash(n)
+        assert hash(mpfr(n, 900)) != hash(mpfr(n, 1000))
+        assert hash(mpfr(-n, 1000)) == hash(-n)
+        x = mpfr('%sp-2000' % hex(n), 1000, 0)
+        assert hash(x) == hash(fractions.Fraction(n, 2**2000))
+        assert hash(mpfr(2) ** -100) == hash(fractions.Fraction(1, 2**100))
+
 
 class TestOther(object):
+    def test_slots(self):
+        x = mpfr(1.5)
+        assert not hasattr(x, '__dict__')
+        assert repr(x) == repr(x) == "mpfr('1.5')"
+        assert str(x) == str(x) and hash(x) == hash(x) == hash(1.5)
+
     def test_isinf(self):
         assert not isinf(mpfr(1.5))
         assert not isinf(mpz(1))
@@ -424,11 +424,15 @@ class TestCmp(object):
         assert hash(mpq(3,1)) == hash(fractions.Fraction(3,1)) == 3
         assert hash(mpq(0)) == hash(fractions.Fraction(0,1)) == hash(0.0) == 0
 
-    @pytest.mark.xfail("sys.version.startswith('3')")
-    def test_hash_big(self):
+    @pytest.mark.parametrize('n,d', [
+        (sys.maxsize + 1, sys.maxsize), (1, 3), (-1, 3), (-2, 1), (1, -2),
+        (3**100, 2**80), (-3**100, 7**60), (2**61 - 1, 1), (1, 2**61 - 1),
+        (5, 2 * (2**61 - 1)), (2**61, 3)])
+    def test_hash_big(self, n, d):
         import fractions
-        assert (hash(mpq(sys.maxsize + 1, sys.maxsize)) ==
-                hash(fractions.Fraction(sys.maxsize + 1, sys.maxsize)))
+        x = mpq(n, d)
+        assert hash(x) == hash(fractions.Fraction(n, d))
+        assert hash(x) == hash(x)
 
     @pytest.mark.xfail("sys.version.startswith('2')", reason="python2 comparison")
     @pytest.mark.parametrize('n', invalids)
@@ -471,3 +475,9 @@ class TestNumDen(object):
     @pytest.mark.parametrize('n', [-2, -1, 1, 2])
     def test_den(self, n):
         assert mpq(3, n).denominator == mpz(abs(n))
+
+    def test_cached(self):
+        q = mpq(2**70, 3)
+        assert q.numerator is q.numerator == 2**70
+        assert q.denominator is q.denominator == 3
+        assert not hasattr(q, '__dict__')
@@ -1,8 +1,9 @@
 from __future__ import division
 
 import sys
+import array
 import pytest
-from gmpy_cffi import mpz, MAX_UI
+from gmpy_cffi import mpz, xmpz, MAX_UI, get_mpz_intern, set_mpz_intern
 
 
 PY3 = sys.version.startswith('3')
@@ -23,6 +24,14 @@ class TestInit(object):
     def test_init_int(self, n):
         assert mpz(n) == n
 
+    @pytest.mark.parametrize('bits', [63, 64, 65, 127, 128, 129, 1000, 100000])
+    def test_init_long(self, bits):
+        for n in [2**bits - 1, 2**bits, 2**bits + 1, 3**(bits // 2 + 1)]:
+            assert mpz(n) == n
+            assert mpz(-n) == -n
+            assert mpz(1) + n == n + 1
+            assert mpz(1) - n == 1 - n
+
     @pytest.mark.parametrize('f', [0.0, 1.0, 1.5, 1e15 + 0.9])
     def test_init_float(self, f):
         assert mpz(f) == int(f)
@@ -54,6 +63,27 @@ class TestInit(object):
         with pytest.raises(ValueError):
             mpz(n, base)
 
+    @pytest.mark.parametrize(('b', 'n'), [
+        (b'', 0), (b'\x00', 0), (b'\x01', 1), (b'\x80', 128),
+        (b'\x80\x00', 128), (b'\x00\x01', 256), (b'\x01\xff', -1),
+        (b'\xff', 0), (b'\x01\x00\xff', -1),
+        (b'\x01' + b'\x00' * 20, 1), (b'\x00' * 20 + b'\x01', 2**160),
+        (b'\x00' * 20 + b'\x01\xff', -2**160)])
+    def test_init_bytes(self, b, n):
+        assert mpz(b, 256) == n
+        assert mpz(bytearray(b), 256) == n
+        assert mpz(memoryview(b), 256) == n
+        assert type(xmpz(b, 256)) is xmpz
+
+    def test_init_bytes_invalid(self):
+        with pytest.raises(ValueError):
+            mpz(u'12', 256)
+        if PY3:
+            with pytest.raises(TypeError):
+                mpz(b'12')
+            with pytest.raises(ValueError):
+                mpz(b'12', 10)
+
     @pytest.mark.parametrize('type_', [int, float, mpz, str])
     def test_init_type(self, type_):
         assert mpz(type_(1)) == 1
@@ -64,6 +94,136 @@ class TestInit(object):
             mpz(n)
 
 
+class TestSlots(object):
+    def test_no_dict(self):
+        assert not hasattr(mpz(3 << 100), '__dict__')
+        assert not hasattr(xmpz(5), '__dict__')
+        with pytest.raises(AttributeError):
+            mpz(3).foo = 1
+
+    def test_lazy_fields(self):
+        x = mpz(3 << 100)
+        assert str(x) == str(x) == str(3 << 100)
+        assert hash(x) == hash(x) == hash(3 << 100)
+
+    @pytest.mark.parametrize('n', [0, 7, 3 << 100, -(3 << 100)])
+    def test_copy_pickle(self, n):
+        import copy
+        import pickle
+        for x in (mpz(n), xmpz(n)):
+            for y in (copy.copy(x), copy.deepcopy(x),
+                      pickle.loads(pickle.dumps(x))):
+                assert y == n and type(y) is type(x)
+        assert mpz(0) == 0
+
+
+@pytest.mark.skipif(not PY3, reason='int.to_bytes is Python 3 only')
+class TestBytes(object):
+    values = [0, 1, 127, 128, 255, 256, -1, -128, -129, -256, 2**64 - 1,
+              -2**63, 3**100, -3**100]
+
+    @pytest.mark.parametrize('signed', [False, True])
+    @pytest.mark.parametrize('byteorder', ['big', 'little'])
+    @pytest.mark.parametrize('n', values)
+    def test_to_bytes(self, n, byteorder, signed):
+        for length in (1, 2, 8, 9, 20, 40):
+            try:
+                expected = n.to_bytes(length, byteorder, signed=signed)
+            except OverflowError:
+                with pytest.raises(OverflowError):
+                    mpz(n).to_bytes(length, byteorder, signed)
+            else:
+                assert mpz(n).to_bytes(length, byteorder, signed) == expected
+
+    @pytest.mark.parametrize('signed', [False, True])
+    @pytest.mark.parametrize('byteorder', ['big', 'little'])
+    @pytest.mark.parametrize('data', [b'', b'\x00', b'\x7f', b'\x80',
+                                      b'\xff\xff', b'\x01\x00' * 20,
+                                      b'\xfe' + b'\x00' * 30])
+    def test_from_bytes(self, data, byteorder, signed):
+        expected = int.from_bytes(data, byteorder, signed=signed)
+        for buf in (data, bytearray(data), memoryview(data)):
+            x = mpz.from_bytes(buf, byteorder, signed)
+            assert type(x) is mpz and x == expected
+        assert type(xmpz.from_bytes(data, byteorder)) is xmpz
+
+    @pytest.mark.parametrize('byteorder', ['big', 'little'])
+    def test_from_bytes_wide_items(self, byteorder):
+        # The whole buffer is read, not len(buf) bytes
+        buf = array.array('I', [1, 2])
+        expected = int.from_bytes(buf.tobytes(), byteorder)
+        assert mpz.from_bytes(buf, byteorder) == expected
+        assert mpz.from_bytes(memoryview(buf), byteorder) == expected
+        assert mpz.from_bytes(buf, byteorder, signed=True) == (
+            int.from_bytes(buf.tobytes(), byteorder, signed=True))
+
+    def test_bytes_invalid(self):
+        with pytest.raises(ValueError):
+            mpz(1).to_bytes(1, 'middle')
+        with pytest.raises(ValueError):
+            mpz(1).to_bytes(-1, 'big')
+        with pytest.raises(ValueError):
+            mpz.from_bytes(b'1', 'middle')
+        with pytest.raises(TypeError):
+            mpz.from_bytes(u'1', 'big')
+
+    @pytest.mark.parametrize('n', [0, 5, -5, 3 << 200, -(3 << 200)])
+    def test_limbs(self, n):
+        view = mpz(n).limbs()
+        assert int.from_bytes(view.tobytes(), sys.byteorder) == abs(n)
+        assert len(view) % 8 == 0 or len(view) % 4 == 0
+        if sys.version_info >= (3, 8):
+            assert view.readonly
+        # The view keeps its mpz alive
+        junk = [mpz(i) << 200 for i in range(100)]
+        assert int.from_bytes(view.tobytes(), sys.byteorder) == abs(n)
+
+    def test_xmpz_limbs(self):
+        x = xmpz(5)
+        view = x.limbs()
+        x <<= 1000
+        assert int.from_bytes(view.tobytes(), sys.byteorder) == 5
+
+
+class TestIntern(object):
+    def test_interned(self):
+        assert get_mpz_intern() == (-5, 256)
+        assert mpz(7) is mpz(7)
+        assert mpz(-5) is mpz(3) - 8
+        assert mpz(2**70) - (2**70 - 256) is mpz(256)
+        assert mpz(257) is not mpz(257)
+        assert mpz(2**64 + 1) - 2**64 is mpz(1)
+        x = mpz(3 << 100)
+        assert mpz(x) is x
+
+    def test_not_interned(self):
+        with pytest.raises(ValueError):
+            mpz(5, 10)
+        x = xmpz(5)
+        assert x is not xmpz(5) and type(x) is xmpz
+        x += 1
+        assert mpz(5) == 5 and mpz(x) == 6
+        assert mpz(2**64 + 3) - 2**64 == 3
+        assert mpz(-(2**64) - 3) + 2**64 == -3
+
+    def test_set_mpz_intern(self):
+        try:
+            set_mpz_intern(0, -1)
+            assert mpz(1) is not mpz(1)
+            set_mpz_intern(1000, 1010)
+            assert get_mpz_intern() == (1000, 1010)
+            assert mpz(1005) is mpz(1000) + 5
+            assert mpz(1005) == 1005 and mpz(999) == 999
+            with pytest.raises(ValueError):
+                set_mpz_intern(0, 10000)
+            with pytest.raises(ValueError):
+                set_mpz_intern(5, 3)
+            with pytest.raises(TypeError):
+                set_mpz_intern(0.5, 3)
+        finally:
+            set_mpz_intern(-5, 256)
+
+
 class TestMath(object):
     numbers = [-1, 0, 1, sys.maxsize, -sys.maxsize - 1, MAX_UI, MAX_UI + 1]
 
@@ -211,6 +371,65 @@ class TestMath(object):
         else:
             assert oct(n) == '-0110642547423257157360'
 
+    @pytest.mark.parametrize('n', [0, 1, 9, 10, 99, 100, 10**18 - 1,
+                                   10**18, 10**40 - 1, 10**40, 2**64 - 1,
+                                   2**64, 7**1000])
+    def test_str_digit_boundaries(self, n):
+        for m in (n, -n):
+            assert str(mpz(m)) == str(m)
+            assert hex(mpz(m)) == hex(m).rstrip('L')
+
+    @pytest.mark.parametrize('n', [0, 1, -1, 99, 100, 10**12, -10**12 + 1,
+                                   10**64, 7**500, -7**500])
+    def test_iter_digits(self, n):
+        for chunk in (1, 3, 8, 1000):
+            pieces = list(mpz(n).iter_digits(chunk=chunk))
+            assert ''.join(pieces) == str(n)
+            assert all(len(p) <= chunk for p in pieces)
+        assert ''.join(mpz(n).iter_digits(16, 5)) == '%x' % n
+
+    def test_iter_digits_xmpz(self):
+        x = xmpz(7**500)
+        it = x.iter_digits(chunk=10)
+        x += 1
+        assert ''.join(it) == str(7**500)
+
+    def test_iter_digits_invalid(self):
+        with pytest.raises(ValueError):
+            mpz(1).iter_digits(63)
+        with pytest.raises(ValueError):
+            mpz(1).iter_digits(10, 0)
+
+    def test_write_digits(self):
+        import io
+        n = -7**1000
+        f = io.StringIO()
+        assert mpz(n).write_digits(f, chunk=50) == len(str(n))
+        assert f.getvalue() == str(n)
+        f = io.BytesIO()
+        mpz(n).write_digits(f, 16)
+        assert f.getvalue() == ('%x' % n).encode('ascii')
+
+    def test_hex_huge(self):
+        # Larger than the cache's obsize, so a freed mpz_t gets shrunk
+        n = -7**10000
+        assert hex(mpz(n)) == hex(n).rstrip('L')
+        assert '%o' % mpz(n) == '%o' % n
+
+    @pytest.mark.parametrize('n', [0, 1, 9, 10, 255, 256, -999, 10**40,
+                                   -(2**100)])
+    def test_num_digits(self, n):
+        x = mpz(n)
+        assert x.num_digits() in (len(str(abs(n))), len(str(abs(n))) + 1)
+        assert x.num_digits(2) == max(abs(n).bit_length(), 1)
+        assert x.num_digits(16) == len('%x' % abs(n))
+        with pytest.raises(ValueError):
+            x.num_digits(1)
+        with pytest.raises(ValueError):
+            x.num_digits(63)
+        with pytest.raises(TypeError):
+            x.num_digits(10.0)
+
     def test_conversions_int(self):
         for n in self.numbers:
             for type_ in [int, long]:
@@ -325,6 +544,35 @@ class TestMath(object):
         for i in range(10000):    # This bug occurs randomly, so repeat
             assert x * x == x
 
+    # Operands around the machine word boundaries, for the _ui/_si paths
+    words = [-MAX_UI - 1, -MAX_UI, -sys.maxsize - 2, -sys.maxsize - 1,
+             -sys.maxsize, -7, -1, 1, 7, sys.maxsize, MAX_UI, MAX_UI + 1]
+
+    @pytest.mark.parametrize('b', words)
+    @pytest.mark.parametrize('a', [0, 12345, -12345, 3 << 100, -(3 << 100)])
+    def test_word_operands(self, a, b):
+        x = mpz(a)
+        assert x + b == a + b and b + x == b + a
+        assert x - b == a - b and b - x == b - a
+        assert x * b == a * b and b * x == b * a
+        assert x // b == a // b and x % b == a % b
+        assert divmod(x, b) == divmod(a, b)
+        assert x & b == a & b and x | b == a | b and x ^ b == a ^ b
+        assert (x < b) == (a < b) and (x == b) == (a == b)
+        assert (x > b) == (a > b)
+        if a:
+            assert b // x == b // a and b % x == b % a
+            assert divmod(b, x) == divmod(b, a)
+
+    @pytest.mark.parametrize('n', invalids)
+    def test_invalid_bit_op(self, n):
+        with pytest.raises(TypeError):
+            mpz(1) & n
+        with pytest.raises(TypeError):
+            mpz(1) | n
+        with pytest.raises(TypeError):
+            n ^ mpz(1)
+
     @pytest.mark.parametrize('n', invalids)
     def test_invalid_op(self, n):
         with pytest.raises(TypeError):
@@ -403,8 +651,12 @@ class TestCmp(object):
     def test_hash_neg1(self):
         assert hash(mpz(-1)) == -1
 
-    def test_hash(self):
-        assert hash(mpz(1)) == 1
-        assert hash(mpz(-2)) == -2
-        assert hash(mpz(sys.maxsize)) == sys.maxsize
-        assert hash(mpz(sys.maxsize+1)) == -sys.maxsize - 1
+    @pytest.mark.parametrize('n', [0, 1, -2, sys.maxsize, sys.maxsize + 1,
+                                   -sys.maxsize - 2, 2**61 - 2, 2**61 - 1,
+                                   2**61, -(2**61 - 1), -(2**61), 2**64 + 7,
+                                   3**500, -3**500])
+    def test_hash(self, n):
+        x = mpz(n)
+        assert hash(x) == hash(n)
+        assert hash(x) == hash(x)
+        assert {n: 1}[x] == 1
@@ -0,0 +1,291 @@
+import sys
+import pickle
+import operator
+from array import array
+
+import pytest
+
+from gmpy_cffi import mpz, mpz_array, gcd
+
+
+PY3 = sys.version.startswith('3')
+
+
+class TestInit(object):
+    def test_init_empty(self):
+        a = mpz_array()
+        assert len(a) == 0
+        assert list(a) == []
+        assert repr(a) == 'mpz_array([])'
+
+    @pytest.mark.parametrize('values', [
+        [1, -2, 3],
+        [0, 2**63 - 1, -2**63],
+        [2**64, -2**100, 5, mpz(-7), mpz(3) << 200],
+        (x * x for x in range(10)),
+        range(-5, 5)])
+    def test_init_iterable(self, values):
+        values = list(values)
+        a = mpz_array(values)
+        assert len(a) == len(values)
+        assert a.tolist() == [int(x) for x in values]
+        assert all(type(x) is mpz for x in a)
+
+    def test_init_copy(self):
+        a = mpz_array([1, 2**100])
+        b = mpz_array(a)
+        b[0] = 5
+        assert a.tolist() == [1, 2**100]
+        assert b.tolist() == [5, 2**100]
+
+    @pytest.mark.skipif(not PY3, reason='no buffer protocol for array')
+    def test_init_buffer(self):
+        assert mpz_array(array('q', [1, -2, 2**63 - 1])).tolist() == [
+            1, -2, 2**63 - 1]
+        assert mpz_array(array('Q', [2**64 - 1])).tolist() == [2**64 - 1]
+        assert mpz_array(array('i', [5, -6])).tolist() == [5, -6]
+        assert mpz_array(b'\x01\xff').tolist() == [1, 255]
+        # Non-contiguous views are converted element by element
+        assert mpz_array(memoryview(array('q', range(6)))[::2]).tolist() == [
+            0, 2, 4]
+
+    def test_init_numpy(self):
+        np = pytest.importorskip('numpy')
+        x = np.array([1, -2, 2**62], dtype=np.int64)
+        assert mpz_array(x).tolist() == [1, -2, 2**62]
+        assert mpz_array(x.astype(np.uint64)[:2]).tolist() == [1, 2**64 - 2]
+        assert mpz_array(x[::2]).tolist() == [1, 2**62]
+        with pytest.raises(ValueError):
+            mpz_array(np.zeros((2, 2), dtype=np.int64))
+
+    def test_frombytes(self):
+        b = b'\xff\xff\x00\x01\x80\x00'
+        assert mpz_array.frombytes(b, 2, 'big').tolist() == [
+            65535, 1, 32768]
+        assert mpz_array.frombytes(b, 2, 'big', signed=True).tolist() == [
+            -1, 1, -32768]
+        assert mpz_array.frombytes(b, 3, 'little').tolist() == [
+            0x00ffff, 0x008001]
+        assert mpz_array.frombytes(b, 6, 'little', True).tolist() == [
+            mpz.from_bytes(b, 'little', signed=True)]
+        assert mpz_array.frombytes(b'', 4, 'big').tolist() == []
+
+    @pytest.mark.skipif(not PY3, reason='no buffer protocol for array')
+    def test_frombytes_shaped(self):
+        # The whole buffer is read, whatever its item size and shape
+        a = array('H', [0x0102, 0x0304, 0x0506])
+        assert (mpz_array.frombytes(a, 3, 'little').tolist() ==
+                mpz_array.frombytes(a.tobytes(), 3, 'little').tolist())
+        view = memoryview(bytearray(range(12))).cast('B', (3, 4))
+        assert mpz_array.frombytes(view, 4, 'big').tolist() == [
+            0x00010203, 0x04050607, 0x08090a0b]
+
+    def test_frombytes_invalid(self):
+        with pytest.raises(ValueError):
+            mpz_array.frombytes(b'\x00' * 5, 2, 'big')
+        with pytest.raises(ValueError):
+            mpz_array.frombytes(b'\x00' * 4, 0, 'big')
+        with pytest.raises(ValueError):
+            mpz_array.frombytes(b'\x00' * 4, 2, 'middle')
+        with pytest.raises(TypeError):
+            mpz_array.frombytes(b'\x00' * 4, 2.0, 'big')
+
+    def test_zeros(self):
+        assert mpz_array.zeros(3).tolist() == [0, 0, 0]
+        assert len(mpz_array.zeros(mpz(0))) == 0
+        with pytest.raises(ValueError):
+            mpz_array.zeros(-1)
+        with pytest.raises(TypeError):
+            mpz_array.zeros(1.5)
+
+    @pytest.mark.parametrize('values', [[1.5], ['1'], [1, None], [mpz(1), 2.0]])
+    def test_init_invalid(self, values):
+        with pytest.raises(TypeError):
+            mpz_array(values)
+        with pytest.raises(TypeError):
+            mpz_array(5)
+
+
+class TestAccess(object):
+    def test_getitem(self):
+        a = mpz_array([10, -20, 2**100])
+        assert a[0] == 10 and a[-1] == 2**100 and a[mpz(1)] == -20
+        # Elements are copies
+        x = a[2]
+        a[2] = 0
+        assert x == 2**100
+        with pytest.raises(IndexError):
+            a[3]
+        with pytest.raises(IndexError):
+            a[-4]
+        with pytest.raises(TypeError):
+            a[1.0]
+
+    def test_slice(self):
+        values = [1, 2**70, -3, 4, 5]
+        a = mpz_array(values)
+        for s in [slice(None), slice(1, 3), slice(3, 1), slice(None, None, 2),
+                  slice(None, None, -1), slice(-2, None), slice(10, 20)]:
+            assert a[s].tolist() == values[s]
+        b = a[1:3]
+        b[0] = 0
+        assert a[1] == 2**70
+
+    def test_setitem(self):
+        a = mpz_array.zeros(4)
+        a[0] = 2**100
+        a[-1] = mpz(-5)
+        a[1:3] = [7, 8]
+        assert a.tolist() == [2**100, 7, 8, -5]
+        a[::-1] = a
+        assert a.tolist() == [-5, 8, 7, 2**100]
+        a[::2] = mpz_array([1, 2])
+        assert a.tolist() == [1, 8, 2, 2**100]
+        with pytest.raises(ValueError):
+            a[1:3] = [1]
+        with pytest.raises(TypeError):
+            a[0] = 1.5
+        with pytest.raises(IndexError):
+            a[4] = 1
+
+    def test_pickle(self):
+        a = mpz_array([1, -2**100])
+        b = pickle.loads(pickle.dumps(a))
+        assert type(b) is mpz_array
+        assert b.tolist() == [1, -2**100]
+
+    def test_slots(self):
+        assert not hasattr(mpz_array(), '__dict__')
+
+
+xs = [0, 1, -1, 7, -2**100 + 3, 2**130 - 1, 12345678901234567890]
+ys = [3, -5, 2**70, -1, 17, -2**65, 10]
+
+
+class TestArith(object):
+    @pytest.mark.parametrize('op', [
+        operator.add, operator.sub, operator.mul, operator.floordiv,
+        operator.mod, operator.and_, operator.or_, operator.xor])
+    def test_binop(self, op):
+        a, b = mpz_array(xs), mpz_array(ys)
+        expected = [op(x, y) for x, y in zip(xs, ys)]
+        assert op(a, b).tolist() == expected
+        assert op(a, ys).tolist() == expected
+        assert op(a, 7).tolist() == [op(x, 7) for x in xs]
+        assert op(a, mpz(-2**80)).tolist() == [op(x, -2**80) for x in xs]
+        assert op(-2**100, b).tolist() == [op(-2**100, y) for y in ys]
+        assert op(xs, b).tolist() == expected
+        # The operands are unchanged
+        assert a.tolist() == xs and b.tolist() == ys
+
+    @pytest.mark.parametrize('op', [
+        operator.iadd, operator.isub, operator.imul, operator.ifloordiv,
+        operator.imod, operator.iand, operator.ior, operator.ixor])
+    def test_inplace(self, op):
+        a = mpz_array(xs)
+        b = op(a, ys)
+        assert b is a
+        assert a.tolist() == [op(x, y) for x, y in zip(xs, ys)]
+        a = mpz_array(ys)
+        op(a, a)
+        assert a.tolist() == [op(y, y) for y in ys]
+
+    def test_pow(self):
+        a, e = mpz_array(xs), mpz_array([0, 1, 2, 3, 4, 5, 6])
+        assert (a ** 3).tolist() == [x ** 3 for x in xs]
+        assert (a ** e).tolist() == [x ** n for x, n in zip(xs, e)]
+        assert (3 ** e).tolist() == [3 ** n for n in e]
+        a **= 2
+        assert a.tolist() == [x ** 2 for x in xs]
+        with pytest.raises(ValueError):
+            mpz_array(xs) ** -1
+        with pytest.raises(ValueError):
+            mpz_array(xs) ** mpz_array([1, 1, 1, -1, 1, 1, 1])
+        with pytest.raises(ValueError):
+            mpz_array(xs) ** (2 ** 70)
+
+    def test_powm(self):
+        a = mpz_array(xs)
+        mods = [abs(y) + 2 for y in ys]
+        exps = [2**100 + 1, 0, 5, 65537, 3, 2, 1]
+        assert a.powm(65537, 2**127 - 1).tolist() == [
+            pow(x, 65537, 2**127 - 1) for x in xs]
+        assert pow(a, exps, mpz_array(mods)).tolist() == [
+            pow(x, e, m) for x, e, m in zip(xs, exps, mods)]
+        assert a.powm(mpz(3), mods).tolist() == [
+            pow(x, 3, m) for x, m in zip(xs, mods)]
+        with pytest.raises(ValueError):
+            a.powm(3, 0)
+        with pytest.raises(ValueError):
+            a.powm(-3, 7)
+        with pytest.raises(TypeError):
+            a.powm(3, 7.0)
+
+    def test_shift(self):
+        a = mpz_array(xs)
+        n = mpz_array([0, 1, 2, 3, 64, 65, 200])
+        assert (a << 5).tolist() == [x << 5 for x in xs]
+        assert (a >> n).tolist() == [x >> k for x, k in zip(xs, n)]
+        assert (1 << n).tolist() == [1 << k for k in n]
+        a <<= n
+        a >>= n
+        assert a.tolist() == xs
+        with pytest.raises(ValueError):
+            mpz_array(xs) << -1
+        with pytest.raises(OverflowError):
+            mpz_array(xs) >> 2**70
+
+    def test_unary(self):
+        a = mpz_array(xs)
+        assert (-a).tolist() == [-x for x in xs]
+        assert abs(a).tolist() == [abs(x) for x in xs]
+        b = +a
+        b[0] = 5
+        assert a[0] == 0
+
+    def test_gcd(self):
+        a = mpz_array(xs)
+        assert a.gcd(ys).tolist() == [
+            int(gcd(x, y)) for x, y in zip(xs, ys)]
+        assert a.gcd(12).tolist() == [int(gcd(x, 12)) for x in xs]
+        with pytest.raises(TypeError):
+            a.gcd(1.5)
+
+    def test_zero_division(self):
+        a = mpz_array(xs)
+        for op in (operator.floordiv, operator.mod):
+            with pytest.raises(ZeroDivisionError):
+                op(a, 0)
+            with pytest.raises(ZeroDivisionError):
+                op(a, [1, 1, 0, 1, 1, 1, 1])
+            with pytest.raises(ZeroDivisionError):
+                op(5, a)
+        # Nothing is written when an operand is invalid
+        with pytest.raises(ZeroDivisionError):
+            a //= [1, 1, 1, 1, 1, 1, 0]
+        assert a.tolist() == xs
+
+    def test_invalid(self):
+        a = mpz_array(xs)
+        with pytest.raises(ValueError):
+            a + mpz_array([1, 2])
+        with pytest.raises(ValueError):
+            a * [1]
+        with pytest.raises(TypeError):
+            a + 1.5
+        with pytest.raises(TypeError):
+            'x' * a
+        with pytest.raises(TypeError):
+            hash(a)
+
+    @pytest.mark.parametrize('op', [
+        operator.lt, operator.le, operator.eq, operator.ne, operator.gt,
+        operator.ge])
+    def test_cmp(self, op):
+        a = mpz_array(xs)
+        assert op(a, ys) == [op(x, y) for x, y in zip(xs, ys)]
+        assert op(a, mpz_array(ys)) == [op(x, y) for x, y in zip(xs, ys)]
+        assert op(a, 1) == [op(x, 1) for x in xs]
+        assert op(7, a) == [op(7, x) for x in xs]
+        assert op(a, a) == [op(x, x) for x in xs]
+        assert all(type(r) is bool for r in op(a, 0))
@@ -1,6 +1,6 @@
 import pytest
 
-from gmpy_cffi import mpz, mpq, mpfr, is_prime, next_prime, gcd, gcdext, lcm, invert, jacobi, legendre, kronecker, fac, bincoef, fib, fib2, lucas, lucas2
+from gmpy_cffi import mpz, mpq, mpfr, is_prime, next_prime, gcd, gcdext, lcm, invert, addmul, submul, dot, jacobi, legendre, kronecker, fac, bincoef, fib, fib2, lucas, lucas2
 
 
 class Test_ntheory(object):
@@ -74,6 +74,35 @@ class Test_ntheory(object):
         with pytest.raises(ZeroDivisionError):
             invert(4, 0)
 
+    @pytest.mark.parametrize('b', [0, 3, -3, 2**64 + 1, -2**64 - 1, mpz(7),
+                                   mpz(-2**100)])
+    @pytest.mark.parametrize('c', [5, -5, 2**70, mpz(-9), mpz(2**65)])
+    def test_addmul(self, b, c):
+        a = 2**80 + 17
+        assert addmul(a, b, c) == a + int(b) * int(c)
+        assert submul(a, b, c) == a - int(b) * int(c)
+        assert submul(mpz(a), b, c) == a - int(b) * int(c)
+        assert isinstance(addmul(a, b, c), mpz)
+
+    def test_addmul_invalid(self):
+        with pytest.raises(TypeError):
+            addmul(1, mpq(1, 2), 3)
+        with pytest.raises(TypeError):
+            submul(1.5, 2, 3)
+        with pytest.raises(TypeError):
+            addmul(1, 2)
+
+    def test_dot(self):
+        xs = [3, -2**70, mpz(5), 2**64, -1]
+        ys = [mpz(-7), 11, 2**100, -2**64, 0]
+        assert dot(xs, ys) == sum(int(x) * int(y) for x, y in zip(xs, ys))
+        assert dot([], []) == 0
+        assert dot(iter(range(10)), range(10)) == 285
+        with pytest.raises(ValueError):
+            dot([1, 2], [3])
+        with pytest.raises(TypeError):
+            dot([1.5], [2])
+
     def test_jacobi(self):
         assert jacobi(7, 3) == 1
         assert jacobi(5, 3) == -1
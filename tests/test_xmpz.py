@@ -0,0 +1,119 @@
+import operator
+import sys
+
+import pytest
+
+from gmpy_cffi import mpz, xmpz, MAX_UI
+
+
+if sys.version > '3':
+    long = int
+
+
+class TestInit(object):
+    def test_init(self):
+        assert xmpz() == 0
+        assert xmpz(42) == 42
+        assert xmpz('-ff', 16) == -255
+        assert xmpz(-2**100) == -2**100
+
+    def test_copy(self):
+        a = mpz(5)
+        x = xmpz(a)
+        x += 1
+        assert a == 5 and x == 6
+        y = xmpz(x)
+        y += 1
+        assert x == 6 and y == 7
+        b = mpz(y)
+        y += 1
+        assert b == 7 and y == 8
+
+    def test_repr(self):
+        x = xmpz(12)
+        assert repr(x) == 'xmpz(12)'
+        x += 1
+        assert str(x) == '13'
+
+    def test_unhashable(self):
+        with pytest.raises(TypeError):
+            hash(xmpz(1))
+
+
+class TestInplace(object):
+    operands = [0, 1, -1, 7, -7, 2**64 + 3, -2**64 - 3, 2**200 + 1,
+                -sys.maxsize - 1, -sys.maxsize - 2, -MAX_UI, -MAX_UI - 1,
+                mpz(9), mpz(-2**100)]
+
+    @pytest.mark.parametrize('b', operands)
+    @pytest.mark.parametrize('a', [0, 17, -17, 2**100 + 5, -2**100 - 5])
+    def test_arithmetic(self, a, b):
+        for op in ('iadd', 'isub', 'imul', 'iand', 'ior', 'ixor',
+                   'ifloordiv', 'imod'):
+            if op in ('ifloordiv', 'imod') and b == 0:
+                continue
+            x = xmpz(a)
+            y = getattr(operator, op)(x, b)
+            assert y is x
+            assert x == getattr(operator, op)(a, int(b)), op
+
+    @pytest.mark.parametrize('b', [-1, -7, -MAX_UI])
+    def test_negative_word(self, b, monkeypatch):
+        # Negative machine words don't need a temporary mpz_t
+        def no_temp(n):
+            raise AssertionError('temporary mpz_t for %d' % n)
+        monkeypatch.setattr(sys.modules['gmpy_cffi.xmpz'], '_temp_mpz', no_temp)
+        for a in (17, -17, 2**100 + 5):
+            for op in ('iadd', 'isub', 'ifloordiv', 'imod'):
+                x = xmpz(a)
+                getattr(operator, op)(x, b)
+                assert x == getattr(operator, op)(a, b), op
+            if b >= -sys.maxsize - 1:
+                x = xmpz(a)
+                x *= b
+                assert x == a * b
+
+    def test_shift_pow(self):
+        x = xmpz(3)
+        x <<= 100
+        assert x == 3 << 100
+        x >>= mpz(99)
+        assert x == 6
+        x **= 3
+        assert x == 216 and isinstance(x, xmpz)
+        with pytest.raises(ValueError):
+            x **= -1
+
+    def test_zero_division(self):
+        x = xmpz(5)
+        with pytest.raises(ZeroDivisionError):
+            x //= 0
+        with pytest.raises(ZeroDivisionError):
+            x %= mpz(0)
+        assert x == 5
+
+    def test_invalid(self):
+        x = xmpz(5)
+        with pytest.raises(TypeError):
+            x += 'a'
+
+    def test_binary_returns_mpz(self):
+        x = xmpz(5)
+        assert type(x + 1) is mpz
+        assert type(1 + x) is mpz
+        assert type(+x) is mpz
+        y = x * 2
+        x += 1
+        assert y == 10
+
+    def test_addmul(self):
+        x = xmpz(10)
+        ident = id(x)
+        x.addmul(3, mpz(4))
+        assert x == 22
+        x.submul(-2**70, 2**70)
+        assert x == 22 + 2**140
+        x.submul(x, 1)
+        assert x == 0 and id(x) == ident
+        with pytest.raises(TypeError):
+            x.addmul(1.5, 2)